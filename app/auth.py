@@ -5,9 +5,10 @@ from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.database import get_db
+from app.database import get_db, run_db
 from app.models import User
 from app.crud import verify_password, get_user_by_email
+from app.services.user_cache import user_cache
 
 # Setup HTTP Bearer token security scheme untuk FastAPI
 security = HTTPBearer()
@@ -62,9 +63,17 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         # Jika terjadi error saat decode token (token rusak/kadaluarsa)
         raise credentials_exception
     
+    # User yang baru saja dimuat diambil dari cache (tanpa query ke database)
+    user = user_cache.get(email)
+    if user is not None:
+        return user
+    
     # Cari user berdasarkan email dari token
-    user = get_user_by_email(db, email=email)
+    user = await run_db(get_user_by_email, db, email=email)
     if user is None:
         # Jika user tidak ditemukan di database
         raise credentials_exception
+    user_cache.set(email, user)
+    # Dilepas dari session seperti user dari cache, agar commit di handler tidak memicu SELECT ulang
+    db.expunge(user)
     return user
\ No newline at end of file
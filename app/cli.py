@@ -0,0 +1,80 @@
+# app/cli.py
+"""
+Perintah maintenance FinSight.
+
+Contoh:
+    python -m app.cli rebuild-rollups
+    python -m app.cli rebuild-rollups --user-id 42
+    python -m app.cli repair-community
+    python -m app.cli forecast-batch --workers 4
+"""
+import argparse
+
+from app import crud
+from app.config import FORECAST_WORKERS, FORECAST_CHUNK_SIZE
+from app.database import Base, engine, SessionLocal, add_missing_columns
+from app.models import CommunityLike, CashFlowPrediction
+from app.services.forecast_batch import precompute_cashflow_forecasts
+
+def rebuild_rollups(args):
+    db = SessionLocal()
+    try:
+        rows = crud.rebuild_monthly_balances(db, user_id=args.user_id)
+        target = f"user {args.user_id}" if args.user_id is not None else "semua user"
+        print(f"Rollup bulanan untuk {target} dibangun ulang ({rows} baris).")
+    finally:
+        db.close()
+
+def repair_community(args):
+    db = SessionLocal()
+    try:
+        removed = crud.repair_community_counters(db)
+        for index in CommunityLike.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+        print(f"Counter like/komentar dihitung ulang ({removed} like ganda dihapus).")
+    finally:
+        db.close()
+
+def forecast_batch(args):
+    db = SessionLocal()
+    try:
+        # Upsert butuh kolom dan unique index baru, yang mungkin belum dibuat jika aplikasi belum di-restart
+        add_missing_columns()
+        if crud.cashflow_predictions_need_dedupe(db):
+            removed = crud.dedupe_cashflow_predictions(db)
+            print(f"{removed} prediksi ganda dari versi lama dihapus.")
+        for index in CashFlowPrediction.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+        stats = precompute_cashflow_forecasts(db, args.chunk_size, args.workers, force=args.force)
+        rate = stats.users / stats.seconds if stats.seconds else 0
+        print(
+            f"Prediksi arus kas: {stats.written} disimpan, {stats.fresh} masih berlaku, {stats.no_data} tanpa transaksi "
+            f"({stats.users} user dalam {stats.seconds:.1f} detik, {rate:,.0f} user/detik)."
+        )
+    finally:
+        db.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Perintah maintenance FinSight")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = subparsers.add_parser("rebuild-rollups", help="Hitung ulang tabel monthly_balances dari transactions")
+    rebuild_parser.add_argument("--user-id", type=int, default=None, help="Hanya bangun ulang rollup user ini")
+    rebuild_parser.set_defaults(handler=rebuild_rollups)
+
+    repair_parser = subparsers.add_parser("repair-community", help="Hapus like ganda dan hitung ulang counter like/komentar post")
+    repair_parser.set_defaults(handler=repair_community)
+
+    forecast_parser = subparsers.add_parser("forecast-batch", help="Hitung prediksi arus kas bulan depan untuk semua user (job malam)")
+    forecast_parser.add_argument("--workers", type=int, default=FORECAST_WORKERS, help="Jumlah worker process (0/1 = proses utama)")
+    forecast_parser.add_argument("--chunk-size", type=int, default=FORECAST_CHUNK_SIZE, help="Jumlah user per potongan")
+    forecast_parser.add_argument("--force", action="store_true", help="Hitung ulang juga prediksi yang masih berlaku")
+    forecast_parser.set_defaults(handler=forecast_batch)
+
+    args = parser.parse_args(argv)
+    Base.metadata.create_all(bind=engine)
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
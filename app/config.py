@@ -10,8 +10,84 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8000") # Default untuk development
+# Di development file static dicek ulang (mtime) paling sering sekali per N detik; 0 = nonaktif (selalu nonaktif di production)
+STATIC_RELOAD_INTERVAL = float(os.getenv("STATIC_RELOAD_INTERVAL", "2"))
+
+# Konfigurasi eksekusi database
+# "threadpool" menjalankan query blocking di thread pool khusus, "inline" menjalankannya langsung di event loop
+# (nilai lain ditolak saat startup)
+DB_EXECUTOR_MODE = os.getenv("DB_EXECUTOR_MODE", "threadpool")
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "10"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(DB_EXECUTOR_WORKERS)))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+
+# Hashing password bcrypt: cost factor dan jumlah hash bersamaan (0 = langsung di event loop, hanya untuk perbandingan)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Jumlah worker process untuk render laporan PDF (0 = render di thread proses utama)
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+# Penyimpanan job & cache laporan: "memory" (satu proses uvicorn) atau "sql" (dibagi antar worker);
+# sama seperti INSIGHT_JOB_BACKEND, "memory" membalas 404 jika job dicek dari worker lain
+REPORT_JOB_BACKEND = os.getenv("REPORT_JOB_BACKEND", "memory")
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "100"))
+# Backend sql: jumlah PDF selesai yang disimpan per user, dan batas detik job pending/running
+# sebelum dianggap gagal (mis. worker mati/restart saat render)
+REPORT_CACHE_PER_USER = int(os.getenv("REPORT_CACHE_PER_USER", "10"))
+REPORT_JOB_TIMEOUT = int(os.getenv("REPORT_JOB_TIMEOUT", "600"))
+
+# Cache user yang sedang login (per proses); TTL = batas maksimal data user basi antar worker, 0 = nonaktif
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+# Cache halaman pertama feed komunitas per kategori (detik, 0 = nonaktif) dan jumlah kategori yang di-cache
+COMMUNITY_FEED_CACHE_TTL = int(os.getenv("COMMUNITY_FEED_CACHE_TTL", "30"))
+COMMUNITY_FEED_CACHE_MAX_ENTRIES = int(os.getenv("COMMUNITY_FEED_CACHE_MAX_ENTRIES", "32"))
+
+# Upload gambar komunitas: ukuran file maksimum, format hasil (webp | jpeg), kualitas encode,
+# batas resolusi sebelum decode, dan jumlah thread untuk resize
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "webp").lower()
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "80"))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", "40000000"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+# Job batch forecast arus kas (python -m app.cli forecast-batch): jumlah worker process
+# (0/1 = dihitung di proses utama) dan jumlah user per potongan yang dibaca dari database
+FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", str(os.cpu_count() or 1)))
+FORECAST_CHUNK_SIZE = int(os.getenv("FORECAST_CHUNK_SIZE", "1000"))
+
+# Job insight AI di background: "memory" (per proses) atau "sql" (dibagi antar worker).
+# "memory" hanya benar dengan satu proses uvicorn: dengan --workers > 1 atau beberapa instance,
+# polling yang diterima worker lain membalas 404, jadi gunakan "sql"
+INSIGHT_JOB_BACKEND = os.getenv("INSIGHT_JOB_BACKEND", "memory")
+INSIGHT_JOB_MAX_ENTRIES = int(os.getenv("INSIGHT_JOB_MAX_ENTRIES", "1000"))
 
 # Konfigurasi untuk API Eksternal (Contoh OpenRouter)
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
-MODEL_NAME = os.getenv("MODEL_NAME", "gpt-3.5-turbo")
\ No newline at end of file
+# Bisa diarahkan ke server tiruan (benchmarks/fake_openrouter.py) untuk load test
+OPENROUTER_API_URL = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+MODEL_NAME = os.getenv("MODEL_NAME", "gpt-3.5-turbo")
+
+# Konfigurasi HTTP client bersama untuk layanan LLM
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "false").lower() == "true" # Butuh paket h2 (pip install httpx[http2])
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2")) # Percobaan ulang untuk 429/5xx/gangguan koneksi
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "0.5")) # Detik, dikalikan 2^percobaan + jitter
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8")) # Request LLM yang boleh berjalan bersamaan
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "50")) # Request yang boleh menunggu; sisanya langsung 503
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "10")) # Detik maksimal menunggu giliran
+
+# Cache respons LLM: "memory" (per proses), "sql" (dibagi antar worker), atau "none"
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "3600")) # Detik
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+# Bulatkan angka di prompt ke N digit signifikan agar input yang hampir sama memakai entri cache yang sama
+LLM_CACHE_NUMERIC_BUCKETING = os.getenv("LLM_CACHE_NUMERIC_BUCKETING", "false").lower() == "true"
+LLM_CACHE_BUCKET_DIGITS = int(os.getenv("LLM_CACHE_BUCKET_DIGITS", "2"))
+
+# Endpoint /metrics (statistik internal cache dan antrean); default hanya aktif di luar production
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false" if IS_PROD else "true").lower() == "true"
@@ -1,14 +1,30 @@
 # app/crud.py
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, func, case, extract, insert, select, update, delete, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
 from passlib.context import CryptContext
-from datetime import datetime, date, timedelta
-from typing import Optional
+from datetime import datetime, date
+import hashlib
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
 
-from app.models import User, Transaction, CashFlowPrediction, BusinessRecommendation, CommunityPost, CommunityComment, CommunityLike
+from app.config import BCRYPT_ROUNDS
+from app.models import User, Transaction, MonthlyBalance, DataVersion, CashFlowPrediction, BusinessRecommendation, CommunityPost, CommunityComment, CommunityLike
 from app.schemas import UserCreate, TransactionCreate, CommunityPostCreate, CommunityCommentCreate
+from app.services.user_cache import user_cache
+from app.services.feed_cache import feed_cache
+from app.services.forecast import CashflowForecast
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hash dengan cost factor berbeda dari BCRYPT_ROUNDS (naik atau turun) dianggap perlu diperbarui,
+# sehingga di-rehash otomatis saat user berhasil login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
 
 # Password functions
 def get_password_hash(password):
@@ -23,6 +39,12 @@ def verify_password(plain_password, hashed_password):
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password, hashed_password):
+    """
+    Verifikasi password; jika valid dan hash memakai cost factor/skema lama, kembalikan juga hash baru
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 # User CRUD operations
 def get_user_by_email(db: Session, email: str):
     """
@@ -30,11 +52,18 @@ def get_user_by_email(db: Session, email: str):
     """
     return db.query(User).filter(User.email == email).first()
 
-def create_user(db: Session, user: UserCreate):
+def get_user_password_hash(db: Session, user_id: int) -> Optional[str]:
+    """
+    Hash password terbaru user (tidak ikut di-cache bersama user yang login)
+    """
+    return db.query(User.password_hash).filter(User.id == user_id).scalar()
+
+def create_user(db: Session, user: UserCreate, password_hash: Optional[str] = None):
     """
     Membuat user baru dengan password yang di-hash
+    (password_hash bisa diberikan jika sudah di-hash di pool hashing)
     """
-    hashed_password = get_password_hash(user.password)
+    hashed_password = password_hash or get_password_hash(user.password)
     db_user = User(
         name=user.name,
         email=user.email,
@@ -45,6 +74,38 @@ def create_user(db: Session, user: UserCreate):
     db.refresh(db_user)
     return db_user
 
+# Versi data untuk ETag endpoint baca
+COMMUNITY_SCOPE = "community"
+
+def user_data_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def bump_data_version(db: Session, scope: str):
+    """
+    Menaikkan versi data scope (upsert). Tidak melakukan commit, sehingga versi baru
+    ikut ter-commit bersama penulisan datanya.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(DataVersion).values(scope=scope, version=1)
+        stmt = stmt.on_conflict_do_update(index_elements=["scope"], set_={"version": DataVersion.version + 1})
+        db.execute(stmt)
+        return
+
+    # Fallback untuk database tanpa dukungan ON CONFLICT
+    updated = db.query(DataVersion).filter(DataVersion.scope == scope).update(
+        {DataVersion.version: DataVersion.version + 1}, synchronize_session=False
+    )
+    if not updated:
+        db.execute(insert(DataVersion).values(scope=scope, version=1))
+
+def get_data_version(db: Session, scope: str) -> int:
+    """
+    Versi data scope saat ini (0 jika belum pernah ada penulisan)
+    """
+    return db.query(DataVersion.version).filter(DataVersion.scope == scope).scalar() or 0
+
 # Transaction CRUD operations
 def create_transaction(db: Session, transaction: TransactionCreate, user_id: int):
     """
@@ -59,15 +120,186 @@ def create_transaction(db: Session, transaction: TransactionCreate, user_id: int
         description=transaction.description
     )
     db.add(db_transaction)
+    apply_monthly_balance_delta(
+        db, user_id, transaction.date, transaction.type, transaction.category,
+        Decimal(str(transaction.amount)), 1
+    )
+    bump_data_version(db, user_data_scope(user_id))
     db.commit()
     db.refresh(db_transaction)
     return db_transaction
 
-def get_transactions(db: Session, user_id: int):
+def _filter_transactions(query, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                         tx_type: Optional[str] = None, category: Optional[str] = None,
+                         min_amount: Optional[float] = None, max_amount: Optional[float] = None):
+    """
+    Menerapkan filter opsional (rentang tanggal, tipe, kategori, rentang amount) ke query transaksi
+    """
+    if start_date is not None:
+        query = query.filter(Transaction.date >= start_date)
+    if end_date is not None:
+        query = query.filter(Transaction.date <= end_date)
+    if tx_type:
+        query = query.filter(Transaction.type == tx_type)
+    if category:
+        query = query.filter(Transaction.category == category)
+    if min_amount is not None:
+        query = query.filter(Transaction.amount >= Decimal(str(min_amount)))
+    if max_amount is not None:
+        query = query.filter(Transaction.amount <= Decimal(str(max_amount)))
+    return query
+
+def bulk_create_transactions(db: Session, transactions: List[TransactionCreate], user_id: int):
+    """
+    Menyimpan banyak transaksi dalam satu transaksi database (multi-row INSERT)
+    dan memperbarui rollup bulanan sekali per kombinasi bulan/tipe/kategori
+    """
+    if not transactions:
+        return 0
+
+    db.execute(insert(Transaction), [
+        {
+            "user_id": user_id,
+            "date": transaction.date,
+            "type": transaction.type,
+            "amount": Decimal(str(transaction.amount)),
+            "category": transaction.category,
+            "description": transaction.description,
+        }
+        for transaction in transactions
+    ])
+
+    deltas = {}
+    for transaction in transactions:
+        key = (transaction.date.replace(day=1), transaction.type, transaction.category)
+        amount, count = deltas.get(key, (Decimal("0"), 0))
+        deltas[key] = (amount + Decimal(str(transaction.amount)), count + 1)
+    for (month_start, tx_type, category), (amount, count) in deltas.items():
+        apply_monthly_balance_delta(db, user_id, month_start, tx_type, category, amount, count)
+
+    bump_data_version(db, user_data_scope(user_id))
+    db.commit()
+    return len(transactions)
+
+def get_transactions(db: Session, user_id: int, **filters):
     """
     Mengambil semua transaksi user, diurutkan berdasarkan tanggal terbaru
     """
-    return db.query(Transaction).filter(Transaction.user_id == user_id).order_by(Transaction.date.desc()).all()
+    query = _filter_transactions(db.query(Transaction).filter(Transaction.user_id == user_id), **filters)
+    return query.order_by(Transaction.date.desc(), Transaction.id.desc()).all()
+
+def get_transactions_page(db: Session, user_id: int, limit: int, after: Optional[Tuple[date, int]] = None, **filters):
+    """
+    Mengambil satu halaman transaksi dengan keyset pagination pada (date, id) terbaru dulu.
+    `after` adalah (date, id) transaksi terakhir di halaman sebelumnya.
+    Mengembalikan (items, has_more).
+    """
+    query = _filter_transactions(db.query(Transaction).filter(Transaction.user_id == user_id), **filters)
+    if after is not None:
+        after_date, after_id = after
+        query = query.filter(or_(
+            Transaction.date < after_date,
+            and_(Transaction.date == after_date, Transaction.id < after_id)
+        ))
+    rows = query.order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+def get_dashboard_summary(db: Session, user_id: int, today: Optional[date] = None):
+    """
+    Menghitung ringkasan dashboard dari tabel rollup bulanan (SUM/COUNT per tipe),
+    tanpa memuat seluruh transaksi user ke memori
+    """
+    today = today or date.today()
+    in_current_month = and_(MonthlyBalance.year == today.year, MonthlyBalance.month == today.month)
+
+    rows = db.query(
+        MonthlyBalance.type,
+        func.sum(MonthlyBalance.total_amount),
+        func.sum(case((in_current_month, MonthlyBalance.tx_count), else_=0))
+    ).filter(MonthlyBalance.user_id == user_id).group_by(MonthlyBalance.type).all()
+
+    totals = {"pemasukan": Decimal("0"), "pengeluaran": Decimal("0")}
+    count_this_month = 0
+    for tx_type, total_amount, month_count in rows:
+        if tx_type in totals:
+            totals[tx_type] = Decimal(total_amount or 0)
+        count_this_month += int(month_count or 0)
+
+    return {
+        "total_pemasukan": totals["pemasukan"],
+        "total_pengeluaran": totals["pengeluaran"],
+        "saldo_saat_ini": totals["pemasukan"] - totals["pengeluaran"],
+        "total_transaksi_bulan_ini": count_this_month
+    }
+
+def get_expense_totals_by_category(db: Session, user_id: int):
+    """
+    Total pengeluaran per kategori dari tabel rollup bulanan (untuk grafik kategori dashboard)
+    """
+    rows = db.query(MonthlyBalance.category, func.sum(MonthlyBalance.total_amount)).filter(
+        MonthlyBalance.user_id == user_id, MonthlyBalance.type == "pengeluaran"
+    ).group_by(MonthlyBalance.category).all()
+    return [(category, total) for category, total in rows if total]
+
+def get_report_summary(db: Session, user_id: int, start_date: date, end_date: date):
+    """
+    Menghitung total pemasukan, pengeluaran, dan total per kategori untuk laporan
+    dengan agregasi di database
+    """
+    rows = db.query(
+        Transaction.type, Transaction.category, func.sum(Transaction.amount)
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.date >= start_date,
+        Transaction.date <= end_date
+    ).group_by(Transaction.type, Transaction.category).order_by(Transaction.category).all()
+
+    totals = {"pemasukan": Decimal("0"), "pengeluaran": Decimal("0")}
+    categories = {}
+    for tx_type, category, amount in rows:
+        amount = Decimal(amount or 0)
+        if tx_type in totals:
+            totals[tx_type] += amount
+        categories[category] = categories.get(category, Decimal("0")) + amount
+    return {
+        "total_income": totals["pemasukan"],
+        "total_expense": totals["pengeluaran"],
+        "categories": categories,
+    }
+
+def iter_report_rows(db: Session, user_id: int, start_date: date, end_date: date, batch_size: int = 1000):
+    """
+    Mengambil transaksi dalam rentang tanggal secara bertahap sebagai tuple
+    (date, type, category, description, amount), terurut berdasarkan tanggal
+    """
+    query = db.query(
+        Transaction.date, Transaction.type, Transaction.category, Transaction.description, Transaction.amount
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.date >= start_date,
+        Transaction.date <= end_date
+    ).order_by(Transaction.date, Transaction.id).yield_per(batch_size)
+    for row in query:
+        yield tuple(row)
+
+def get_report_data_version(db: Session, user_id: int, user_name: str) -> str:
+    """
+    Kunci cache PDF laporan: versi data user (naik pada setiap penulisan transaksi) ditambah
+    hash nama user, karena nama ikut dicetak di laporan
+    """
+    name_hash = hashlib.sha256(user_name.encode("utf-8")).hexdigest()[:16]
+    return f"{get_data_version(db, user_data_scope(user_id))}:{name_hash}"
+
+def iter_transactions_by_date_range(db: Session, user_id: int, start_date: date, end_date: date, batch_size: int = 1000):
+    """
+    Mengambil transaksi dalam rentang tanggal secara bertahap (server-side cursor)
+    sehingga memori tetap konstan untuk rentang data yang besar
+    """
+    return db.query(Transaction).filter(
+        Transaction.user_id == user_id,
+        Transaction.date >= start_date,
+        Transaction.date <= end_date
+    ).order_by(Transaction.date, Transaction.id).yield_per(batch_size)
 
 def delete_transaction(db: Session, transaction_id: int, user_id: int):
     """
@@ -78,37 +310,260 @@ def delete_transaction(db: Session, transaction_id: int, user_id: int):
         Transaction.user_id == user_id
     ).first()
     if transaction:
+        apply_monthly_balance_delta(
+            db, user_id, transaction.date, transaction.type, transaction.category,
+            -Decimal(transaction.amount), -1
+        )
         db.delete(transaction)
+        bump_data_version(db, user_data_scope(user_id))
         db.commit()
         return True
     return False
 
-# Prediction and Recommendation functions
-def get_transactions_for_cashflow_prediction(db: Session, user_id: int, months_ago: int = 3):
+# Monthly balance rollup
+def apply_monthly_balance_delta(db: Session, user_id: int, tx_date: date, tx_type: str, category: str, amount_delta: Decimal, count_delta: int):
+    """
+    Menambahkan selisih amount/jumlah transaksi ke baris rollup bulanan (upsert).
+    Tidak melakukan commit, sehingga ikut dalam transaksi database pemanggil.
+    """
+    values = {
+        "user_id": user_id,
+        "year": tx_date.year,
+        "month": tx_date.month,
+        "type": tx_type,
+        "category": category,
+        "total_amount": amount_delta,
+        "tx_count": count_delta,
+    }
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(MonthlyBalance).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "year", "month", "type", "category"],
+            set_={
+                "total_amount": MonthlyBalance.total_amount + stmt.excluded.total_amount,
+                "tx_count": MonthlyBalance.tx_count + stmt.excluded.tx_count,
+            }
+        )
+        db.execute(stmt)
+        return
+
+    # Fallback untuk database tanpa dukungan ON CONFLICT
+    updated = db.query(MonthlyBalance).filter(
+        MonthlyBalance.user_id == user_id,
+        MonthlyBalance.year == tx_date.year,
+        MonthlyBalance.month == tx_date.month,
+        MonthlyBalance.type == tx_type,
+        MonthlyBalance.category == category
+    ).update({
+        MonthlyBalance.total_amount: MonthlyBalance.total_amount + amount_delta,
+        MonthlyBalance.tx_count: MonthlyBalance.tx_count + count_delta,
+    }, synchronize_session=False)
+    if not updated:
+        db.execute(insert(MonthlyBalance).values(**values))
+
+def rebuild_monthly_balances(db: Session, user_id: Optional[int] = None):
     """
-    Mengambil transaksi untuk prediksi cashflow (3 bulan terakhir)
+    Menghitung ulang tabel rollup bulanan dari tabel transactions.
+    Jika user_id diberikan, hanya rollup milik user tersebut yang dibangun ulang.
     """
-    three_months_ago = datetime.now() - timedelta(days=months_ago * 30) # Approx 30 days per month
-    return db.query(Transaction).filter(
-        Transaction.user_id == user_id,
-        Transaction.created_at >= three_months_ago
-    ).all()
+    delete_query = db.query(MonthlyBalance)
+    if user_id is not None:
+        delete_query = delete_query.filter(MonthlyBalance.user_id == user_id)
+    delete_query.delete(synchronize_session=False)
+
+    year_col = extract("year", Transaction.date)
+    month_col = extract("month", Transaction.date)
+    source = select(
+        Transaction.user_id,
+        year_col,
+        month_col,
+        Transaction.type,
+        Transaction.category,
+        func.sum(Transaction.amount),
+        func.count(Transaction.id)
+    ).group_by(Transaction.user_id, year_col, month_col, Transaction.type, Transaction.category)
+    if user_id is not None:
+        source = source.where(Transaction.user_id == user_id)
+
+    result = db.execute(insert(MonthlyBalance).from_select(
+        ["user_id", "year", "month", "type", "category", "total_amount", "tx_count"], source
+    ))
+    # Dashboard dihitung dari rollup, sehingga ETag yang sudah ada tidak lagi berlaku
+    if user_id is not None:
+        bump_data_version(db, user_data_scope(user_id))
+    else:
+        db.query(DataVersion).filter(DataVersion.scope.like("user:%")).update(
+            {DataVersion.version: DataVersion.version + 1}, synchronize_session=False
+        )
+    db.commit()
+    return result.rowcount
 
-def create_cashflow_prediction(db: Session, user_id: int, predicted_income: float, predicted_expense: float, insight: str):
+def monthly_balances_need_rebuild(db: Session):
     """
-    Menyimpan hasil prediksi cashflow untuk bulan depan
+    True jika tabel rollup masih kosong padahal sudah ada transaksi (mis. setelah tabel baru dibuat)
     """
-    prediction = CashFlowPrediction(
-        user_id=user_id,
-        predicted_income=predicted_income,
-        predicted_expense=predicted_expense,
-        prediction_date=date.today() + timedelta(days=30),
-        insight=insight
+    has_rollup = db.query(MonthlyBalance.id).first() is not None
+    return not has_rollup and db.query(Transaction.id).first() is not None
+
+def get_monthly_balances(db: Session, user_id: int, start: Optional[date] = None, end: Optional[date] = None):
+    """
+    Mengambil baris rollup bulanan user, opsional dibatasi bulan `start` s/d `end` (inklusif)
+    """
+    query = db.query(MonthlyBalance).filter(MonthlyBalance.user_id == user_id)
+    period = MonthlyBalance.year * 100 + MonthlyBalance.month
+    if start is not None:
+        query = query.filter(period >= start.year * 100 + start.month)
+    if end is not None:
+        query = query.filter(period <= end.year * 100 + end.month)
+    return query.order_by(MonthlyBalance.year, MonthlyBalance.month).all()
+
+# Prediction and Recommendation functions
+def _monthly_cashflow_query(db: Session, start: Optional[date] = None, end: Optional[date] = None):
+    query = db.query(
+        MonthlyBalance.user_id, MonthlyBalance.year, MonthlyBalance.month, MonthlyBalance.type, func.sum(MonthlyBalance.total_amount)
     )
-    db.add(prediction)
+    period = MonthlyBalance.year * 100 + MonthlyBalance.month
+    if start is not None:
+        query = query.filter(period >= start.year * 100 + start.month)
+    if end is not None:
+        query = query.filter(period <= end.year * 100 + end.month)
+    return query.group_by(MonthlyBalance.user_id, MonthlyBalance.year, MonthlyBalance.month, MonthlyBalance.type)
+
+def get_monthly_cashflow_totals(db: Session, user_id: int, start: Optional[date] = None, end: Optional[date] = None):
+    """
+    Total pemasukan/pengeluaran per bulan dari tabel rollup sebagai baris (year, month, type, total),
+    opsional dibatasi bulan `start` s/d `end` (inklusif). Dipakai untuk forecast arus kas.
+    """
+    query = _monthly_cashflow_query(db, start, end).filter(MonthlyBalance.user_id == user_id)
+    return [(year, month, tx_type, total) for _, year, month, tx_type, total in query]
+
+def get_monthly_cashflow_totals_for_users(db: Session, user_ids: List[int]) -> Dict[int, List[Tuple[int, int, str, float]]]:
+    """
+    Seperti get_monthly_cashflow_totals untuk banyak user dalam satu query, dikelompokkan per user_id
+    (total sudah dalam float). User tanpa rollup tidak ada di hasil.
+    """
+    totals: Dict[int, List[Tuple[int, int, str, float]]] = {}
+    for user_id, year, month, tx_type, total in _monthly_cashflow_query(db).filter(MonthlyBalance.user_id.in_(user_ids)):
+        totals.setdefault(user_id, []).append((int(year), int(month), tx_type, float(total)))
+    return totals
+
+def iter_user_id_chunks(db: Session, chunk_size: int = 1000):
+    """
+    Menghasilkan id semua user per potongan (keyset pada id), untuk job batch
+    """
+    last_id = 0
+    while True:
+        ids = [row[0] for row in db.query(User.id).filter(User.id > last_id).order_by(User.id).limit(chunk_size)]
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+def get_user_data_versions(db: Session, user_ids: List[int]) -> Dict[int, int]:
+    """
+    Versi data (lihat get_data_version) banyak user sekaligus; user yang belum pernah menulis bernilai 0
+    """
+    scopes = {user_data_scope(user_id): user_id for user_id in user_ids}
+    versions = dict.fromkeys(user_ids, 0)
+    for scope, version in db.query(DataVersion.scope, DataVersion.version).filter(DataVersion.scope.in_(scopes)):
+        versions[scopes[scope]] = version
+    return versions
+
+def get_cashflow_prediction(db: Session, user_id: int, prediction_date: date):
+    return db.query(CashFlowPrediction).filter(
+        CashFlowPrediction.user_id == user_id,
+        CashFlowPrediction.prediction_date == prediction_date
+    ).first()
+
+def get_cashflow_prediction_versions(db: Session, user_ids: List[int], prediction_date: date) -> Dict[int, Optional[int]]:
+    """
+    data_version prediksi tersimpan untuk bulan prediction_date per user (user tanpa prediksi tidak ada di hasil)
+    """
+    return dict(db.query(CashFlowPrediction.user_id, CashFlowPrediction.data_version).filter(
+        CashFlowPrediction.user_id.in_(user_ids),
+        CashFlowPrediction.prediction_date == prediction_date
+    ).all())
+
+def cashflow_prediction_values(user_id: int, forecast: CashflowForecast, data_version: int, insight: Optional[str] = None) -> dict:
+    """
+    Nilai kolom CashFlowPrediction untuk hasil forecast (lihat upsert_cashflow_predictions)
+    """
+    return {
+        "user_id": user_id,
+        "prediction_date": forecast.month,
+        "predicted_income": forecast.income,
+        "predicted_expense": forecast.expense,
+        "income_lower": forecast.income_lower,
+        "income_upper": forecast.income_upper,
+        "expense_lower": forecast.expense_lower,
+        "expense_upper": forecast.expense_upper,
+        "method": forecast.method,
+        "data_version": data_version,
+        "insight": insight,
+        "created_at": datetime.utcnow(),
+    }
+
+def upsert_cashflow_predictions(db: Session, rows: List[dict]):
+    """
+    Menyimpan banyak prediksi sekaligus (lihat cashflow_prediction_values). Prediksi yang sudah ada
+    untuk user dan bulan yang sama ditimpa, termasuk insight-nya (insight lama tidak lagi sesuai angka baru).
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(CashFlowPrediction)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "prediction_date"],
+            set_={column: stmt.excluded[column] for column in rows[0] if column not in ("user_id", "prediction_date")}
+        )
+        db.execute(stmt, rows)
+    else:
+        # Fallback untuk database tanpa dukungan ON CONFLICT
+        for values in rows:
+            updated = db.query(CashFlowPrediction).filter(
+                CashFlowPrediction.user_id == values["user_id"],
+                CashFlowPrediction.prediction_date == values["prediction_date"]
+            ).update(values, synchronize_session=False)
+            if not updated:
+                db.execute(insert(CashFlowPrediction).values(**values))
+    db.commit()
+
+def set_cashflow_prediction_insight(db: Session, user_id: int, prediction_date: date, data_version: int, insight: str) -> bool:
+    """
+    Menyimpan insight LLM ke prediksi tersimpan, hanya jika prediksi itu masih dihitung dari versi data
+    yang sama (prediksi yang lebih baru tidak ditimpa insight lama)
+    """
+    updated = db.query(CashFlowPrediction).filter(
+        CashFlowPrediction.user_id == user_id,
+        CashFlowPrediction.prediction_date == prediction_date,
+        CashFlowPrediction.data_version == data_version
+    ).update({CashFlowPrediction.insight: insight}, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+def cashflow_predictions_need_dedupe(db: Session) -> bool:
+    """
+    True jika unique index prediksi (user_id, prediction_date) belum ada; versi lama menyimpan
+    satu baris baru setiap kali prediksi dibuat
+    """
+    inspector = inspect(db.get_bind())
+    if not inspector.has_table(CashFlowPrediction.__tablename__):
+        return False
+    names = {index["name"] for index in inspector.get_indexes(CashFlowPrediction.__tablename__)}
+    return "uq_cash_flow_predictions_user_month" not in names
+
+def dedupe_cashflow_predictions(db: Session) -> int:
+    """
+    Menyisakan prediksi terbaru per user dan prediction_date. Mengembalikan jumlah baris yang dihapus.
+    """
+    latest = select(func.max(CashFlowPrediction.id)).group_by(CashFlowPrediction.user_id, CashFlowPrediction.prediction_date)
+    removed = db.query(CashFlowPrediction).filter(CashFlowPrediction.id.not_in(latest)).delete(synchronize_session=False)
     db.commit()
-    db.refresh(prediction)
-    return prediction
+    return removed
 
 def create_business_recommendation(db: Session, user_id: int, modal: float, minat: Optional[str], lokasi: Optional[str], recommendations: dict):
     """
@@ -135,21 +590,26 @@ def update_user_profile(db: Session, user_id: int, name: str):
     if user:
         user.name = name
         user.updated_at = datetime.utcnow()
+        # Nama pemilik post tampil di feed komunitas
+        bump_data_version(db, COMMUNITY_SCOPE)
         db.commit()
         db.refresh(user)
+        user_cache.invalidate(user.email)
         return user
     return None
 
-def change_user_password(db: Session, user_id: int, new_password: str):
+def change_user_password(db: Session, user_id: int, new_password: str, password_hash: Optional[str] = None):
     """
     Mengganti password user dengan yang baru
+    (password_hash bisa diberikan jika sudah di-hash di pool hashing)
     """
     user = db.query(User).filter(User.id == user_id).first()
     if user:
-        user.password_hash = get_password_hash(new_password)
+        user.password_hash = password_hash or get_password_hash(new_password)
         user.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(user)
+        user_cache.invalidate(user.email)
         return user
     return None
 
@@ -163,22 +623,48 @@ def create_community_post(db: Session, post: CommunityPostCreate, user_id: int):
         title=post.title,
         content=post.content,
         category=post.category,
-        image_url=post.image_url
+        image_url=post.image_url,
+        thumbnail_url=post.thumbnail_url
     )
     db.add(db_post)
+    bump_data_version(db, COMMUNITY_SCOPE)
     db.commit()
     db.refresh(db_post)
+    feed_cache.invalidate()
     return db_post
 
 def get_community_posts(db: Session, skip: int = 0, limit: int = 20, category: Optional[str] = None):
     """
-    Mengambil daftar post community dengan pagination dan filter kategori
+    Mengambil daftar post community dengan pagination dan filter kategori.
+    Pemilik post ikut dimuat dalam query yang sama (hanya id dan nama).
     """
-    query = db.query(CommunityPost).filter(CommunityPost.is_active == True)
+    query = db.query(CommunityPost).options(
+        joinedload(CommunityPost.owner).load_only(User.id, User.name)
+    ).filter(CommunityPost.is_active == True)
     if category:
         query = query.filter(CommunityPost.category == category)
     return query.order_by(CommunityPost.created_at.desc()).offset(skip).limit(limit).all()
 
+def get_community_feed_page(db: Session, limit: int, after: Optional[Tuple[datetime, int]] = None, category: Optional[str] = None):
+    """
+    Mengambil satu halaman feed community dengan keyset pagination pada (created_at, id) terbaru dulu.
+    `after` adalah (created_at, id) post terakhir di halaman sebelumnya.
+    Mengembalikan (items, has_more).
+    """
+    query = db.query(CommunityPost).options(
+        joinedload(CommunityPost.owner).load_only(User.id, User.name)
+    ).filter(CommunityPost.is_active == True)
+    if category:
+        query = query.filter(CommunityPost.category == category)
+    if after is not None:
+        after_created_at, after_id = after
+        query = query.filter(or_(
+            CommunityPost.created_at < after_created_at,
+            and_(CommunityPost.created_at == after_created_at, CommunityPost.id < after_id)
+        ))
+    rows = query.order_by(CommunityPost.created_at.desc(), CommunityPost.id.desc()).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
 def get_community_post(db: Session, post_id: int):
     """
     Mengambil detail post community berdasarkan ID
@@ -187,38 +673,62 @@ def get_community_post(db: Session, post_id: int):
         and_(CommunityPost.id == post_id, CommunityPost.is_active == True)
     ).first()
 
-def like_post(db: Session, post_id: int, user_id: int):
+def _increment_post_counter(db: Session, post_id: int, column, delta: int) -> Optional[int]:
     """
-    Toggle like/unlike post. Return True jika liked, False jika unliked
+    Mengubah counter post di database (SET x = x + delta) sehingga update bersamaan tidak hilang.
+    Mengembalikan nilai terbaru (None jika post tidak ada). Tidak melakukan commit.
     """
-    # Check if already liked
-    existing_like = db.query(CommunityLike).filter(
-        and_(CommunityLike.post_id == post_id, CommunityLike.user_id == user_id)
-    ).first()
-    
-    if existing_like:
-        # Unlike - remove the like
-        db.delete(existing_like)
-        
-        # Decrease like count
-        post = db.query(CommunityPost).filter(CommunityPost.id == post_id).first()
-        if post:
-            post.likes_count = max(0, post.likes_count - 1)
-        
-        db.commit()
+    stmt = update(CommunityPost).where(CommunityPost.id == post_id).values({column: column + delta}) \
+        .execution_options(synchronize_session=False)
+    if db.get_bind().dialect.update_returning:
+        return db.execute(stmt.returning(column)).scalar()
+    db.execute(stmt)
+    return db.query(column).filter(CommunityPost.id == post_id).scalar()
+
+def _insert_like_if_absent(db: Session, post_id: int, user_id: int) -> bool:
+    """
+    Menambahkan like dalam satu statement; False jika like yang sama sudah ada (unique index post_id, user_id)
+    """
+    values = {"post_id": post_id, "user_id": user_id}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(CommunityLike).values(**values).on_conflict_do_nothing(index_elements=["post_id", "user_id"])
+        return db.execute(stmt).rowcount > 0
+
+    # Fallback untuk database tanpa dukungan ON CONFLICT
+    try:
+        with db.begin_nested():
+            db.execute(insert(CommunityLike).values(**values))
+        return True
+    except IntegrityError:
         return False
-    else:
-        # Like - add new like
-        new_like = CommunityLike(post_id=post_id, user_id=user_id)
-        db.add(new_like)
-        
-        # Increase like count
-        post = db.query(CommunityPost).filter(CommunityPost.id == post_id).first()
-        if post:
-            post.likes_count = post.likes_count + 1
-        
+
+def like_post(db: Session, post_id: int, user_id: int):
+    """
+    Toggle like/unlike post secara atomik. Mengembalikan (liked, likes_count terbaru).
+    Like dihapus/ditambah dengan satu statement dan counter diubah di database,
+    sehingga klik ganda bersamaan tidak membuat like dobel atau counter yang meleset.
+    """
+    unliked = db.execute(
+        delete(CommunityLike)
+        .where(CommunityLike.post_id == post_id, CommunityLike.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if unliked:
+        likes_count = _increment_post_counter(db, post_id, CommunityPost.likes_count, -unliked)
+        bump_data_version(db, COMMUNITY_SCOPE)
         db.commit()
-        return True
+        return False, likes_count
+
+    if _insert_like_if_absent(db, post_id, user_id):
+        likes_count = _increment_post_counter(db, post_id, CommunityPost.likes_count, 1)
+        bump_data_version(db, COMMUNITY_SCOPE)
+    else:
+        # Request lain dari user yang sama baru saja menambahkan like ini
+        likes_count = db.query(CommunityPost.likes_count).filter(CommunityPost.id == post_id).scalar()
+    db.commit()
+    return True, likes_count
 
 def create_comment(db: Session, comment: CommunityCommentCreate, post_id: int, user_id: int):
     """
@@ -230,11 +740,11 @@ def create_comment(db: Session, comment: CommunityCommentCreate, post_id: int, u
         content=comment.content
     )
     db.add(db_comment)
+    db.flush()
     
-    # Update comment count
-    post = db.query(CommunityPost).filter(CommunityPost.id == post_id).first()
-    if post:
-        post.comments_count = post.comments_count + 1
+    # Update comment count di database (atomik), dalam transaksi yang sama dengan komentar
+    _increment_post_counter(db, post_id, CommunityPost.comments_count, 1)
+    bump_data_version(db, COMMUNITY_SCOPE)
     
     db.commit()
     db.refresh(db_comment)
@@ -242,9 +752,12 @@ def create_comment(db: Session, comment: CommunityCommentCreate, post_id: int, u
 
 def get_post_comments(db: Session, post_id: int):
     """
-    Mengambil semua komentar pada post tertentu, diurutkan dari yang terlama
+    Mengambil semua komentar pada post tertentu, diurutkan dari yang terlama.
+    Penulis komentar ikut dimuat dalam query yang sama (hanya id dan nama).
     """
-    return db.query(CommunityComment).filter(
+    return db.query(CommunityComment).options(
+        joinedload(CommunityComment.author).load_only(User.id, User.name)
+    ).filter(
         CommunityComment.post_id == post_id
     ).order_by(CommunityComment.created_at.asc()).all()
 
@@ -260,6 +773,36 @@ def delete_community_post(db: Session, post_id: int):
     post = db.query(CommunityPost).filter(CommunityPost.id == post_id).first()
     if post:
         db.delete(post)
+        bump_data_version(db, COMMUNITY_SCOPE)
         db.commit()
+        feed_cache.invalidate()
         return True
-    return False
\ No newline at end of file
+    return False
+
+def community_likes_need_repair(db: Session) -> bool:
+    """
+    True jika unique index like (post_id, user_id) belum ada, artinya data dari versi lama
+    mungkin berisi like ganda yang harus dibersihkan sebelum index dibuat
+    """
+    inspector = inspect(db.get_bind())
+    if not inspector.has_table(CommunityLike.__tablename__):
+        return False
+    names = {index["name"] for index in inspector.get_indexes(CommunityLike.__tablename__)}
+    return "uq_community_likes_post_user" not in names
+
+def repair_community_counters(db: Session) -> int:
+    """
+    Menghapus like ganda (menyisakan yang pertama) lalu menghitung ulang likes_count dan
+    comments_count semua post dari tabel like/komentar. Mengembalikan jumlah like ganda yang dihapus.
+    """
+    first_likes = select(func.min(CommunityLike.id)).group_by(CommunityLike.post_id, CommunityLike.user_id)
+    removed = db.query(CommunityLike).filter(CommunityLike.id.not_in(first_likes)).delete(synchronize_session=False)
+
+    likes = select(func.count(CommunityLike.id)).where(CommunityLike.post_id == CommunityPost.id).scalar_subquery()
+    comments = select(func.count(CommunityComment.id)).where(CommunityComment.post_id == CommunityPost.id).scalar_subquery()
+    db.query(CommunityPost).update({
+        CommunityPost.likes_count: likes,
+        CommunityPost.comments_count: comments,
+    }, synchronize_session=False)
+    db.commit()
+    return removed
\ No newline at end of file
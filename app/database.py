@@ -1,17 +1,74 @@
 # app/database.py
-from sqlalchemy import create_engine
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
-from app.config import DATABASE_URL
+from app.config import DATABASE_URL, DB_EXECUTOR_MODE, DB_EXECUTOR_WORKERS, DB_POOL_SIZE, DB_MAX_OVERFLOW
 
-engine = create_engine(DATABASE_URL)
+# SQLite (untuk development) tidak mendukung pengaturan ukuran pool
+engine_options = {} if DATABASE_URL.startswith("sqlite") else {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_pre_ping": True,
+}
+engine = create_engine(DATABASE_URL, **engine_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def create_db_executor(mode: str):
+    """
+    Membuat thread pool database sesuai konfigurasi DB_EXECUTOR_MODE (None untuk mode "inline")
+    """
+    if mode == "threadpool":
+        return ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+    if mode == "inline":
+        return None
+    raise ValueError(f"DB_EXECUTOR_MODE tidak dikenal: {mode}")
+
+# Thread pool khusus untuk query database, ukurannya disamakan dengan connection pool
+db_executor = create_db_executor(DB_EXECUTOR_MODE)
+
 # Database dependency
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def add_missing_columns():
+    """
+    Menambahkan kolom nullable baru dari model ke tabel yang sudah ada
+    (create_all hanya membuat tabel yang belum ada)
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                    print(f"Added column {table.name}.{column.name}")
+
+async def run_db(func, *args, **kwargs):
+    """
+    Menjalankan fungsi database yang blocking tanpa menahan event loop.
+    Pada mode "inline" fungsi dipanggil langsung seperti sebelumnya.
+    """
+    if db_executor is None:
+        return func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
+
+def shutdown_db_executor():
+    """
+    Menghentikan thread pool database saat aplikasi dimatikan
+    """
+    if db_executor is not None:
+        db_executor.shutdown(wait=True)
@@ -1,17 +1,21 @@
 # app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
 from starlette.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
 import time
 import sys
 
-from app.config import IS_PROD, BASE_URL
-from app.database import Base, engine
+from app.config import IS_PROD, BASE_URL, METRICS_ENABLED
+from app.database import Base, engine, SessionLocal, shutdown_db_executor, add_missing_columns
+from app import crud
+from app.services.report_service import shutdown_report_executor
+from app.services.password_hasher import shutdown_password_executor
+from app.services.image_service import shutdown_image_executor, UploadSizeLimitMiddleware
+from app.services.llm_service import get_llm_client, close_llm_client
+from app.services.static_assets import asset_store, asset_response, AssetStaticFiles, REVALIDATE_CACHE
 
 # Import routers
-from app.routers import users, transactions, dashboard, predictions, recommendations, analysis, community, reports
+from app.routers import users, transactions, dashboard, predictions, recommendations, analysis, community, reports, metrics, insights
 
 app = FastAPI(
     docs_url=None if IS_PROD else "/docs",
@@ -22,6 +26,9 @@ app = FastAPI(
     description="API untuk aplikasi FinSight - Manajemen Keuangan Pribadi",
 )
 
+# Batasi ukuran body upload gambar sebelum di-spool ke disk oleh parser multipart
+app.add_middleware(UploadSizeLimitMiddleware, paths=["/community/posts"])
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -31,24 +38,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Mount static files (terkompresi, ETag dan URL ber-hash untuk cache permanen)
+app.mount("/static", AssetStaticFiles(directory="static"), name="static")
+
+def _serve_page(request: Request, name: str):
+    asset = asset_store.page(name)
+    if asset is None:
+        return FileResponse(name)
+    return asset_response(asset, request.headers, REVALIDATE_CACHE)
 
 # Route untuk melayani index.html saat root URL diakses
 @app.get("/")
-async def read_root():
-    return FileResponse("landing.html")  # Changed from index.html to landing.html
+async def read_root(request: Request):
+    return _serve_page(request, "landing.html")  # Changed from index.html to landing.html
 
 @app.get("/index.html")
-async def serve_app():
-    return FileResponse("index.html")
+async def serve_app(request: Request):
+    return _serve_page(request, "index.html")
 
 @app.get("/config.js")
-def get_config():
-    return Response(
-        content=f'window.env = {{ BASE_URL: "{BASE_URL}" }};',
-        media_type="application/javascript"
-    )
+async def get_config(request: Request):
+    # Isi config.js dibuat sekali saat startup
+    return asset_response(asset_store.page("config.js"), request.headers, REVALIDATE_CACHE)
 
 # Include routers
 app.include_router(users.router)
@@ -59,6 +70,9 @@ app.include_router(recommendations.router)
 app.include_router(analysis.router)
 app.include_router(community.router)
 app.include_router(reports.router)
+if METRICS_ENABLED:
+    app.include_router(metrics.router)
+app.include_router(insights.router)
 
 # Create tables
 @app.on_event("startup")
@@ -70,6 +84,24 @@ def on_startup():
         try:
             print(f"Attempting to connect to database (attempt {attempt + 1}/{max_retries})...")
             Base.metadata.create_all(bind=engine)
+            # create_all tidak menambahkan kolom baru ke tabel yang sudah ada
+            add_missing_columns()
+            # Data ganda dari versi lama harus dibersihkan sebelum unique index bisa dibuat
+            db = SessionLocal()
+            try:
+                if crud.community_likes_need_repair(db):
+                    removed = crud.repair_community_counters(db)
+                    print(f"Community likes repaired ({removed} duplicate likes removed)")
+                # Versi lama menyimpan satu baris prediksi per permintaan; sisakan yang terbaru per bulan
+                if crud.cashflow_predictions_need_dedupe(db):
+                    removed = crud.dedupe_cashflow_predictions(db)
+                    print(f"Cash flow predictions deduplicated ({removed} old rows removed)")
+            finally:
+                db.close()
+            # create_all tidak menambahkan index baru ke tabel yang sudah ada
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=engine, checkfirst=True)
             print("Database connection successful!")
             break
         except Exception as e:
@@ -81,6 +113,35 @@ def on_startup():
                 print("Max retries reached. Exiting...")
                 sys.exit(1)
 
+    # Bangun rollup bulanan sekali jika tabelnya baru dibuat untuk data yang sudah ada
+    db = SessionLocal()
+    try:
+        if crud.monthly_balances_need_rebuild(db):
+            print("Rebuilding monthly balance rollup...")
+            crud.rebuild_monthly_balances(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def load_static_assets():
+    asset_store.build()
+
+@app.on_event("startup")
+async def start_llm_client():
+    # HTTP client LLM dipakai bersama selama aplikasi hidup
+    get_llm_client()
+
+@app.on_event("shutdown")
+async def stop_llm_client():
+    await close_llm_client()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    shutdown_db_executor()
+    shutdown_report_executor()
+    shutdown_password_executor()
+    shutdown_image_executor()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True if not IS_PROD else False)
\ No newline at end of file
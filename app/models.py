@@ -1,5 +1,5 @@
 # app/models.py
-from sqlalchemy import Column, Integer, String, DateTime, Text, Date, JSON, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Date, JSON, Boolean, ForeignKey, UniqueConstraint, Index, LargeBinary
 from sqlalchemy.types import DECIMAL
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -20,6 +20,10 @@ class User(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Mendukung listing keyset (date, id) per user
+        Index("ix_transactions_user_date_id", "user_id", "date", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False, index=True)
@@ -31,6 +35,82 @@ class Transaction(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class MonthlyBalance(Base):
+    """
+    Rollup total transaksi per user per bulan, tipe, dan kategori.
+    Diperbarui setiap kali transaksi dibuat/dihapus (lihat crud.apply_monthly_balance_delta).
+    """
+    __tablename__ = "monthly_balances"
+    __table_args__ = (
+        UniqueConstraint("user_id", "year", "month", "type", "category", name="uq_monthly_balances_key"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    type = Column(String(20), nullable=False)
+    category = Column(String(100), nullable=False)
+    total_amount = Column(DECIMAL(18, 2), nullable=False, default=0)
+    tx_count = Column(Integer, nullable=False, default=0)
+
+class DataVersion(Base):
+    """
+    Nomor versi data per scope ("user:<id>" untuk transaksi user, "community" untuk feed komunitas).
+    Dinaikkan setiap penulisan di crud dan dipakai sebagai ETag endpoint baca (lihat services/etags.py).
+    """
+    __tablename__ = "data_versions"
+    
+    scope = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class ReportJob(Base):
+    """
+    Job pembuatan laporan PDF beserta hasilnya (dipakai oleh backend job "sql")
+    """
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        Index("ix_report_jobs_lookup", "user_id", "start_date", "end_date", "data_version"),
+    )
+    
+    id = Column(String(36), primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    data_version = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, done, failed
+    error = Column(Text)
+    pdf = Column(LargeBinary)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+class InsightJob(Base):
+    """
+    Job insight AI yang dikerjakan di background (dipakai oleh backend job insight "sql")
+    """
+    __tablename__ = "insight_jobs"
+    
+    id = Column(String(36), primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    kind = Column(String(20), nullable=False)  # feasibility, cashflow
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, done, failed
+    insight = Column(Text)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime)
+
+class LLMCacheEntry(Base):
+    """
+    Cache respons LLM bersama antar worker (dipakai oleh backend cache "sql")
+    """
+    __tablename__ = "llm_cache_entries"
+    
+    key = Column(String(64), primary_key=True)  # sha256 dari model + prompt yang dinormalisasi
+    model = Column(String(100), nullable=False)
+    value = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
 class BusinessRecommendation(Base):
     __tablename__ = "business_recommendations"
     
@@ -43,7 +123,15 @@ class BusinessRecommendation(Base):
     generated_at = Column(DateTime, default=datetime.utcnow)
 
 class CashFlowPrediction(Base):
+    """
+    Prediksi arus kas terakhir per user per bulan yang diprediksi (prediction_date = tanggal 1 bulan itu).
+    Diisi job batch (python -m app.cli forecast-batch) atau endpoint /predictions/cashflow; masih berlaku
+    selama data_version sama dengan versi data user saat ini.
+    """
     __tablename__ = "cash_flow_predictions"
+    __table_args__ = (
+        Index("uq_cash_flow_predictions_user_month", "user_id", "prediction_date", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False, index=True)
@@ -52,15 +140,27 @@ class CashFlowPrediction(Base):
     prediction_date = Column(Date, nullable=False)
     insight = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+    method = Column(String(20))
+    income_lower = Column(DECIMAL(15, 2))
+    income_upper = Column(DECIMAL(15, 2))
+    expense_lower = Column(DECIMAL(15, 2))
+    expense_upper = Column(DECIMAL(15, 2))
+    data_version = Column(Integer) # Versi data user (data_versions) saat prediksi dihitung
 
 class CommunityPost(Base):
     __tablename__ = "community_posts"
+    __table_args__ = (
+        # Keyset pagination feed: terbaru dulu, semua kategori atau per kategori
+        Index("ix_community_posts_feed", "is_active", "created_at", "id"),
+        Index("ix_community_posts_category_feed", "category", "is_active", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     title = Column(String(200), nullable=False)
     content = Column(Text, nullable=False)
     image_url = Column(String(500), nullable=True)  # URL untuk foto yang diupload
+    thumbnail_url = Column(String(500), nullable=True)  # Versi kecil foto untuk feed
     category = Column(String(50), nullable=False)  # achievement, tips, question, etc.
     likes_count = Column(Integer, default=0)
     comments_count = Column(Integer, default=0)
@@ -86,6 +186,10 @@ class CommunityComment(Base):
 
 class CommunityLike(Base):
     __tablename__ = "community_likes"
+    __table_args__ = (
+        # Satu like per user per post; dipakai juga untuk ON CONFLICT saat toggle like
+        Index("uq_community_likes_post_user", "post_id", "user_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("community_posts.id"), nullable=False, index=True)
@@ -1,11 +1,14 @@
 # app/routers/analysis.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app import schemas
-from app.database import get_db
+from app.database import get_db, run_db
 from app.auth import get_current_user
 from app.models import User
-from app.services.llm_service import get_llm_insight 
+from app.services.llm_service import get_llm_insight, stream_insight_events, SSE_HEADERS
+from app.services.llm_cache import bucket_number
+from app.services.insight_jobs import insight_job_backend, run_insight_job
 from typing import Optional 
 import math 
 
@@ -14,14 +17,10 @@ router = APIRouter(
     tags=["Analysis"]
 )
 
-@router.post("/feasibility", response_model=schemas.FeasibilityAnalysisResponse)
-async def analyze_feasibility(
-    modal_awal: float,
-    biaya_operasional: float,
-    estimasi_pemasukan: float,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+def _feasibility_analysis(modal_awal: float, biaya_operasional: float, estimasi_pemasukan: float):
+    """
+    Menghitung angka kelayakan bisnis dan menyusun prompt insight untuk LLM
+    """
     profit_bersih = estimasi_pemasukan - biaya_operasional
     
     roi = (profit_bersih / modal_awal) * 100 if modal_awal != 0 else 0 
@@ -39,7 +38,7 @@ async def analyze_feasibility(
             feasibility_status_numeric = "Tidak Layak" 
         else:
             break_even_months_display = calculated_bep
-            break_even_months_for_llm = f"{calculated_bep:.1f} bulan"
+            break_even_months_for_llm = f"{bucket_number(calculated_bep):.1f} bulan"
             feasibility_status_numeric = "Layak" if calculated_bep <= 12 else "Kurang Layak"
     else:
         break_even_months_display = None
@@ -49,17 +48,59 @@ async def analyze_feasibility(
     profit_bersih_float = float(profit_bersih)
     roi_float = float(roi)
 
-    # Prompt LLM tanpa menyertakan status numerik, karena itu akan ditangani di frontend
-    llm_prompt = f"""Seorang pemilik UMKM melakukan analisis kelayakan bisnis dengan modal awal Rp {modal_awal:,.0f}, biaya operasional bulanan Rp {biaya_operasional:,.0f}, dan estimasi pemasukan bulanan Rp {estimasi_pemasukan:,.0f}.
-    Hasil perhitungannya adalah: profit bersih bulanan Rp {profit_bersih_float:,.0f}, ROI {roi_float:.2f}%, dan perkiraan waktu balik modal {break_even_months_for_llm}.
+    # Prompt LLM tanpa menyertakan status numerik, karena itu akan ditangani di frontend.
+    # Angka di prompt dibulatkan (jika bucketing cache aktif) agar input yang hampir sama berbagi cache.
+    llm_prompt = f"""Seorang pemilik UMKM melakukan analisis kelayakan bisnis dengan modal awal Rp {bucket_number(modal_awal):,.0f}, biaya operasional bulanan Rp {bucket_number(biaya_operasional):,.0f}, dan estimasi pemasukan bulanan Rp {bucket_number(estimasi_pemasukan):,.0f}.
+    Hasil perhitungannya adalah: profit bersih bulanan Rp {bucket_number(profit_bersih_float):,.0f}, ROI {bucket_number(roi_float):.2f}%, dan perkiraan waktu balik modal {break_even_months_for_llm}.
     Berikan analisis singkat dan saran strategis (maksimal 3-4 kalimat) berdasarkan angka-angka tersebut, dari perspektif seorang konsultan bisnis."""
+
+    result = {
+        "profit_bersih": profit_bersih_float,
+        "roi": roi_float,
+        "break_even_months": break_even_months_display, 
+        "feasibility_status": feasibility_status_numeric # Mengembalikan status numerik
+    }
+    return result, llm_prompt
+
+@router.post("/feasibility", response_model=schemas.FeasibilityAnalysisResponse)
+async def analyze_feasibility(
+    modal_awal: float,
+    biaya_operasional: float,
+    estimasi_pemasukan: float,
+    background_tasks: BackgroundTasks,
+    async_insight: bool = Query(False, description="Kembalikan angka segera; insight AI dibuat di background (lihat /insights/jobs/{id})"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    result, llm_prompt = _feasibility_analysis(modal_awal, biaya_operasional, estimasi_pemasukan)
+    
+    if async_insight:
+        # Latensi dan gangguan LLM tidak mempengaruhi respons angka
+        job = await run_db(insight_job_backend.create_job, db, current_user.id, "feasibility")
+        background_tasks.add_task(run_insight_job, job["id"], llm_prompt)
+        return {**result, "insight_job_id": job["id"]}
     
     insight_from_llm = await get_llm_insight(llm_prompt)
     
     return {
-        "profit_bersih": profit_bersih_float,
-        "roi": roi_float,
-        "break_even_months": break_even_months_display, 
-        "feasibility_status": feasibility_status_numeric, # Mengembalikan status numerik
+        **result,
         "ai_insight": insight_from_llm # Mengembalikan insight LLM di field terpisah
     }
+
+@router.post("/feasibility/stream")
+async def analyze_feasibility_stream(
+    modal_awal: float,
+    biaya_operasional: float,
+    estimasi_pemasukan: float,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Sama seperti /feasibility, tetapi dikirim sebagai Server-Sent Events:
+    angka hasil perhitungan langsung dikirim, lalu insight AI per potongan teks.
+    """
+    result, llm_prompt = _feasibility_analysis(modal_awal, biaya_operasional, estimasi_pemasukan)
+    return StreamingResponse(
+        stream_insight_events(result, llm_prompt),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
@@ -1,23 +1,59 @@
 # app/routers/community.py
-from fastapi import APIRouter, Depends, HTTPException, File, Response, UploadFile, Form, status # Import status for HTTPException
+from fastapi import APIRouter, Depends, HTTPException, File, Query, Request, Response, UploadFile, Form, status # Import status for HTTPException
 from sqlalchemy.orm import Session
+from datetime import datetime
 from typing import List, Optional
-import os
-import uuid
-from pathlib import Path
+import base64
 from app import crud, schemas
-from app.database import get_db
+from app.database import get_db, run_db
 from app.auth import get_current_user
 from app.models import User
+from app.services.feed_cache import feed_cache
+from app.services.etags import versioned_response, check_version, not_modified_response, set_etag_headers
+from app.services.image_service import save_post_image, delete_uploaded_file
 
 router = APIRouter(
     prefix="/community",
     tags=["Community"]
 )
 
-# Pastikan direktori uploads ada
-UPLOAD_DIR = Path("static/uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+FEED_PAGE_SIZE = 20
+MAX_FEED_PAGE_SIZE = 100
+
+def encode_feed_cursor(created_at: datetime, post_id: int) -> str:
+    """
+    Membuat cursor opaque dari (created_at, id) post terakhir di halaman
+    """
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{post_id}".encode()).decode()
+
+def decode_feed_cursor(cursor: str):
+    """
+    Membaca kembali cursor feed menjadi (created_at, id)
+    """
+    try:
+        raw_created_at, raw_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(raw_created_at), int(raw_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+
+def _post_response(post):
+    # Pemilik post sudah dimuat bersama post (tanpa query per post)
+    user = post.owner
+    return {
+        "id": post.id,
+        "title": post.title,
+        "content": post.content,
+        "image_url": post.image_url,
+        "thumbnail_url": post.thumbnail_url,
+        "category": post.category,
+        "likes_count": post.likes_count,
+        "comments_count": post.comments_count,
+        "created_at": post.created_at,
+        "owner": {
+            "id": user.id,
+            "name": user.name
+        } if user else {"id": 0, "name": "Unknown"}
+    }
 
 @router.post("/posts", response_model=schemas.CommunityPostResponse)
 async def create_post(
@@ -28,30 +64,26 @@ async def create_post(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    # Dibaca sebelum commit: setelah commit atribut User kedaluwarsa dan akan dimuat ulang dengan query sinkron
+    owner = {"id": current_user.id, "name": current_user.name}
     image_url = None
+    thumbnail_url = None
     
-    # Handle image upload
-    if image and image.content_type.startswith('image/'):
-        # Generate unique filename
-        file_extension = image.filename.split('.')[-1]
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        file_path = UPLOAD_DIR / unique_filename
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content_bytes = await image.read()
-            buffer.write(content_bytes)
-        
-        image_url = f"/static/uploads/{unique_filename}"
+    # Handle image upload: divalidasi dari isinya, diperkecil dan di-encode ulang
+    if image and image.filename:
+        variants = await save_post_image(image)
+        image_url = variants["large"]
+        thumbnail_url = variants["thumb"]
     
     post_data = schemas.CommunityPostCreate(
         title=title,
         content=content,
         category=category,
-        image_url=image_url
+        image_url=image_url,
+        thumbnail_url=thumbnail_url
     )
     
-    post = crud.create_community_post(db, post_data, current_user.id)
+    post = await run_db(crud.create_community_post, db, post_data, owner["id"])
     
     # Return with user info
     return {
@@ -59,47 +91,70 @@ async def create_post(
         "title": post.title,
         "content": post.content,
         "image_url": post.image_url,
+        "thumbnail_url": post.thumbnail_url,
         "category": post.category,
         "likes_count": post.likes_count,
         "comments_count": post.comments_count,
         "created_at": post.created_at,
-        "owner": {
-            "id": current_user.id,
-            "name": current_user.name
-        }
+        "owner": owner
     }
 
 @router.get("/posts", response_model=List[schemas.CommunityPostResponse])
 async def get_posts(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
     category: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)  # Add authentication
 ):
+    key = ("posts", skip, limit, category)
+    return await versioned_response(request, response, db, crud.COMMUNITY_SCOPE, key, _list_posts, skip, limit, category)
+
+def _list_posts(db: Session, skip: int, limit: int, category: Optional[str]):
     posts = crud.get_community_posts(db, skip, limit, category)
-    
-    result = []
-    for post in posts:
-        # Get user by ID
-        user = db.query(User).filter(User.id == post.user_id).first()
-        
-        result.append({
-            "id": post.id,
-            "title": post.title,
-            "content": post.content,
-            "image_url": post.image_url,
-            "category": post.category,
-            "likes_count": post.likes_count,
-            "comments_count": post.comments_count,
-            "created_at": post.created_at,
-            "owner": {
-                "id": user.id,
-                "name": user.name
-            } if user else {"id": 0, "name": "Unknown"}
-        })
-    
-    return result
+    return [_post_response(post) for post in posts]
+
+@router.get("/feed", response_model=schemas.CommunityFeedPage)
+async def get_feed(
+    request: Request,
+    response: Response,
+    limit: int = Query(FEED_PAGE_SIZE, ge=1, le=MAX_FEED_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Nilai next_cursor dari halaman sebelumnya"),
+    category: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Feed komunitas dengan keyset pagination (terbaru dulu). Halaman pertama per kategori di-cache;
+    jika versi data komunitas belum berubah sejak ETag client, dibalas 304.
+    """
+    category = category or None
+    after = decode_feed_cursor(cursor) if cursor else None
+    etag, page = await run_db(_versioned_feed_page, db, limit, after, category, request.headers.get("if-none-match"))
+    if page is None:
+        return not_modified_response(etag)
+    set_etag_headers(response, etag)
+    return page
+
+def _versioned_feed_page(db: Session, limit: int, after, category: Optional[str], if_none_match: Optional[str]):
+    etag, version, not_modified = check_version(db, crud.COMMUNITY_SCOPE, ("feed", limit, after, category), if_none_match)
+    if not_modified:
+        return etag, None
+
+    cacheable = after is None and limit == FEED_PAGE_SIZE
+    page = feed_cache.get(category, version) if cacheable else None
+    if page is None:
+        page = _feed_page(db, limit, after, category)
+        if cacheable:
+            feed_cache.set(category, version, page)
+    return etag, page
+
+def _feed_page(db: Session, limit: int, after, category: Optional[str]):
+    posts, has_more = crud.get_community_feed_page(db, limit, after, category)
+    next_cursor = encode_feed_cursor(posts[-1].created_at, posts[-1].id) if has_more else None
+    return {"items": [_post_response(post) for post in posts], "next_cursor": next_cursor}
 
 @router.post("/posts/{post_id}/like")
 async def toggle_like(
@@ -107,12 +162,18 @@ async def toggle_like(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    post = crud.get_community_post(db, post_id)
-    if not post:
+    result = await run_db(_toggle_like, db, post_id, current_user.id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    is_liked = crud.like_post(db, post_id, current_user.id)
-    return {"liked": is_liked, "post_id": post_id}
+    is_liked, likes_count = result
+    return {"liked": is_liked, "post_id": post_id, "likes_count": likes_count}
+
+def _toggle_like(db: Session, post_id: int, user_id: int):
+    # Cek post dan toggle dalam satu panggilan executor agar koneksi tidak tertahan di antara keduanya
+    if not crud.get_community_post(db, post_id):
+        return None
+    return crud.like_post(db, post_id, user_id)
 
 @router.post("/posts/{post_id}/comments", response_model=schemas.CommunityCommentResponse)
 async def create_comment(
@@ -121,33 +182,38 @@ async def create_comment(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    post = crud.get_community_post(db, post_id)
-    if not post:
+    # Dibaca sebelum commit (lihat create_post)
+    author = {"id": current_user.id, "name": current_user.name}
+    db_comment = await run_db(_create_comment, db, comment, post_id, author["id"])
+    if db_comment is None:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    db_comment = crud.create_comment(db, comment, post_id, current_user.id)
-    
     return {
         "id": db_comment.id,
         "content": db_comment.content,
         "created_at": db_comment.created_at,
-        "author": {
-            "id": current_user.id,
-            "name": current_user.name
-        }
+        "author": author
     }
 
+def _create_comment(db: Session, comment: schemas.CommunityCommentCreate, post_id: int, user_id: int):
+    if not crud.get_community_post(db, post_id):
+        return None
+    return crud.create_comment(db, comment, post_id, user_id)
+
 @router.get("/posts/{post_id}/comments", response_model=List[schemas.CommunityCommentResponse])
 async def get_comments(
     post_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)  # Add authentication
 ):
+    return await run_db(_list_comments, db, post_id)
+
+def _list_comments(db: Session, post_id: int):
     comments = crud.get_post_comments(db, post_id)
     
     result = []
     for comment in comments:
-        user = db.query(User).filter(User.id == comment.user_id).first()
+        user = comment.author
         result.append({
             "id": comment.id,
             "content": comment.content,
@@ -167,7 +233,7 @@ async def delete_post(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    post = crud.get_community_post(db, post_id)
+    post = await run_db(crud.get_community_post, db, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
@@ -175,11 +241,9 @@ async def delete_post(
     if post.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this post")
     
-    # Optionally delete the image file if it exists
-    if post.image_url and "static/uploads" in post.image_url:
-        file_path = UPLOAD_DIR / post.image_url.split('/')[-1]
-        if file_path.exists():
-            os.remove(file_path)
+    # Hapus file gambar (semua ukuran) jika ada
+    delete_uploaded_file(post.image_url)
+    delete_uploaded_file(post.thumbnail_url)
 
-    crud.delete_community_post(db, post_id)
+    await run_db(crud.delete_community_post, db, post_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
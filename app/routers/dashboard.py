@@ -1,11 +1,13 @@
 # app/routers/dashboard.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import date
 from app import crud
 from app.database import get_db
 from app.auth import get_current_user
 from app.models import User
+from app.services.etags import versioned_response
+from app.services.forecast import month_index, month_from_index
 
 router = APIRouter(
     prefix="/dashboard",
@@ -14,22 +16,58 @@ router = APIRouter(
 
 @router.get("/summary")
 async def get_dashboard_summary(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    transactions = crud.get_transactions(db, current_user.id) # Re-use get_transactions from crud
-    
-    total_pemasukan = sum(float(t.amount) for t in transactions if t.type == 'pemasukan')
-    total_pengeluaran = sum(float(t.amount) for t in transactions if t.type == 'pengeluaran')
-    saldo = total_pemasukan - total_pengeluaran
-    
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    tx_this_month = [t for t in transactions if t.date.month == current_month and t.date.year == current_year]
+    # Ringkasan "bulan ini" bergantung pada tanggal, sehingga tanggal ikut menjadi bagian ETag
+    today = date.today()
+    return await versioned_response(
+        request, response, db, crud.user_data_scope(current_user.id), ("dashboard", today),
+        _summary_response, current_user.id, today
+    )
+
+def _summary_response(db: Session, user_id: int, today: date):
+    # Agregasi dilakukan di database; nilai Decimal baru dikonversi saat serialisasi
+    summary = crud.get_dashboard_summary(db, user_id, today)
     
     return {
-        "total_pemasukan": total_pemasukan,
-        "total_pengeluaran": total_pengeluaran,
-        "saldo_saat_ini": saldo,
-        "total_transaksi_bulan_ini": len(tx_this_month)
-    }   
\ No newline at end of file
+        "total_pemasukan": float(summary["total_pemasukan"]),
+        "total_pengeluaran": float(summary["total_pengeluaran"]),
+        "saldo_saat_ini": float(summary["saldo_saat_ini"]),
+        "total_transaksi_bulan_ini": summary["total_transaksi_bulan_ini"]
+    }
+
+@router.get("/charts")
+async def get_dashboard_charts(
+    request: Request,
+    response: Response,
+    months: int = Query(6, ge=1, le=24),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Data grafik dashboard (arus kas per bulan dan pengeluaran per kategori) dari tabel rollup,
+    sehingga klien tidak perlu mengunduh seluruh riwayat transaksi
+    """
+    today = date.today()
+    return await versioned_response(
+        request, response, db, crud.user_data_scope(current_user.id), ("dashboard-charts", today, months),
+        _charts_response, current_user.id, today, months
+    )
+
+def _charts_response(db: Session, user_id: int, today: date, months: int):
+    current = month_index(today.year, today.month)
+    periods = [month_from_index(current - offset) for offset in range(months - 1, -1, -1)]
+    cashflow = {period: {"pemasukan": 0.0, "pengeluaran": 0.0} for period in periods}
+
+    start_year, start_month = periods[0]
+    for year, month, tx_type, total in crud.get_monthly_cashflow_totals(db, user_id, start=date(start_year, start_month, 1)):
+        if (year, month) in cashflow and tx_type in cashflow[(year, month)]:
+            cashflow[(year, month)][tx_type] = float(total or 0)
+
+    return {
+        "monthly": [{"year": year, "month": month, **cashflow[(year, month)]} for year, month in periods],
+        "expense_by_category": {category: float(total) for category, total in crud.get_expense_totals_by_category(db, user_id)}
+    }
@@ -0,0 +1,32 @@
+# app/routers/insights.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app import schemas
+from app.database import get_db, run_db
+from app.auth import get_current_user
+from app.models import User
+from app.services.insight_jobs import insight_job_backend
+
+router = APIRouter(
+    prefix="/insights",
+    tags=["Insights"]
+)
+
+@router.get("/jobs/{job_id}", response_model=schemas.InsightJobResponse)
+async def get_insight_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Status dan hasil insight AI yang dibuat di background (async_insight=true)
+    """
+    job = await run_db(insight_job_backend.get_job, db, job_id)
+    if job is None or job["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Job insight tidak ditemukan")
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "insight": job["insight"],
+        "error": job["error"]
+    }
@@ -0,0 +1,26 @@
+# app/routers/metrics.py
+from fastapi import APIRouter, Depends
+from app.auth import get_current_user
+from app.models import User
+from app.services.llm_cache import llm_cache
+from app.services.llm_limiter import llm_limiter
+from app.services.user_cache import user_cache
+from app.services.feed_cache import feed_cache
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"]
+)
+
+@router.get("")
+async def get_metrics(current_user: User = Depends(get_current_user)):
+    """
+    Penghitung internal per proses (cache, antrean, dll.) untuk monitoring.
+    Hanya didaftarkan jika METRICS_ENABLED (default nonaktif di production).
+    """
+    return {
+        "llm_cache": llm_cache.stats(),
+        "llm_limiter": llm_limiter.stats(),
+        "user_cache": user_cache.stats(),
+        "community_feed_cache": feed_cache.stats()
+    }
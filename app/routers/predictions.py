@@ -1,52 +1,170 @@
 # app/routers/predictions.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-import random
-from datetime import date, timedelta
+from datetime import date
+from typing import Optional
 from app import crud, schemas
-from app.database import get_db
+from app.database import get_db, run_db, SessionLocal
 from app.auth import get_current_user
 from app.models import User
-from app.services.llm_service import get_llm_insight # Asumsi Anda akan membuat fungsi ini
+from app.services.llm_service import get_llm_insight, stream_insight_events, stored_insight_events, SSE_HEADERS
+from app.services.llm_cache import bucket_number
+from app.services.insight_jobs import insight_job_backend, run_insight_job
+from app.services.forecast import CashflowForecast, forecast_cashflow, month_index, month_from_index
 
 router = APIRouter(
     prefix="/predictions",
     tags=["Predictions"]
 )
 
+def _next_month(today: date) -> date:
+    return date(*month_from_index(month_index(today.year, today.month) + 1), 1)
+
+def _cashflow_forecast(db: Session, user_id: int, today: Optional[date] = None):
+    # Total bulanan diambil dari rollup (satu query GROUP BY), fit dilakukan dengan NumPy
+    rows = crud.get_monthly_cashflow_totals(db, user_id)
+    return forecast_cashflow(rows, today or date.today())
+
+def _amount(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+def _stored_result(prediction) -> dict:
+    return {
+        "predicted_income": _amount(prediction.predicted_income),
+        "predicted_expense": _amount(prediction.predicted_expense),
+        "prediction_month": prediction.prediction_date,
+        "method": prediction.method,
+        "income_lower": _amount(prediction.income_lower),
+        "income_upper": _amount(prediction.income_upper),
+        "expense_lower": _amount(prediction.expense_lower),
+        "expense_upper": _amount(prediction.expense_upper),
+    }
+
+def _forecast_result(forecast: CashflowForecast) -> dict:
+    return {
+        "predicted_income": forecast.income,
+        "predicted_expense": forecast.expense,
+        "prediction_month": forecast.month,
+        "method": forecast.method,
+        "income_lower": forecast.income_lower,
+        "income_upper": forecast.income_upper,
+        "expense_lower": forecast.expense_lower,
+        "expense_upper": forecast.expense_upper,
+    }
+
+def _load_cashflow_prediction(db: Session, user_id: int):
+    """
+    Prediksi bulan depan: dibaca dari baris tersimpan (hasil job batch forecast-batch atau permintaan
+    sebelumnya) jika masih dihitung dari versi data user saat ini, selain itu dihitung ulang lalu disimpan.
+    Mengembalikan (result, insight tersimpan atau None, versi data), atau None jika belum ada transaksi.
+    """
+    # Versi dibaca sebelum data, sehingga prediksi yang disimpan tidak pernah ditandai lebih baru dari datanya
+    version = crud.get_data_version(db, crud.user_data_scope(user_id))
+    today = date.today()
+    stored = crud.get_cashflow_prediction(db, user_id, _next_month(today))
+    if stored is not None and stored.data_version == version:
+        return _stored_result(stored), stored.insight, version
+
+    forecast = _cashflow_forecast(db, user_id, today)
+    if forecast is None:
+        return None
+    crud.upsert_cashflow_predictions(db, [crud.cashflow_prediction_values(user_id, forecast, version)])
+    return _forecast_result(forecast), None, version
+
+def _insight_prompt(result: dict) -> str:
+    """
+    Menyusun prompt insight LLM dari hasil prediksi pemasukan/pengeluaran bulan depan
+    """
+    income, expense = result["predicted_income"], result["predicted_expense"]
+    net_prediction = income - expense
+    
+    # Rentang ikut disebut agar saran LLM memperhitungkan ketidakpastian prediksi
+    ranges = ""
+    if result["income_lower"] is not None:
+        ranges = (
+            f" Rentang 95%: pemasukan {bucket_number(result['income_lower']):,.0f} - {bucket_number(result['income_upper']):,.0f},"
+            f" pengeluaran {bucket_number(result['expense_lower']):,.0f} - {bucket_number(result['expense_upper']):,.0f}."
+        )
+    return f"""Saya memprediksi arus kas bulan depan dengan pemasukan {bucket_number(income):,.0f} dan pengeluaran {bucket_number(expense):,.0f}. Saldo bersih diprediksi {bucket_number(net_prediction):,.0f}.{ranges}
+    Berikan insight atau saran finansial singkat (maksimal 2-3 kalimat) berdasarkan prediksi ini untuk pemilik UMKM. Fokus pada tindakan praktis."""
+
+def _save_cashflow_insight(user_id: int, prediction_month: date, version: int, insight: str):
+    # Dipanggil setelah stream selesai, sehingga memakai session sendiri
+    db = SessionLocal()
+    try:
+        crud.set_cashflow_prediction_insight(db, user_id, prediction_month, version, insight)
+    finally:
+        db.close()
+
 @router.post("/cashflow", response_model=schemas.CashFlowPredictionResponse)
 async def generate_cashflow_prediction(
+    background_tasks: BackgroundTasks,
+    async_insight: bool = Query(False, description="Kembalikan angka segera; insight AI dibuat di background (lihat /insights/jobs/{id})"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    transactions = crud.get_transactions_for_cashflow_prediction(db, current_user.id)
+    # Dibaca sebelum commit (upsert prediksi), setelahnya atribut User kedaluwarsa
+    user_id = current_user.id
+    loaded = await run_db(_load_cashflow_prediction, db, user_id)
     
-    if not transactions:
+    if loaded is None:
         raise HTTPException(status_code=400, detail="Tidak cukup data untuk prediksi")
     
-    pemasukan_list = [float(t.amount) for t in transactions if t.type == 'pemasukan']
-    pengeluaran_list = [float(t.amount) for t in transactions if t.type == 'pengeluaran']
+    result, insight, version = loaded
+    if insight is not None:
+        # Prediksi dan insight masih berlaku, tidak perlu memanggil LLM lagi
+        return {**result, "insight": insight}
     
-    avg_pemasukan = sum(pemasukan_list) / len(pemasukan_list) if pemasukan_list else 0
-    avg_pengeluaran = sum(pengeluaran_list) / len(pengeluaran_list) if pengeluaran_list else 0
+    prediction_month = result["prediction_month"]
+    llm_prompt = _insight_prompt(result)
     
-    # Perhitungan inti tetap di backend
-    predicted_income = avg_pemasukan * (1 + random.uniform(-0.1, 0.2))
-    predicted_expense = avg_pengeluaran * (1 + random.uniform(-0.1, 0.1))
+    if async_insight:
+        # Insight disimpan ke prediksi oleh job setelah selesai dibuat
+        job = await run_db(insight_job_backend.create_job, db, user_id, "cashflow")
+        background_tasks.add_task(
+            run_insight_job, job["id"], llm_prompt,
+            on_complete=lambda job_db, insight: crud.set_cashflow_prediction_insight(
+                job_db, user_id, prediction_month, version, insight
+            )
+        )
+        return {**result, "insight_job_id": job["id"]}
     
-    net_prediction = predicted_income - predicted_expense
+    insight_from_llm = await get_llm_insight(llm_prompt)
     
-    # Gunakan LLM untuk menghasilkan insight yang lebih cerdas
-    # Anda perlu membuat prompt yang baik untuk LLM
-    llm_prompt = f"""Saya memprediksi arus kas bulan depan dengan pemasukan {predicted_income:,.0f} dan pengeluaran {predicted_expense:,.0f}. Saldo bersih diprediksi {net_prediction:,.0f}. 
-    Berikan insight atau saran finansial singkat (maksimal 2-3 kalimat) berdasarkan prediksi ini untuk pemilik UMKM. Fokus pada tindakan praktis."""
+    await run_db(crud.set_cashflow_prediction_insight, db, user_id, prediction_month, version, insight_from_llm)
     
-    insight_from_llm = await get_llm_insight(llm_prompt)
+    return {**result, "insight": insight_from_llm}
+
+@router.post("/cashflow/stream")
+async def generate_cashflow_prediction_stream(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Sama seperti /cashflow, tetapi dikirim sebagai Server-Sent Events.
+    Insight disimpan setelah selesai di-stream.
+    """
+    # Dibaca sebelum commit (upsert prediksi), setelahnya atribut User kedaluwarsa
+    user_id = current_user.id
+    loaded = await run_db(_load_cashflow_prediction, db, user_id)
     
-    crud.create_cashflow_prediction(db, current_user.id, predicted_income, predicted_expense, insight_from_llm)
+    if loaded is None:
+        raise HTTPException(status_code=400, detail="Tidak cukup data untuk prediksi")
     
-    return {
-        "predicted_income": predicted_income,
-        "predicted_expense": predicted_expense,
-        "insight": insight_from_llm
-    }
+    result, insight, version = loaded
+    prediction_month = result["prediction_month"]
+    event_result = {**result, "prediction_month": prediction_month.isoformat()}
+    
+    if insight is not None:
+        events = stored_insight_events(event_result, insight)
+    else:
+        async def save_insight(insight: str):
+            await run_db(_save_cashflow_insight, user_id, prediction_month, version, insight)
+        events = stream_insight_events(event_result, _insight_prompt(result), on_complete=save_insight)
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
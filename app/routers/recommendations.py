@@ -2,7 +2,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app import crud, schemas
-from app.database import get_db
+from app.database import get_db, run_db
 from app.auth import get_current_user
 from app.models import User
 from app.services.llm_service import get_business_recommendations_from_llm
@@ -23,8 +23,8 @@ async def generate_business_recommendations(
     )
     
     # Simpan ke database
-    crud.create_business_recommendation(
-        db, current_user.id, request.modal, request.minat, request.lokasi, {"recommendations": recommendations_data}
+    await run_db(
+        crud.create_business_recommendation, db, current_user.id, request.modal, request.minat, request.lokasi, {"recommendations": recommendations_data}
     )
     
     return {"recommendations": recommendations_data}
\ No newline at end of file
@@ -1,20 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from datetime import datetime, date
 from typing import Optional
-import os
-import tempfile
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+import csv
+import io
+import json
+import zlib
 
-from app.database import get_db
+from app.database import get_db, run_db, SessionLocal
 from app.auth import get_current_user
-from app.models import User, Transaction
+from app.models import User
 import app.crud as crud
+from app import schemas
+from app.services.report_service import render_financial_report_async
+from app.services.report_jobs import report_job_backend, run_report_job, JOB_DONE
 
 router = APIRouter(
     prefix="/reports",
@@ -22,10 +22,28 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+def _pdf_response(pdf_bytes: bytes, start_date: date, end_date: date):
+    filename = f"FinSight_Laporan_{start_date}_sampai_{end_date}.pdf"
+    return Response(
+        content=pdf_bytes,
+        media_type='application/pdf',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+def _job_response(job: dict):
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "error": job["error"],
+        "download_url": f"/reports/jobs/{job['id']}/download" if job["status"] == JOB_DONE else None
+    }
+
 @router.get("/financial")
 async def generate_financial_report(
+    background_tasks: BackgroundTasks,
     start_date: date = Query(..., description="Tanggal awal laporan (format: YYYY-MM-DD)"),
     end_date: date = Query(..., description="Tanggal akhir laporan (format: YYYY-MM-DD)"),
+    async_job: bool = Query(False, description="Buat job di background dan kembalikan job_id alih-alih PDF"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -36,124 +54,138 @@ async def generate_financial_report(
     if start_date > end_date:
         raise HTTPException(status_code=400, detail="Tanggal awal harus sebelum tanggal akhir")
     
-    # Get transactions within date range
-    transactions = db.query(Transaction).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.date >= start_date,
-        Transaction.date <= end_date
-    ).order_by(Transaction.date).all()
+    # Dibaca sebelum commit: setelah commit atribut User kedaluwarsa dan akan dimuat ulang dengan query sinkron
+    user_id, user_name = current_user.id, current_user.name
+    
+    # PDF yang sudah pernah dibuat untuk versi data yang sama dipakai ulang
+    data_version = await run_db(crud.get_report_data_version, db, user_id, user_name)
+    job = await run_db(report_job_backend.find_job, db, user_id, start_date, end_date, data_version, with_pdf=not async_job)
     
-    # Calculate summary data
-    total_income = sum(float(t.amount) for t in transactions if t.type == 'pemasukan')
-    total_expense = sum(float(t.amount) for t in transactions if t.type == 'pengeluaran')
-    net_balance = total_income - total_expense
+    if async_job:
+        if job is None:
+            job = await run_db(report_job_backend.create_job, db, user_id, start_date, end_date, data_version)
+            background_tasks.add_task(run_report_job, job["id"], user_id, start_date, end_date, user_name)
+        return JSONResponse(status_code=202, content=_job_response(job))
     
-    # Group by category
-    categories = {}
-    for tx in transactions:
-        if tx.category not in categories:
-            categories[tx.category] = 0
-        categories[tx.category] += float(tx.amount)
+    if job and job["status"] == JOB_DONE:
+        return _pdf_response(job["pdf"], start_date, end_date)
     
-    return generate_pdf_report(transactions, start_date, end_date, total_income, total_expense, net_balance, categories, current_user.name)
+    # Render PDF di process pool agar event loop tidak tertahan oleh ReportLab;
+    # worker membaca transaksi sendiri secara bertahap dari database
+    pdf_bytes = await render_financial_report_async(user_id, start_date, end_date, user_name)
+    
+    # Simpan hasil ke cache agar unduhan berikutnya tidak perlu render ulang
+    await run_db(report_job_backend.create_job, db, user_id, start_date, end_date, data_version, status=JOB_DONE, pdf=pdf_bytes)
+    
+    return _pdf_response(pdf_bytes, start_date, end_date)
+
+@router.get("/jobs/{job_id}", response_model=schemas.ReportJobResponse)
+async def get_report_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Cek status job laporan
+    """
+    job = await run_db(report_job_backend.get_job, db, job_id)
+    if not job or job["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Job laporan tidak ditemukan")
+    return _job_response(job)
 
-def generate_pdf_report(transactions, start_date, end_date, total_income, total_expense, net_balance, categories, user_name):
-    # Create a temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-        # Create PDF document
-        doc = SimpleDocTemplate(tmp.name, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Add custom styles
-        title_style = ParagraphStyle(
-            'Title',
-            parent=styles['Heading1'],
-            alignment=1,  # Center
-            spaceAfter=12
-        )
-        subtitle_style = ParagraphStyle(
-            'Subtitle',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=10
-        )
-        
-        # Add title
-        elements.append(Paragraph("LAPORAN KEUANGAN FINSIGHT", title_style))
-        elements.append(Paragraph(f"Periode: {start_date} sampai {end_date}", styles['Normal']))
-        elements.append(Paragraph(f"Nama: {user_name}", styles['Normal']))
-        elements.append(Spacer(1, 0.2*inch))
-        
-        # Add summary section
-        elements.append(Paragraph("Ringkasan", subtitle_style))
-        summary_data = [
-            ["Total Pemasukan:", f"Rp {total_income:,.2f}"],
-            ["Total Pengeluaran:", f"Rp {total_expense:,.2f}"],
-            ["Saldo Bersih:", f"Rp {net_balance:,.2f}"]
-        ]
-        summary_table = Table(summary_data, colWidths=[2*inch, 2*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ]))
-        elements.append(summary_table)
-        elements.append(Spacer(1, 0.2*inch))
-        
-        # Add category summary
-        elements.append(Paragraph("Ringkasan Kategori", subtitle_style))
-        category_data = [["Kategori", "Jumlah"]]
-        for category, amount in categories.items():
-            category_data.append([category, f"Rp {amount:,.2f}"])
-        
-        category_table = Table(category_data, colWidths=[3*inch, 2*inch])
-        category_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ]))
-        elements.append(category_table)
-        elements.append(Spacer(1, 0.2*inch))
-        
-        # Add transaction details
-        elements.append(Paragraph("Detail Transaksi", subtitle_style))
-        tx_data = [["Tanggal", "Tipe", "Kategori", "Deskripsi", "Jumlah (Rp)"]]
-        
-        for tx in transactions:
-            amount_display = f'{float(tx.amount):,.2f}'
-            if tx.type == 'pengeluaran':
-                amount_display = f'-{amount_display}'
-            
-            tx_data.append([
-                tx.date.strftime('%Y-%m-%d'),
-                tx.type.capitalize(),
-                tx.category,
-                tx.description or '',
-                amount_display
-            ])
-        
-        # Create table with transaction data
-        tx_table = Table(tx_data, colWidths=[0.9*inch, 0.9*inch, 1.2*inch, 2.2*inch, 1.3*inch])
-        tx_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (4, 0), (4, -1), 'RIGHT'),
-        ]))
-        elements.append(tx_table)
-        
-        # Build PDF
-        doc.build(elements)
-        
-    # Return the file
-    headers = {
-        'Content-Disposition': f'attachment; filename="FinSight_Laporan_{start_date}_sampai_{end_date}.pdf"'
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Unduh PDF hasil job laporan yang sudah selesai
+    """
+    job = await run_db(report_job_backend.get_job, db, job_id, with_pdf=True)
+    if not job or job["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Job laporan tidak ditemukan")
+    if job["status"] != JOB_DONE:
+        raise HTTPException(status_code=409, detail=f"Laporan belum siap (status: {job['status']})")
+    return _pdf_response(job["pdf"], job["start_date"], job["end_date"])
+
+EXPORT_COLUMNS = ["id", "date", "type", "amount", "category", "description", "created_at"]
+EXPORT_FLUSH_ROWS = 500 # Jumlah baris yang dikumpulkan sebelum dikirim ke client
+
+def _export_row(tx):
+    return {
+        "id": tx.id,
+        "date": tx.date.isoformat(),
+        "type": tx.type,
+        "amount": str(tx.amount),
+        "category": tx.category,
+        "description": tx.description or "",
+        "created_at": tx.created_at.isoformat() if tx.created_at else "",
     }
-    
-    return FileResponse(
-        path=tmp.name,
-        headers=headers,
-        media_type='application/pdf',
-        filename=f"FinSight_Laporan_{start_date}_sampai_{end_date}.pdf"
-    )
\ No newline at end of file
+
+def stream_transactions_export(user_id: int, start_date: date, end_date: date, export_format: str, use_gzip: bool):
+    """
+    Generator yang menulis transaksi ke CSV/NDJSON secara bertahap.
+    Memakai session sendiri karena generator tetap berjalan setelah handler selesai.
+    """
+    db = SessionLocal()
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if use_gzip else None
+    buffer = io.StringIO()
+    writer = None
+    if export_format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+
+    def drain():
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        return compressor.compress(data) if compressor else data
+
+    try:
+        pending = 0
+        for tx in crud.iter_transactions_by_date_range(db, user_id, start_date, end_date):
+            row = _export_row(tx)
+            if writer:
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps(row, ensure_ascii=False) + "\n")
+            pending += 1
+            if pending >= EXPORT_FLUSH_ROWS:
+                pending = 0
+                chunk = drain()
+                if chunk:
+                    yield chunk
+        chunk = drain()
+        if compressor:
+            chunk += compressor.flush()
+        if chunk:
+            yield chunk
+    finally:
+        db.close()
+
+@router.get("/export")
+async def export_transactions(
+    start_date: date = Query(..., description="Tanggal awal (format: YYYY-MM-DD)"),
+    end_date: date = Query(..., description="Tanggal akhir (format: YYYY-MM-DD)"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Format export: csv atau ndjson"),
+    gzip: bool = Query(False, description="Kompres hasil export dengan gzip"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export transaksi dalam rentang tanggal sebagai CSV/NDJSON yang di-stream
+    """
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Tanggal awal harus sebelum tanggal akhir")
+
+    filename = f"FinSight_Transaksi_{start_date}_sampai_{end_date}.{format}"
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        stream_transactions_export(current_user.id, start_date, end_date, format, gzip),
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
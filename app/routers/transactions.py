@@ -1,31 +1,99 @@
 # app/routers/transactions.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, File, Request, Response, UploadFile, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
+from datetime import date
+import base64
 from app import crud, schemas
-from app.database import get_db
+from app.database import get_db, run_db
 from app.auth import get_current_user
 from app.models import User
+from app.services.transaction_import import detect_format, import_transactions
+from app.services.etags import versioned_response
 
 router = APIRouter(
     prefix="/transactions",
     tags=["Transactions"]
 )
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(tx_date: date, tx_id: int) -> str:
+    """
+    Membuat cursor opaque dari (date, id) transaksi terakhir di halaman
+    """
+    return base64.urlsafe_b64encode(f"{tx_date.isoformat()}:{tx_id}".encode()).decode()
+
+def decode_cursor(cursor: str):
+    """
+    Membaca kembali cursor menjadi (date, id)
+    """
+    try:
+        raw_date, raw_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return date.fromisoformat(raw_date), int(raw_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+
 @router.post("", response_model=schemas.TransactionResponse)
 async def create_transaction(
     transaction: schemas.TransactionCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    return crud.create_transaction(db, transaction, current_user.id)
+    return await run_db(crud.create_transaction, db, transaction, current_user.id)
+
+@router.post("/import", response_model=schemas.TransactionImportResult)
+async def import_transactions_file(
+    file: UploadFile = File(..., description="File CSV (header: date,type,amount,category,description) atau NDJSON"),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Paksa format file; default dideteksi dari nama file"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    file_format = format or detect_format(file.filename, file.content_type)
+    return await run_db(import_transactions, db, file.file, file_format, current_user.id)
 
-@router.get("", response_model=List[schemas.TransactionResponse])
+@router.get("", response_model=Union[schemas.TransactionPage, List[schemas.TransactionResponse]])
 async def get_transactions(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Nilai next_cursor dari halaman sebelumnya"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    type: Optional[str] = None,
+    category: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    all: bool = Query(False, description="Kembalikan seluruh transaksi tanpa pagination (perilaku lama)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    return crud.get_transactions(db, current_user.id)
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="Tanggal awal harus sebelum tanggal akhir")
+
+    filters = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "tx_type": type,
+        "category": category,
+        "min_amount": min_amount,
+        "max_amount": max_amount,
+    }
+    after = decode_cursor(cursor) if cursor else None
+    key = ("transactions", sorted(request.query_params.multi_items()))
+    return await versioned_response(
+        request, response, db, crud.user_data_scope(current_user.id), key,
+        _list_transactions, current_user.id, all, limit, after, filters
+    )
+
+def _list_transactions(db: Session, user_id: int, all: bool, limit: int, after, filters: dict):
+    if all:
+        return crud.get_transactions(db, user_id, **filters)
+
+    items, has_more = crud.get_transactions_page(db, user_id, limit, after, **filters)
+    next_cursor = encode_cursor(items[-1].date, items[-1].id) if has_more else None
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.delete("/{transaction_id}")
 async def delete_transaction(
@@ -33,6 +101,6 @@ async def delete_transaction(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    if not crud.delete_transaction(db, transaction_id, current_user.id):
+    if not await run_db(crud.delete_transaction, db, transaction_id, current_user.id):
         raise HTTPException(status_code=404, detail="Transaction not found")
-    return {"message": "Transaction deleted successfully"}
\ No newline at end of file
+    return {"message": "Transaction deleted successfully"}
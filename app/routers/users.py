@@ -2,9 +2,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app import crud, schemas
-from app.database import get_db
+from app.database import get_db, run_db
 from app.auth import create_access_token, get_current_user
 from app.models import User
+from app.services.password_hasher import hash_password, verify_password
 
 router = APIRouter(
     prefix="/auth",
@@ -13,25 +14,32 @@ router = APIRouter(
 
 @router.post("/register", response_model=schemas.Token)
 async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+    db_user = await run_db(crud.get_user_by_email, db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    db_user = crud.create_user(db, user)
+    # Hashing bcrypt (CPU berat) dijalankan di pool hashing, bukan di event loop
+    password_hash = await hash_password(user.password)
+    db_user = await run_db(crud.create_user, db, user, password_hash=password_hash)
     access_token = create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/login", response_model=schemas.Token)
 async def login(user_credentials: schemas.UserLogin, db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, email=user_credentials.email)
+    user = await run_db(crud.get_user_by_email, db, email=user_credentials.email)
     
-    if not user or not crud.verify_password(user_credentials.password, user.password_hash):
+    valid, new_hash = await verify_password(user_credentials.password, user.password_hash) if user else (False, None)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Hash dengan cost factor lama diperbarui secara transparan
+    if new_hash:
+        await run_db(crud.change_user_password, db, user.id, user_credentials.password, password_hash=new_hash)
+    
     access_token = create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -50,7 +58,7 @@ async def update_profile(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    updated_user = crud.update_user_profile(db, current_user.id, profile_data.name)
+    updated_user = await run_db(crud.update_user_profile, db, current_user.id, profile_data.name)
     if not updated_user:
         raise HTTPException(status_code=400, detail="Failed to update profile")
     
@@ -66,15 +74,20 @@ async def change_password(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    # Hash password tidak ikut di-cache bersama user, jadi selalu dibaca ulang dari database
+    password_hash = await run_db(crud.get_user_password_hash, db, current_user.id)
+    
     # Verify current password
-    if not crud.verify_password(password_data.current_password, current_user.password_hash):
+    valid, _ = await verify_password(password_data.current_password, password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Update password
-    updated_user = crud.change_user_password(db, current_user.id, password_data.new_password)
+    new_hash = await hash_password(password_data.new_password)
+    updated_user = await run_db(crud.change_user_password, db, current_user.id, password_data.new_password, password_hash=new_hash)
     if not updated_user:
         raise HTTPException(status_code=400, detail="Failed to change password")
     
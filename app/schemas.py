@@ -1,5 +1,5 @@
 # app/schemas.py
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import List, Optional
 from datetime import datetime, date
 
@@ -16,10 +16,14 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
+# Batas kolom amount DECIMAL(15, 2)
+MAX_TRANSACTION_AMOUNT = 10 ** 13
+
 class TransactionCreate(BaseModel):
     date: date
     type: str
-    amount: float
+    # nan/inf dan nilai di luar batas kolom ditolak saat validasi, bukan oleh database
+    amount: float = Field(allow_inf_nan=False, gt=-MAX_TRANSACTION_AMOUNT, lt=MAX_TRANSACTION_AMOUNT)
     category: str
     description: Optional[str] = None
 
@@ -35,6 +39,26 @@ class TransactionResponse(BaseModel):
     class Config:
         from_attributes = True # Mengizinkan ORM model menjadi Pydantic model
 
+class TransactionPage(BaseModel):
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = None # None jika sudah halaman terakhir
+
+class TransactionImportError(BaseModel):
+    row: int # Nomor baris data (mulai dari 1, tidak termasuk header CSV)
+    error: str
+
+class TransactionImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[TransactionImportError] # Dibatasi, lihat errors_truncated
+    errors_truncated: bool = False
+
+class ReportJobResponse(BaseModel):
+    job_id: str
+    status: str # pending, running, done, failed
+    error: Optional[str] = None
+    download_url: Optional[str] = None
+
 class BusinessRecommendationRequest(BaseModel):
     modal: float
     minat: Optional[str] = None
@@ -53,14 +77,29 @@ class BusinessRecommendationResponse(BaseModel):
 class CashFlowPredictionResponse(BaseModel):
     predicted_income: float
     predicted_expense: float
-    insight: str
+    prediction_month: Optional[date] = None # Bulan yang diprediksi (tanggal 1)
+    method: Optional[str] = None # Model forecast: holt_winters, holt_damped, ses, mean, run_rate
+    # Interval prediksi 95%; kosong jika histori terlalu pendek
+    income_lower: Optional[float] = None
+    income_upper: Optional[float] = None
+    expense_lower: Optional[float] = None
+    expense_upper: Optional[float] = None
+    insight: Optional[str] = None # Kosong jika insight dibuat di background
+    insight_job_id: Optional[str] = None
 
 class FeasibilityAnalysisResponse(BaseModel):
     profit_bersih: float
     roi: float
     break_even_months: Optional[float] # Tetap Optional[float]
     feasibility_status: str # Status numerik sederhana (Layak, Kurang Layak, Tidak Layak)
-    ai_insight: str # Insight yang lebih detail dari LLM
+    ai_insight: Optional[str] = None # Insight yang lebih detail dari LLM; kosong jika dibuat di background
+    insight_job_id: Optional[str] = None
+
+class InsightJobResponse(BaseModel):
+    job_id: str
+    status: str # pending, running, done, failed
+    insight: Optional[str] = None
+    error: Optional[str] = None
 
 # Add these new schemas
 class UserUpdateProfile(BaseModel):
@@ -80,12 +119,14 @@ class CommunityPostCreate(BaseModel):
     content: str
     category: str
     image_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
 
 class CommunityPostResponse(BaseModel):
     id: int
     title: str
     content: str
     image_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
     category: str
     likes_count: int
     comments_count: int
@@ -95,6 +136,10 @@ class CommunityPostResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CommunityFeedPage(BaseModel):
+    items: List[CommunityPostResponse]
+    next_cursor: Optional[str] = None # None jika sudah halaman terakhir
+
 class CommunityCommentCreate(BaseModel):
     content: str
 
@@ -0,0 +1,60 @@
+# app/services/etags.py
+import hashlib
+from typing import Tuple
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from app import crud
+from app.database import run_db
+
+# Browser boleh menyimpan response (hanya untuk user ini), tetapi harus revalidasi dengan If-None-Match
+PRIVATE_REVALIDATE = "private, no-cache"
+
+NOT_MODIFIED = object()
+
+def make_etag(scope: str, version: int, key) -> str:
+    """
+    Weak ETag dari versi data scope dan kunci response (endpoint, parameter query, dll.)
+    """
+    digest = hashlib.sha1(repr((scope, version, key)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Perbandingan weak: prefix W/ diabaikan di kedua sisi
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+def check_version(db: Session, scope: str, key, if_none_match) -> Tuple[str, int, bool]:
+    """
+    Membaca versi data scope dan mengembalikan (etag, versi, tidak_berubah).
+    Harus dipanggil sebelum data dibaca, sehingga ETag tidak pernah lebih baru dari isi response.
+    """
+    version = crud.get_data_version(db, scope)
+    etag = make_etag(scope, version, key)
+    return etag, version, bool(if_none_match) and etag_matches(if_none_match, etag)
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": PRIVATE_REVALIDATE})
+
+def set_etag_headers(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PRIVATE_REVALIDATE
+
+def _build_if_modified(db: Session, scope: str, key, if_none_match, build, args):
+    etag, _, not_modified = check_version(db, scope, key, if_none_match)
+    if not_modified:
+        return etag, NOT_MODIFIED
+    return etag, build(db, *args)
+
+async def versioned_response(request: Request, response: Response, db: Session, scope: str, key, build, *args):
+    """
+    Menjalankan build(db, *args) hanya jika versi data scope berubah sejak ETag yang dikirim client.
+    Jika belum berubah langsung membalas 304 (satu lookup versi, tanpa query data). Pengecekan versi
+    dan build berjalan dalam satu panggilan executor sehingga koneksi tidak tertahan di antaranya.
+    """
+    etag, payload = await run_db(_build_if_modified, db, scope, key, request.headers.get("if-none-match"), build, args)
+    if payload is NOT_MODIFIED:
+        return not_modified_response(etag)
+    set_etag_headers(response, etag)
+    return payload
@@ -0,0 +1,62 @@
+# app/services/feed_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from app.config import COMMUNITY_FEED_CACHE_TTL, COMMUNITY_FEED_CACHE_MAX_ENTRIES
+
+class FeedCache:
+    """
+    Cache per proses untuk halaman pertama feed komunitas per kategori (None = semua kategori).
+    Setiap halaman disimpan bersama versi data komunitas saat dibaca (crud.get_data_version) dan
+    hanya dipakai jika versinya masih sama, sehingga perubahan dari worker lain langsung terlihat.
+    Kategori berasal dari query client, jadi jumlah halaman dibatasi max_entries (LRU).
+    """
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, category: Optional[str], version: int) -> Optional[Any]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._pages.get(category)
+            if entry is None or entry[0] < time.monotonic() or entry[1] != version:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(category)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, category: Optional[str], version: int, page: Any):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._pages[category] = (time.monotonic() + self.ttl, version, page)
+            self._pages.move_to_end(category)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._pages.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "invalidations": self.invalidations,
+            "cached_pages": len(self._pages),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+        }
+
+feed_cache = FeedCache(COMMUNITY_FEED_CACHE_TTL, COMMUNITY_FEED_CACHE_MAX_ENTRIES)
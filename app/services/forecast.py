@@ -0,0 +1,231 @@
+# app/services/forecast.py
+"""
+Forecast arus kas bulanan dengan exponential smoothing (NumPy).
+
+Model aditif dalam bentuk error-correction (ETS):
+    prediksi  y^_t = l + phi*b + s[t mod m]
+    error     e_t  = y_t - y^_t
+    level     l    = l + phi*b + alpha*e_t
+    trend     b    = phi*b + beta*e_t
+    musiman   s[t mod m] += gamma*e_t
+
+Model dipilih dari panjang histori: Holt-Winters (trend teredam + musiman 12 bulan) jika ada
+minimal dua tahun data, Holt (trend teredam) jika minimal 4 bulan, selain itu simple exponential
+smoothing. Parameter dicari dengan grid search yang dijalankan sekaligus untuk semua kombinasi
+(vektor NumPy), sehingga satu fit hanya butuh beberapa milidetik bahkan untuk histori bertahun-tahun.
+Deret dengan panjang sama (mis. banyak user di job batch) di-fit bersama dalam satu rekursi.
+"""
+import calendar
+import itertools
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+SEASON_LENGTH = 12
+CONFIDENCE_Z = 1.96  # Interval prediksi 95%
+
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+BETA_RATIOS = (0.0, 0.05, 0.1, 0.2)  # beta sebagai proporsi alpha (0 < beta <= alpha)
+GAMMAS = (0.0, 0.05, 0.1, 0.2, 0.3)
+PHIS = (0.8, 0.9, 0.98)
+# Jumlah deret per blok fit; state Holt-Winters per blok sekitar BLOCK_SERIES x 600 x 12 float
+BLOCK_SERIES = 128
+
+@dataclass
+class Forecast:
+    method: str
+    mean: np.ndarray    # Prediksi untuk h = 1..horizon (per baris untuk fit_forecast_batch)
+    lower: Optional[np.ndarray]
+    upper: Optional[np.ndarray]
+
+def _parameter_grid(trend: bool, seasonal: bool) -> np.ndarray:
+    rows = []
+    for alpha, beta_ratio, gamma, phi in itertools.product(
+        ALPHAS,
+        BETA_RATIOS if trend else (0.0,),
+        GAMMAS if seasonal else (0.0,),
+        PHIS if trend else (1.0,),
+    ):
+        # Batas agar model stabil: gamma < 1 - alpha
+        if gamma < 1 - alpha:
+            rows.append((alpha, alpha * beta_ratio, gamma, phi))
+    return np.array(rows)
+
+def _initial_states(Y: np.ndarray, trend: bool, seasonal: bool, m: int):
+    k = len(Y)
+    if seasonal:
+        first, second = Y[:, :m].mean(axis=1), Y[:, m:2 * m].mean(axis=1)
+        slope = (second - first) / m if trend else np.zeros(k)
+        return first, slope, Y[:, :m] - first[:, None]
+    if trend:
+        return Y[:, 0], np.diff(Y[:, :4], axis=1).mean(axis=1), np.zeros((k, m))
+    return Y[:, 0], np.zeros(k), np.zeros((k, m))
+
+def _fit_block(Y: np.ndarray, horizon: int, m: int, trend: bool, seasonal: bool):
+    k, n = Y.shape
+    params = _parameter_grid(trend, seasonal)
+    alpha, beta, gamma, phi = (params[:, i] for i in range(4))
+    count = len(params)
+
+    # State untuk semua deret x semua kombinasi parameter sekaligus
+    level0, trend0, season0 = _initial_states(Y, trend, seasonal, m)
+    level = np.repeat(level0[:, None], count, axis=1)
+    slope = np.repeat(trend0[:, None], count, axis=1)
+    season = np.repeat(season0[:, None, :], count, axis=1)
+    sse = np.zeros((k, count))
+
+    for t in range(n):
+        index = t % m
+        error = Y[:, t, None] - (level + phi * slope + season[:, :, index])
+        sse += error * error
+        level = level + phi * slope + alpha * error
+        slope = phi * slope + beta * error
+        season[:, :, index] += gamma * error
+
+    rows = np.arange(k)
+    best = np.argmin(sse, axis=1)
+    a, b, g, p = alpha[best, None], beta[best, None], gamma[best, None], phi[best, None]
+    steps = np.arange(1, horizon + 1)
+    damped = np.cumsum(p ** steps, axis=1)
+    mean = level[rows, best, None] + damped * slope[rows, best, None] + season[rows, best][:, (n + steps - 1) % m]
+
+    # Varians prediksi h langkah: sigma^2 * (1 + sum_{j<h} c_j^2), c_j = alpha + beta*sum_{i<=j} phi^i + gamma*[j mod m == 0]
+    fitted_params = 1 + int(trend) * 2 + int(seasonal)
+    sigma2 = sse[rows, best, None] / max(n - fitted_params, 1)
+    c = a + b * damped + g * ((steps % m) == 0)
+    variance = sigma2 * (1 + np.concatenate((np.zeros((k, 1)), np.cumsum(c[:, :-1] ** 2, axis=1)), axis=1))
+    width = CONFIDENCE_Z * np.sqrt(variance)
+    return mean, mean - width, mean + width
+
+def fit_forecast_batch(Y: np.ndarray, horizon: int = 1, m: int = SEASON_LENGTH) -> Forecast:
+    """
+    Seperti fit_forecast, tetapi untuk banyak deret dengan panjang sama sekaligus (satu baris per deret).
+    Semua deret memakai model yang sama (ditentukan panjang histori); parameter dipilih per deret.
+    Array di hasil berbentuk (jumlah deret, horizon).
+    """
+    Y = np.asarray(Y, dtype=float)
+    k, n = Y.shape
+    if n == 0:
+        raise ValueError("Deret kosong")
+    if n < 3:
+        # Terlalu pendek untuk fit; pakai rata-rata tanpa interval
+        mean = np.repeat(Y.mean(axis=1)[:, None], horizon, axis=1)
+        return Forecast("mean", mean, None, None)
+
+    seasonal = n >= 2 * m
+    trend = n >= 4
+    method = "holt_winters" if seasonal else "holt_damped" if trend else "ses"
+
+    # Dipecah per blok agar memori state (deret x kombinasi x musim) tetap kecil
+    blocks = [_fit_block(Y[i:i + BLOCK_SERIES], horizon, m, trend, seasonal) for i in range(0, k, BLOCK_SERIES)]
+    mean, lower, upper = (np.concatenate(parts) for parts in zip(*blocks))
+    return Forecast(method, mean, lower, upper)
+
+def fit_forecast(y: np.ndarray, horizon: int = 1, m: int = SEASON_LENGTH) -> Forecast:
+    """
+    Memilih model dan parameter terbaik (SSE one-step-ahead terkecil) untuk deret y,
+    lalu menghasilkan prediksi beserta interval 95% untuk `horizon` periode berikutnya
+    """
+    result = fit_forecast_batch(np.asarray(y, dtype=float)[None, :], horizon, m)
+    return Forecast(
+        result.method,
+        result.mean[0],
+        None if result.lower is None else result.lower[0],
+        None if result.upper is None else result.upper[0],
+    )
+
+def month_index(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+def month_from_index(index: int) -> Tuple[int, int]:
+    return index // 12, index % 12 + 1
+
+def monthly_series(rows: Iterable[Tuple[int, int, str, float]], first: int, last: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Deret pemasukan dan pengeluaran bulanan (bulan tanpa transaksi = 0) dari baris
+    (year, month, type, total) untuk indeks bulan first..last (inklusif)
+    """
+    size = last - first + 1
+    income, expense = np.zeros(size), np.zeros(size)
+    for year, month, tx_type, total in rows:
+        index = month_index(year, month) - first
+        if 0 <= index < size:
+            target = income if tx_type == "pemasukan" else expense
+            target[index] += float(total)
+    return income, expense
+
+@dataclass
+class CashflowForecast:
+    month: date              # Bulan yang diprediksi (tanggal 1)
+    method: str
+    history_months: int
+    income: float
+    expense: float
+    income_lower: Optional[float]
+    income_upper: Optional[float]
+    expense_lower: Optional[float]
+    expense_upper: Optional[float]
+
+def _run_rate_forecast(rows, today: date, target: date) -> Optional[CashflowForecast]:
+    # Belum ada bulan lengkap: proyeksikan laju bulan berjalan ke satu bulan penuh
+    current = month_index(today.year, today.month)
+    income, expense = monthly_series(rows, current, current)
+    if not income.any() and not expense.any():
+        return None
+    scale = calendar.monthrange(today.year, today.month)[1] / today.day
+    return CashflowForecast(
+        month=target, method="run_rate", history_months=0,
+        income=round(float(income[0]) * scale, 2), expense=round(float(expense[0]) * scale, 2),
+        income_lower=None, income_upper=None, expense_lower=None, expense_upper=None,
+    )
+
+def _clipped(values: Optional[np.ndarray], row: int) -> Optional[float]:
+    # Nominal tidak mungkin negatif
+    return None if values is None else round(max(float(values[row, -1]), 0.0), 2)
+
+def forecast_cashflow_batch(rows_by_user: Dict[int, List[Tuple[int, int, str, float]]], today: date) -> Dict[int, Optional[CashflowForecast]]:
+    """
+    Prediksi pemasukan/pengeluaran bulan depan untuk banyak user sekaligus, dari baris
+    (year, month, type, total) per user (lihat crud.get_monthly_cashflow_totals). Hanya bulan yang sudah
+    lengkap dipakai untuk fit; bulan berjalan ikut diprediksi (h=1) dan bulan depan adalah h=2.
+    Deret pemasukan dan pengeluaran semua user dengan panjang histori sama di-fit dalam satu batch.
+    Nilai None untuk user yang belum punya transaksi sama sekali.
+    """
+    current = month_index(today.year, today.month)
+    target = date(*month_from_index(current + 1), 1)
+    results: Dict[int, Optional[CashflowForecast]] = {}
+    by_length: Dict[int, List[Tuple[int, np.ndarray, np.ndarray]]] = {}
+    for user_id, rows in rows_by_user.items():
+        months = [month_index(year, month) for year, month, _, _ in rows if month_index(year, month) < current]
+        if not months:
+            results[user_id] = _run_rate_forecast(rows, today, target)
+            continue
+        income, expense = monthly_series(rows, min(months), current - 1)
+        by_length.setdefault(len(income), []).append((user_id, income, expense))
+
+    # Histori berakhir di bulan lalu, sehingga bulan depan selalu 2 langkah ke depan
+    horizon = 2
+    for length, members in by_length.items():
+        # Baris 2i = pemasukan user ke-i, 2i+1 = pengeluarannya
+        fitted = fit_forecast_batch(np.vstack([series for _, income, expense in members for series in (income, expense)]), horizon)
+        for i, (user_id, _, _) in enumerate(members):
+            results[user_id] = CashflowForecast(
+                month=target,
+                method=fitted.method,
+                history_months=length,
+                income=_clipped(fitted.mean, 2 * i),
+                expense=_clipped(fitted.mean, 2 * i + 1),
+                income_lower=_clipped(fitted.lower, 2 * i),
+                income_upper=_clipped(fitted.upper, 2 * i),
+                expense_lower=_clipped(fitted.lower, 2 * i + 1),
+                expense_upper=_clipped(fitted.upper, 2 * i + 1),
+            )
+    return results
+
+def forecast_cashflow(rows: List[Tuple[int, int, str, float]], today: date) -> Optional[CashflowForecast]:
+    """
+    Prediksi pemasukan/pengeluaran bulan depan untuk satu user (lihat forecast_cashflow_batch).
+    None jika belum ada transaksi sama sekali.
+    """
+    return forecast_cashflow_batch({0: rows}, today)[0]
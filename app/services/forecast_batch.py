@@ -0,0 +1,94 @@
+# app/services/forecast_batch.py
+"""
+Job batch (mis. tiap malam lewat cron) yang menghitung prediksi arus kas bulan depan untuk semua user,
+sehingga /predictions/cashflow cukup membaca baris yang sudah jadi.
+
+User dibaca per potongan: id user, versi data dan total bulanan dari rollup masing-masing satu query.
+User tanpa data (versi 0 atau rollup kosong) dan user yang prediksinya masih sesuai versi datanya dilewati. Fit dikerjakan process pool (satu potongan
+per task, semua user dalam potongan di-fit bersama, lihat forecast_cashflow_batch) sementara proses
+utama membaca potongan berikutnya, lalu hasilnya disimpan dengan satu upsert per potongan.
+"""
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+from sqlalchemy.orm import Session
+from app import crud
+from app.services.forecast import forecast_cashflow_batch, month_index, month_from_index
+
+@dataclass
+class ForecastBatchStats:
+    users: int = 0
+    fresh: int = 0      # Prediksi tersimpan masih berlaku, tidak dihitung ulang
+    no_data: int = 0    # Belum ada transaksi (tidak di-fit)
+    written: int = 0
+    seconds: float = 0.0
+
+def _save_results(db: Session, results, versions, stats: ForecastBatchStats):
+    rows = [
+        crud.cashflow_prediction_values(user_id, forecast, versions[user_id])
+        for user_id, forecast in results.items() if forecast is not None
+    ]
+    crud.upsert_cashflow_predictions(db, rows)
+    stats.written += len(rows)
+    stats.no_data += len(results) - len(rows)
+
+def precompute_cashflow_forecasts(db: Session, chunk_size: int, workers: int, today: Optional[date] = None, force: bool = False) -> ForecastBatchStats:
+    """
+    Menghitung dan menyimpan prediksi bulan depan untuk semua user yang prediksinya belum ada atau
+    sudah basi (force=True menghitung ulang semuanya). workers 0 atau 1 menghitung di proses utama
+    (satu worker process hanya menambah biaya spawn dan pickle).
+    """
+    today = today or date.today()
+    target = date(*month_from_index(month_index(today.year, today.month) + 1), 1)
+    stats = ForecastBatchStats()
+    started = time.perf_counter()
+
+    # "spawn" agar worker tidak mewarisi koneksi database dari proses utama (worker tidak menyentuh database)
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) if workers > 1 else None
+    pending = deque()
+    try:
+        for user_ids in crud.iter_user_id_chunks(db, chunk_size):
+            stats.users += len(user_ids)
+            # Versi dibaca sebelum data, sehingga prediksi tidak pernah ditandai lebih baru dari datanya
+            versions = crud.get_user_data_versions(db, user_ids)
+            # Versi 0 = user belum pernah menulis transaksi; tidak ada yang perlu di-fit maupun disimpan
+            active = [user_id for user_id in user_ids if versions[user_id] > 0]
+            stats.no_data += len(user_ids) - len(active)
+            user_ids = active
+            if not force:
+                stored = crud.get_cashflow_prediction_versions(db, user_ids, target)
+                stale = [user_id for user_id in user_ids if stored.get(user_id, -1) != versions[user_id]]
+                stats.fresh += len(user_ids) - len(stale)
+                user_ids = stale
+            if not user_ids:
+                continue
+
+            totals = crud.get_monthly_cashflow_totals_for_users(db, user_ids)
+            # User yang seluruh transaksinya sudah dihapus tidak punya baris rollup; tidak dikirim ke fit
+            rows_by_user = {user_id: totals[user_id] for user_id in user_ids if totals.get(user_id)}
+            stats.no_data += len(user_ids) - len(rows_by_user)
+            if not rows_by_user:
+                continue
+            if executor is None:
+                _save_results(db, forecast_cashflow_batch(rows_by_user, today), versions, stats)
+                continue
+
+            pending.append((executor.submit(forecast_cashflow_batch, rows_by_user, today), versions))
+            # Batasi potongan yang sedang dikerjakan agar memori proses utama tetap kecil
+            while len(pending) >= workers * 2:
+                future, chunk_versions = pending.popleft()
+                _save_results(db, future.result(), chunk_versions, stats)
+
+        while pending:
+            future, chunk_versions = pending.popleft()
+            _save_results(db, future.result(), chunk_versions, stats)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    stats.seconds = time.perf_counter() - started
+    return stats
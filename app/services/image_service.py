@@ -0,0 +1,149 @@
+# app/services/image_service.py
+import asyncio
+import functools
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+from starlette.datastructures import Headers
+from app.config import UPLOAD_MAX_BYTES, IMAGE_FORMAT, IMAGE_QUALITY, IMAGE_MAX_PIXELS, IMAGE_WORKERS
+
+UPLOAD_DIR = Path("static/uploads")
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+UPLOAD_URL_PREFIX = "/static/uploads/"
+
+# Ukuran sisi terpanjang tiap varian, dari besar ke kecil (varian kecil dibuat dari varian sebelumnya)
+IMAGE_VARIANTS = (("large", 1600), ("thumb", 640))
+# Format yang dikenali dari isi file (content_type dan ekstensi dari client tidak dipercaya)
+ALLOWED_SOURCE_FORMATS = {"JPEG", "PNG", "WEBP", "GIF", "BMP", "MPO"}
+
+# Fallback ke JPEG jika Pillow dibangun tanpa dukungan WebP
+OUTPUT_FORMAT = "WEBP" if IMAGE_FORMAT == "webp" and features.check("webp") else "JPEG"
+OUTPUT_EXTENSION = "webp" if OUTPUT_FORMAT == "WEBP" else "jpg"
+
+# Batas body request upload = ukuran file maksimum + ruang untuk field teks dan pembatas multipart
+UPLOAD_FORM_OVERHEAD = 1024 * 1024
+
+# Decode/resize/encode Pillow melepas GIL, sehingga thread pool cukup; jumlah worker
+# membatasi berapa gambar diproses bersamaan (memori decode per gambar bisa puluhan MB)
+image_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image") if IMAGE_WORKERS > 0 else None
+
+def _reject(detail: str, status_code: int = 400):
+    return HTTPException(status_code=status_code, detail=detail)
+
+def _too_large():
+    return _reject(f"Ukuran gambar maksimal {UPLOAD_MAX_BYTES // (1024 * 1024)} MB", status_code=413)
+
+class UploadSizeLimitMiddleware:
+    """
+    Membatasi ukuran body request upload sebelum parser multipart menulisnya ke file spool:
+    ditolak langsung dari Content-Length, atau dihentikan begitu byte yang diterima melewati batas
+    (mis. body chunked tanpa Content-Length)
+    """
+    def __init__(self, app, paths: Iterable[str], max_bytes: Optional[int] = None):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes if max_bytes is not None else UPLOAD_MAX_BYTES + UPLOAD_FORM_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            error = _too_large()
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # HTTPException diteruskan FastAPI apa adanya dari parsing body, sehingga klien menerima 413
+                    raise _too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+def _save_variant(image: Image.Image, path: Path):
+    if OUTPUT_FORMAT == "WEBP":
+        image.save(path, format="WEBP", quality=IMAGE_QUALITY, method=4)
+    else:
+        image.convert("RGB").save(path, format="JPEG", quality=IMAGE_QUALITY, optimize=True, progressive=True)
+
+def process_image(source, stem: str) -> Dict[str, str]:
+    """
+    Decode gambar dari file upload lalu simpan varian yang sudah diperkecil.
+    Mengembalikan URL per varian, mis. {"large": ..., "thumb": ...}
+    """
+    written = []
+    try:
+        with Image.open(source) as image:
+            if image.format not in ALLOWED_SOURCE_FORMATS:
+                raise _reject("Format gambar tidak didukung")
+            # Ukuran dibaca dari header, sebelum piksel di-decode
+            if image.width * image.height > IMAGE_MAX_PIXELS:
+                raise _reject("Resolusi gambar terlalu besar")
+
+            # JPEG bisa di-decode langsung pada skala 1/2, 1/4 atau 1/8 (lebih cepat dan hemat memori)
+            largest = IMAGE_VARIANTS[0][1]
+            image.draft("RGB", (largest, largest))
+            current = ImageOps.exif_transpose(image)
+            has_alpha = current.mode in ("RGBA", "LA") or (current.mode == "P" and "transparency" in current.info)
+            current = current.convert("RGBA" if has_alpha else "RGB")
+
+            urls = {}
+            for name, size in IMAGE_VARIANTS:
+                current.thumbnail((size, size), Image.Resampling.LANCZOS)
+                filename = f"{stem}-{name}.{OUTPUT_EXTENSION}"
+                path = UPLOAD_DIR / filename
+                _save_variant(current, path)
+                written.append(path)
+                urls[name] = UPLOAD_URL_PREFIX + filename
+            return urls
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        # File rusak/bukan gambar; hapus varian yang sempat ditulis
+        for path in written:
+            path.unlink(missing_ok=True)
+        raise _reject("File bukan gambar yang valid")
+
+async def save_post_image(upload: UploadFile) -> Dict[str, str]:
+    """
+    Memproses gambar upload post di pool gambar. File upload sudah di-spool ke disk oleh parser
+    multipart dan dibaca Pillow langsung dari sana, sehingga tidak pernah dimuat utuh ke memori.
+    Ukuran body request sudah dibatasi UploadSizeLimitMiddleware; di sini batas per file dicek ulang.
+    """
+    if upload.size is not None and upload.size > UPLOAD_MAX_BYTES:
+        raise _too_large()
+
+    stem = uuid.uuid4().hex
+    await upload.seek(0)
+    if image_executor is None:
+        return process_image(upload.file, stem)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(image_executor, functools.partial(process_image, upload.file, stem))
+
+def delete_uploaded_file(url: Optional[str]):
+    """
+    Menghapus file upload lokal berdasarkan URL-nya (URL di luar folder uploads diabaikan)
+    """
+    if url and url.startswith(UPLOAD_URL_PREFIX):
+        path = UPLOAD_DIR / os.path.basename(url)
+        path.unlink(missing_ok=True)
+
+def shutdown_image_executor():
+    """
+    Menghentikan pool gambar saat aplikasi dimatikan
+    """
+    if image_executor is not None:
+        image_executor.shutdown(wait=True)
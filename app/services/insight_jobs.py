@@ -0,0 +1,137 @@
+# app/services/insight_jobs.py
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.config import INSIGHT_JOB_BACKEND, INSIGHT_JOB_MAX_ENTRIES
+from app.database import SessionLocal, run_db
+from app.models import InsightJob
+from app.services.llm_service import get_llm_insight
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+SQL_PRUNE_EVERY = 100 # Job lama di tabel dibersihkan setiap N job baru
+
+class InMemoryInsightJobBackend:
+    """
+    Menyimpan job insight di memori proses (hanya untuk satu proses uvicorn; dengan beberapa worker gunakan backend sql).
+    Job terlama dibuang (LRU) jika jumlahnya melebihi max_entries.
+    """
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create_job(self, db: Session, user_id: int, kind: str):
+        job = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "kind": kind,
+            "status": JOB_PENDING,
+            "insight": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            while len(self._jobs) > self.max_entries:
+                self._jobs.popitem(last=False)
+        return dict(job)
+
+    def get_job(self, db: Session, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def update_job(self, db: Session, job_id: str, status: str, insight: Optional[str] = None, error: Optional[str] = None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(status=status, insight=insight, error=error)
+
+class SqlInsightJobBackend:
+    """
+    Menyimpan job insight di tabel insight_jobs sehingga hasilnya bisa dibaca oleh semua worker.
+    Hanya max_entries job terbaru yang disimpan.
+    """
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._writes = 0
+
+    def create_job(self, db: Session, user_id: int, kind: str):
+        job = InsightJob(id=str(uuid.uuid4()), user_id=user_id, kind=kind, status=JOB_PENDING)
+        db.add(job)
+        self._writes += 1
+        if self._writes % SQL_PRUNE_EVERY == 0:
+            self._prune(db)
+        db.commit()
+        return self._to_dict(job)
+
+    def get_job(self, db: Session, job_id: str):
+        job = db.query(InsightJob).filter(InsightJob.id == job_id).first()
+        return self._to_dict(job) if job else None
+
+    def update_job(self, db: Session, job_id: str, status: str, insight: Optional[str] = None, error: Optional[str] = None):
+        job = db.query(InsightJob).filter(InsightJob.id == job_id).first()
+        if job is None:
+            return
+        job.status = status
+        job.insight = insight
+        job.error = error
+        if status in (JOB_DONE, JOB_FAILED):
+            job.finished_at = datetime.utcnow()
+        db.commit()
+
+    def _prune(self, db: Session):
+        cutoff = db.query(InsightJob.created_at).order_by(InsightJob.created_at.desc()) \
+            .offset(self.max_entries).limit(1).scalar()
+        if cutoff is not None:
+            db.query(InsightJob).filter(InsightJob.created_at <= cutoff).delete(synchronize_session=False)
+
+    @staticmethod
+    def _to_dict(job: InsightJob):
+        return {
+            "id": job.id,
+            "user_id": job.user_id,
+            "kind": job.kind,
+            "status": job.status,
+            "insight": job.insight,
+            "error": job.error,
+        }
+
+def create_insight_job_backend(name: str):
+    """
+    Membuat backend job insight sesuai konfigurasi INSIGHT_JOB_BACKEND
+    """
+    if name == "sql":
+        return SqlInsightJobBackend(INSIGHT_JOB_MAX_ENTRIES)
+    if name == "memory":
+        return InMemoryInsightJobBackend(INSIGHT_JOB_MAX_ENTRIES)
+    raise ValueError(f"INSIGHT_JOB_BACKEND tidak dikenal: {name}")
+
+insight_job_backend = create_insight_job_backend(INSIGHT_JOB_BACKEND)
+
+async def run_insight_job(job_id: str, prompt: str, on_complete: Optional[Callable[[Session, str], None]] = None):
+    """
+    Mengerjakan job insight di background: panggil LLM, simpan hasil, lalu jalankan on_complete(db, insight)
+    (misalnya menyimpan prediksi cashflow) jika insight berhasil dibuat
+    """
+    db = SessionLocal()
+    try:
+        await run_db(insight_job_backend.update_job, db, job_id, JOB_RUNNING)
+        insight = await get_llm_insight(prompt)
+        if on_complete is not None:
+            await run_db(on_complete, db, insight)
+        await run_db(insight_job_backend.update_job, db, job_id, JOB_DONE, insight=insight)
+    except Exception as e:
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        print(f"Insight job {job_id} failed: {error}")
+        db.rollback()
+        await run_db(insight_job_backend.update_job, db, job_id, JOB_FAILED, error=str(error))
+    finally:
+        db.close()
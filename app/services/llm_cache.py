@@ -0,0 +1,213 @@
+# app/services/llm_cache.py
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.config import (
+    LLM_CACHE_BACKEND, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_NUMERIC_BUCKETING, LLM_CACHE_BUCKET_DIGITS
+)
+from app.database import SessionLocal, run_db
+from app.models import LLMCacheEntry
+
+SQL_PRUNE_EVERY = 100 # Pembersihan entri kadaluarsa/berlebih dilakukan setiap N penulisan
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Menyamakan prompt yang hanya berbeda spasi/baris baru
+    """
+    return " ".join(prompt.split())
+
+def make_cache_key(model: str, kind: str, prompt: str) -> str:
+    """
+    Kunci cache dari model, jenis permintaan, dan prompt yang dinormalisasi
+    """
+    raw = f"{model}\n{kind}\n{normalize_prompt(prompt)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def bucket_number(value: float) -> float:
+    """
+    Membulatkan angka ke LLM_CACHE_BUCKET_DIGITS digit signifikan jika bucketing aktif,
+    sehingga input yang hampir sama (mis. 10.200.000 dan 10.240.000) menghasilkan prompt yang sama
+    """
+    if not LLM_CACHE_NUMERIC_BUCKETING or not value or math.isinf(value) or math.isnan(value):
+        return value
+    magnitude = int(math.floor(math.log10(abs(value))))
+    return round(value, LLM_CACHE_BUCKET_DIGITS - 1 - magnitude)
+
+class InMemoryLLMCache:
+    """
+    Cache LRU di memori proses dengan TTL per entri
+    """
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, model: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def size(self) -> int:
+        return len(self._entries)
+
+class SqlLLMCache:
+    """
+    Cache di tabel llm_cache_entries sehingga dipakai bersama oleh semua worker.
+    Method-nya blocking, jadi dipanggil lewat run_db.
+    """
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._writes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        db = SessionLocal()
+        try:
+            entry = db.query(LLMCacheEntry).filter(
+                LLMCacheEntry.key == key,
+                LLMCacheEntry.expires_at > datetime.utcnow()
+            ).first()
+            return json.loads(entry.value) if entry else None
+        finally:
+            db.close()
+
+    def set(self, key: str, model: str, value: Any):
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            values = {
+                "key": key,
+                "model": model,
+                "value": json.dumps(value, ensure_ascii=False),
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=self.ttl),
+            }
+            # Upsert: worker lain bisa menyimpan key yang sama bersamaan
+            dialect = db.get_bind().dialect.name
+            if dialect in ("postgresql", "sqlite"):
+                dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                stmt = dialect_insert(LLMCacheEntry).values(**values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["key"],
+                    set_={column: stmt.excluded[column] for column in ("model", "value", "created_at", "expires_at")}
+                )
+                db.execute(stmt)
+            else:
+                # Fallback untuk database tanpa dukungan ON CONFLICT
+                updated = db.query(LLMCacheEntry).filter(LLMCacheEntry.key == key).update(values, synchronize_session=False)
+                if not updated:
+                    db.execute(insert(LLMCacheEntry).values(**values))
+            db.commit()
+            self._writes += 1
+            if self._writes % SQL_PRUNE_EVERY == 0:
+                self._prune(db)
+        finally:
+            db.close()
+
+    def _prune(self, db: Session):
+        # Hapus entri kadaluarsa, lalu entri tertua jika jumlahnya melebihi batas
+        removed = db.query(LLMCacheEntry).filter(LLMCacheEntry.expires_at <= datetime.utcnow()).delete(synchronize_session=False)
+        overflow = db.query(LLMCacheEntry).count() - self.max_entries
+        if overflow > 0:
+            oldest = [key for (key,) in db.query(LLMCacheEntry.key).order_by(LLMCacheEntry.created_at).limit(overflow)]
+            removed += db.query(LLMCacheEntry).filter(LLMCacheEntry.key.in_(oldest)).delete(synchronize_session=False)
+        db.commit()
+        self.evictions += removed
+
+    def size(self) -> int:
+        db = SessionLocal()
+        try:
+            return db.query(LLMCacheEntry).count()
+        finally:
+            db.close()
+
+class LLMResponseCache:
+    """
+    Lapisan cache untuk llm_service dengan penghitung hit/miss.
+    backend=None berarti cache dinonaktifkan.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        if self.backend is None:
+            return None
+        if isinstance(self.backend, SqlLLMCache):
+            value = await run_db(self.backend.get, key)
+        else:
+            value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, model: str, value: Any):
+        """
+        Menyimpan respons ke cache. Gagal menyimpan tidak dianggap error: respons LLM tetap dikembalikan
+        """
+        if self.backend is None:
+            return
+        try:
+            if isinstance(self.backend, SqlLLMCache):
+                await run_db(self.backend.set, key, model, value)
+            else:
+                self.backend.set(key, model, value)
+        except SQLAlchemyError as e:
+            print(f"LLM cache write failed for {key[:12]}: {e.__class__.__name__}: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": LLM_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.backend.evictions if self.backend else 0,
+            "max_entries": LLM_CACHE_MAX_ENTRIES,
+            "ttl_seconds": LLM_CACHE_TTL,
+        }
+
+def create_llm_cache(name: str) -> LLMResponseCache:
+    """
+    Membuat cache LLM sesuai konfigurasi LLM_CACHE_BACKEND
+    """
+    if name == "memory":
+        return LLMResponseCache(InMemoryLLMCache(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL))
+    if name == "sql":
+        return LLMResponseCache(SqlLLMCache(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL))
+    if name == "none":
+        return LLMResponseCache(None)
+    raise ValueError(f"LLM_CACHE_BACKEND tidak dikenal: {name}")
+
+llm_cache = create_llm_cache(LLM_CACHE_BACKEND)
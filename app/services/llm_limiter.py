@@ -0,0 +1,104 @@
+# app/services/llm_limiter.py
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict
+from fastapi import HTTPException
+from app.config import LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE, LLM_QUEUE_TIMEOUT
+
+WAIT_SAMPLE_SIZE = 1000 # Jumlah sampel waktu tunggu terakhir untuk menghitung persentil
+
+class LLMLimiter:
+    """
+    Membatasi jumlah request LLM yang berjalan bersamaan (semaphore) dengan antrean terbatas.
+    Request ditolak cepat dengan 503 jika antrean penuh atau menunggu terlalu lama.
+    Juga menggabungkan (single-flight) request identik yang sedang berjalan.
+    """
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.coalesced = 0
+
+    def _overloaded(self, detail: str):
+        return HTTPException(status_code=503, detail=detail, headers={"Retry-After": "5"})
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Menunggu giliran untuk memanggil LLM
+        """
+        # Hitung request yang sudah masuk (berjalan + menunggu), bukan status semaphore,
+        # agar lonjakan serentak tetap tertahan sebelum semaphore sempat terkunci
+        if self.active + self.waiting >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise self._overloaded("Layanan AI sedang sibuk, silakan coba beberapa saat lagi.")
+
+        self.waiting += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise self._overloaded("Antrean layanan AI terlalu panjang, silakan coba beberapa saat lagi.")
+        finally:
+            self.waiting -= 1
+        self._waits.append(time.monotonic() - started)
+        self.admitted += 1
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    async def coalesce(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Menjalankan call() sekali untuk setiap key yang sedang berjalan;
+        pemanggil lain dengan key yang sama menunggu hasil yang sama
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(call())
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: jika request pertama dibatalkan (client putus), request lain tetap mendapat hasil
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+
+        def percentile(pct: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(pct / 100 * len(waits)))] * 1000
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "inflight_keys": len(self._inflight),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "coalesced": self.coalesced,
+            "wait_ms_p50": percentile(50),
+            "wait_ms_p95": percentile(95),
+            "wait_ms_max": waits[-1] * 1000 if waits else 0.0,
+        }
+
+llm_limiter = LLMLimiter(LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE, LLM_QUEUE_TIMEOUT)
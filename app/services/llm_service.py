@@ -1,14 +1,106 @@
 # app/services/llm_service.py
 import httpx
 import json
+import asyncio
+import random
 from fastapi import HTTPException
-from app.config import OPENROUTER_API_KEY, OPENROUTER_API_URL, MODEL_NAME
-from typing import List, Dict, Any, Optional
+from app.config import (
+    OPENROUTER_API_KEY, OPENROUTER_API_URL, MODEL_NAME,
+    LLM_TIMEOUT, LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE_CONNECTIONS, LLM_KEEPALIVE_EXPIRY,
+    LLM_HTTP2, LLM_MAX_RETRIES, LLM_RETRY_BACKOFF
+)
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Callable
+from app.services.llm_cache import llm_cache, make_cache_key, bucket_number
+from app.services.llm_limiter import llm_limiter
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER_SECONDS = 10.0
+# Header untuk respons SSE: jangan di-cache dan jangan di-buffer oleh reverse proxy (nginx)
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# HTTP client bersama selama aplikasi hidup (connection pooling + keep-alive)
+_client: Optional[httpx.AsyncClient] = None
+
+def _http2_available() -> bool:
+    if not LLM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        print("Warning: LLM_HTTP2 aktif tetapi paket 'h2' tidak terpasang, memakai HTTP/1.1")
+        return False
+
+def get_llm_client() -> httpx.AsyncClient:
+    """
+    Mengembalikan HTTP client bersama untuk OpenRouter, dibuat saat pertama kali dibutuhkan
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=_http2_available(),
+            timeout=LLM_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+            ),
+            headers={
+                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+                "Content-Type": "application/json",
+            },
+        )
+    return _client
+
+async def close_llm_client():
+    """
+    Menutup HTTP client bersama saat aplikasi dimatikan
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    # Hormati Retry-After dari server jika ada, selain itu exponential backoff dengan full jitter
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), MAX_RETRY_AFTER_SECONDS)
+            except ValueError:
+                pass
+    return random.uniform(0, LLM_RETRY_BACKOFF * (2 ** attempt))
+
+async def _post_chat_completion(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Mengirim request chat completion ke OpenRouter dengan retry terbatas untuk 429/5xx
+    dan gangguan koneksi. Melempar httpx.HTTPStatusError / httpx.RequestError jika tetap gagal.
+    Jumlah request yang berjalan bersamaan dibatasi oleh llm_limiter (503 jika antrean penuh).
+    Slot hanya dipegang selama request; jeda retry dijalankan di luar slot agar bisa dipakai request lain.
+    """
+    client = get_llm_client()
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        async with llm_limiter.slot():
+            try:
+                api_response = await client.post(OPENROUTER_API_URL, json=payload)
+            except httpx.TransportError:
+                if attempt >= LLM_MAX_RETRIES:
+                    raise
+                api_response = None
+        if api_response is None:
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+        if api_response.status_code in RETRYABLE_STATUS_CODES and attempt < LLM_MAX_RETRIES:
+            await asyncio.sleep(_retry_delay(attempt, api_response))
+            continue
+        api_response.raise_for_status()
+        return api_response.json()
 
 async def get_business_recommendations_from_llm(modal: float, minat: Optional[str], lokasi: Optional[str]) -> List[Dict[str, Any]]:
     prompt_parts = [
         f"Berikan 3 rekomendasi usaha UMKM berdasarkan kriteria berikut:",
-        f"- Modal tersedia: Rp {modal:,.0f}",
+        f"- Modal tersedia: Rp {bucket_number(modal):,.0f}",
     ]
     if minat:
         prompt_parts.append(f"- Minat bidang usaha: {minat}")
@@ -20,51 +112,52 @@ async def get_business_recommendations_from_llm(modal: float, minat: Optional[st
 
     full_prompt = "\n".join(prompt_parts)
 
+    cache_key = make_cache_key(MODEL_NAME, "recommendations", full_prompt)
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Request identik yang sedang berjalan digabung menjadi satu panggilan ke OpenRouter
+    return await llm_limiter.coalesce(cache_key, lambda: _request_business_recommendations(full_prompt, cache_key))
+
+async def _request_business_recommendations(full_prompt: str, cache_key: str) -> List[Dict[str, Any]]:
     if not OPENROUTER_API_KEY:
         raise HTTPException(status_code=500, detail="API Key untuk layanan rekomendasi tidak dikonfigurasi.")
 
     try:
-        async with httpx.AsyncClient() as client:
-            api_response = await client.post(
-                OPENROUTER_API_URL,
-                headers={
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": f"{MODEL_NAME}", 
-                    "messages": [
-                        {"role": "user", "content": full_prompt}
-                    ],
-                    "response_format": {"type": "json_object"}
-                },
-                timeout=30.0
-            )
-            api_response.raise_for_status()
-            
-            response_data = api_response.json()
-            
-            if response_data.get("choices") and len(response_data["choices"]) > 0:
-                content_str = response_data["choices"][0].get("message", {}).get("content")
-                if content_str:
-                    try:
-                        parsed_content = json.loads(content_str)
-                        if isinstance(parsed_content, dict) and "recommendations" in parsed_content:
-                             return parsed_content["recommendations"]
-                        elif isinstance(parsed_content, dict) and "usaha" in parsed_content:
-                             return parsed_content["usaha"]
-                        elif isinstance(parsed_content, list) :
-                            return parsed_content
-                        else:
-                            print(f"Warning: LLM JSON format not as expected: {content_str}")
-                            return [{"nama": "Gagal memproses rekomendasi dari AI", "deskripsi": "Silakan coba lagi atau periksa konfigurasi.", "modal_dibutuhkan": 0, "potensi_keuntungan": "-", "tingkat_risiko": "-"}]
-                    except Exception as e:
-                        print(f"Error parsing recommendations from LLM: {e}, content: {content_str}")
-                        raise HTTPException(status_code=500, detail=f"Error parsing AI recommendation: {str(e)}")
-                else:
-                    return [{"nama": "Tidak ada konten dari AI", "deskripsi": "-", "modal_dibutuhkan": 0, "potensi_keuntungan": "-", "tingkat_risiko": "-"}]
+        response_data = await _post_chat_completion({
+            "model": f"{MODEL_NAME}", 
+            "messages": [
+                {"role": "user", "content": full_prompt}
+            ],
+            "response_format": {"type": "json_object"}
+        })
+        
+        if response_data.get("choices") and len(response_data["choices"]) > 0:
+            content_str = response_data["choices"][0].get("message", {}).get("content")
+            if content_str:
+                try:
+                    parsed_content = json.loads(content_str)
+                    recommendations = None
+                    if isinstance(parsed_content, dict) and "recommendations" in parsed_content:
+                         recommendations = parsed_content["recommendations"]
+                    elif isinstance(parsed_content, dict) and "usaha" in parsed_content:
+                         recommendations = parsed_content["usaha"]
+                    elif isinstance(parsed_content, list) :
+                        recommendations = parsed_content
+                    if recommendations is not None:
+                        await llm_cache.set(cache_key, MODEL_NAME, recommendations)
+                        return recommendations
+                    else:
+                        print(f"Warning: LLM JSON format not as expected: {content_str}")
+                        return [{"nama": "Gagal memproses rekomendasi dari AI", "deskripsi": "Silakan coba lagi atau periksa konfigurasi.", "modal_dibutuhkan": 0, "potensi_keuntungan": "-", "tingkat_risiko": "-"}]
+                except Exception as e:
+                    print(f"Error parsing recommendations from LLM: {e}, content: {content_str}")
+                    raise HTTPException(status_code=500, detail=f"Error parsing AI recommendation: {str(e)}")
             else:
-                 return [{"nama": "Tidak ada respons dari AI", "deskripsi": "-", "modal_dibutuhkan": 0, "potensi_keuntungan": "-", "tingkat_risiko": "-"}]
+                return [{"nama": "Tidak ada konten dari AI", "deskripsi": "-", "modal_dibutuhkan": 0, "potensi_keuntungan": "-", "tingkat_risiko": "-"}]
+        else:
+             return [{"nama": "Tidak ada respons dari AI", "deskripsi": "-", "modal_dibutuhkan": 0, "potensi_keuntungan": "-", "tingkat_risiko": "-"}]
 
     except httpx.HTTPStatusError as e:
         print(f"HTTP error occurred: {e.response.status_code} - {e.response.text}")
@@ -72,6 +165,8 @@ async def get_business_recommendations_from_llm(modal: float, minat: Optional[st
     except httpx.RequestError as e:
         print(f"Request error occurred: {e}")
         raise HTTPException(status_code=503, detail=f"Layanan rekomendasi tidak tersedia: {e}")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
         raise HTTPException(status_code=500, detail=f"Terjadi kesalahan internal saat memproses rekomendasi: {str(e)}")
@@ -80,37 +175,37 @@ async def get_business_recommendations_from_llm(modal: float, minat: Optional[st
 async def get_llm_insight(prompt: str) -> str:
     """
     Fungsi untuk mendapatkan insight atau teks dari LLM berdasarkan prompt.
+    Hasil yang berhasil disimpan di cache berdasarkan model + prompt yang dinormalisasi.
     """
+    cache_key = make_cache_key(MODEL_NAME, "insight", prompt)
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    return await llm_limiter.coalesce(cache_key, lambda: _request_llm_insight(prompt, cache_key))
+
+async def _request_llm_insight(prompt: str, cache_key: str) -> str:
     if not OPENROUTER_API_KEY:
         raise HTTPException(status_code=500, detail="API Key untuk layanan AI tidak dikonfigurasi.")
 
     try:
-        async with httpx.AsyncClient() as client:
-            api_response = await client.post(
-                OPENROUTER_API_URL,
-                headers={
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": MODEL_NAME, 
-                    "messages": [
-                        {"role": "user", "content": prompt}
-                    ],
-                    # Untuk insight sederhana, kita tidak perlu response_format: {"type": "json_object"}
-                    # Cukup biarkan LLM mengembalikan string teks biasa.
-                },
-                timeout=30.0
-            )
-            api_response.raise_for_status()
-            
-            response_data = api_response.json()
-            
-            if response_data.get("choices") and len(response_data["choices"]) > 0:
-                content_str = response_data["choices"][0].get("message", {}).get("content")
-                return content_str if content_str else "Tidak ada insight yang dihasilkan oleh AI."
-            else:
-                return "Tidak ada respons yang valid dari AI."
+        response_data = await _post_chat_completion({
+            "model": MODEL_NAME, 
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            # Untuk insight sederhana, kita tidak perlu response_format: {"type": "json_object"}
+            # Cukup biarkan LLM mengembalikan string teks biasa.
+        })
+        
+        if response_data.get("choices") and len(response_data["choices"]) > 0:
+            content_str = response_data["choices"][0].get("message", {}).get("content")
+            if content_str:
+                await llm_cache.set(cache_key, MODEL_NAME, content_str)
+                return content_str
+            return "Tidak ada insight yang dihasilkan oleh AI."
+        else:
+            return "Tidak ada respons yang valid dari AI."
 
     except httpx.HTTPStatusError as e:
         print(f"HTTP error occurred in get_llm_insight: {e.response.status_code} - {e.response.text}")
@@ -118,7 +213,112 @@ async def get_llm_insight(prompt: str) -> str:
     except httpx.RequestError as e:
         print(f"Request error occurred in get_llm_insight: {e}")
         raise HTTPException(status_code=503, detail=f"Layanan AI untuk insight tidak tersedia: {e}")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"An unexpected error occurred in get_llm_insight: {e}")
         raise HTTPException(status_code=500, detail=f"Terjadi kesalahan internal saat memproses insight: {str(e)}")
 
+
+async def stream_llm_insight(prompt: str) -> AsyncIterator[str]:
+    """
+    Versi streaming dari get_llm_insight: menghasilkan potongan teks begitu diterima dari OpenRouter (stream: true).
+    Teks lengkap disimpan di cache setelah stream selesai; jika prompt sudah ada di cache, dikirim sekaligus.
+    """
+    cache_key = make_cache_key(MODEL_NAME, "insight", prompt)
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    if not OPENROUTER_API_KEY:
+        raise HTTPException(status_code=500, detail="API Key untuk layanan AI tidak dikonfigurasi.")
+
+    # Tidak ada retry/coalescing: token sudah dikirim ke browser begitu diterima
+    parts: List[str] = []
+    try:
+        async with llm_limiter.slot():
+            async with get_llm_client().stream("POST", OPENROUTER_API_URL, json={
+                "model": MODEL_NAME,
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ],
+                "stream": True
+            }) as api_response:
+                if api_response.is_error:
+                    await api_response.aread()
+                    api_response.raise_for_status()
+                async for line in api_response.aiter_lines():
+                    # Baris selain "data:" adalah komentar keep-alive SSE (mis. ": OPENROUTER PROCESSING")
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except ValueError:
+                        continue
+                    if chunk.get("error"):
+                        message = chunk["error"].get("message", "") if isinstance(chunk["error"], dict) else chunk["error"]
+                        raise HTTPException(status_code=502, detail=f"Layanan AI menghentikan stream insight: {message}")
+                    choices = chunk.get("choices") or []
+                    delta = choices[0].get("delta", {}).get("content") if choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+    except httpx.HTTPStatusError as e:
+        print(f"HTTP error occurred in stream_llm_insight: {e.response.status_code} - {e.response.text}")
+        raise HTTPException(status_code=e.response.status_code, detail=f"Gagal menghubungi layanan AI untuk insight: {e.response.text}")
+    except httpx.RequestError as e:
+        print(f"Request error occurred in stream_llm_insight: {e}")
+        raise HTTPException(status_code=503, detail=f"Layanan AI untuk insight tidak tersedia: {e}")
+
+    content_str = "".join(parts)
+    if content_str:
+        await llm_cache.set(cache_key, MODEL_NAME, content_str)
+    else:
+        yield "Tidak ada insight yang dihasilkan oleh AI."
+
+
+def format_sse(event: str, data: Any) -> str:
+    """
+    Memformat satu event Server-Sent Events dengan payload JSON
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_insight_events(
+    result: Dict[str, Any],
+    prompt: str,
+    on_complete: Optional[Callable[[str], Awaitable[None]]] = None
+) -> AsyncIterator[str]:
+    """
+    Generator SSE untuk endpoint insight: event "result" (angka hasil perhitungan) dikirim lebih dulu,
+    lalu "token" untuk setiap potongan insight, dan "done" dengan teks lengkap.
+    Kesalahan setelah stream dimulai dikirim sebagai event "error" karena status HTTP sudah terkirim.
+    """
+    yield format_sse("result", result)
+    parts: List[str] = []
+    try:
+        async for text in stream_llm_insight(prompt):
+            parts.append(text)
+            yield format_sse("token", {"text": text})
+        insight = "".join(parts)
+        if on_complete is not None:
+            await on_complete(insight)
+    except HTTPException as e:
+        yield format_sse("error", {"status_code": e.status_code, "detail": e.detail})
+        return
+    except Exception as e:
+        print(f"An unexpected error occurred in stream_insight_events: {e}")
+        yield format_sse("error", {"status_code": 500, "detail": f"Terjadi kesalahan internal saat memproses insight: {str(e)}"})
+        return
+    yield format_sse("done", {"insight": insight})
+
+async def stored_insight_events(result: Dict[str, Any], insight: str) -> AsyncIterator[str]:
+    """
+    Event SSE yang sama dengan stream_insight_events untuk insight yang sudah tersimpan (tanpa memanggil LLM)
+    """
+    yield format_sse("result", result)
+    yield format_sse("token", {"text": insight})
+    yield format_sse("done", {"insight": insight})
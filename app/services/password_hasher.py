@@ -0,0 +1,37 @@
+# app/services/password_hasher.py
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from app.config import PASSWORD_HASH_WORKERS
+from app.crud import get_password_hash, verify_and_update_password
+
+# bcrypt melepas GIL selama hashing, sehingga thread pool cukup untuk paralel penuh;
+# jumlah worker membatasi berapa hash yang berjalan bersamaan (sisanya mengantre)
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password") if PASSWORD_HASH_WORKERS > 0 else None
+
+async def _run_password_task(func, *args):
+    if password_executor is None:
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, functools.partial(func, *args))
+
+async def hash_password(password: str) -> str:
+    """
+    Hash password bcrypt di pool hashing tanpa menahan event loop
+    """
+    return await _run_password_task(get_password_hash, password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifikasi password di pool hashing. Mengembalikan (valid, hash_baru); hash_baru terisi jika
+    hash lama perlu diperbarui (mis. BCRYPT_ROUNDS berubah) dan sebaiknya disimpan.
+    """
+    return await _run_password_task(verify_and_update_password, plain_password, hashed_password)
+
+def shutdown_password_executor():
+    """
+    Menghentikan pool hashing saat aplikasi dimatikan
+    """
+    if password_executor is not None:
+        password_executor.shutdown(wait=True)
@@ -0,0 +1,225 @@
+# app/services/report_jobs.py
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, defer
+from app.config import REPORT_JOB_BACKEND, REPORT_CACHE_MAX_ENTRIES, REPORT_CACHE_PER_USER, REPORT_JOB_TIMEOUT
+from app.database import SessionLocal, run_db
+from app.models import ReportJob
+from app.services.report_service import render_financial_report_async
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = (JOB_DONE, JOB_FAILED)
+
+TIMED_OUT_ERROR = "Job tidak selesai dalam batas waktu (worker mungkin berhenti); silakan buat ulang laporan"
+
+class InMemoryReportJobBackend:
+    """
+    Menyimpan job dan PDF hasilnya di memori proses (cocok untuk satu instance).
+    Job selesai yang paling lama tidak dipakai dibuang (LRU) jika jumlahnya melebihi max_entries;
+    job pending/running tidak pernah dibuang karena masih ditunggu client. Semua method menerima `db` agar antarmukanya sama dengan backend SQL.
+    """
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create_job(self, db: Session, user_id: int, start_date: date, end_date: date, data_version: str,
+                   status: str = JOB_PENDING, pdf: Optional[bytes] = None):
+        job = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "data_version": data_version,
+            "status": status,
+            "error": None,
+            "pdf": pdf,
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            if status == JOB_DONE:
+                self._drop_stale_versions(job["id"], job)
+            excess = len(self._jobs) - self.max_entries
+            if excess > 0:
+                evictable = [job_id for job_id, other in self._jobs.items() if other["status"] in FINISHED_STATUSES]
+                for job_id in evictable[:excess]:
+                    del self._jobs[job_id]
+        return dict(job)
+
+    def get_job(self, db: Session, job_id: str, with_pdf: bool = False):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._jobs.move_to_end(job_id)
+            return dict(job)
+
+    def find_job(self, db: Session, user_id: int, start_date: date, end_date: date, data_version: str, with_pdf: bool = False):
+        with self._lock:
+            for job_id in reversed(self._jobs):
+                job = self._jobs[job_id]
+                if (job["user_id"], job["start_date"], job["end_date"], job["data_version"]) == (user_id, start_date, end_date, data_version) \
+                        and job["status"] != JOB_FAILED:
+                    self._jobs.move_to_end(job_id)
+                    return dict(job)
+        return None
+
+    def update_job(self, db: Session, job_id: str, status: str, pdf: Optional[bytes] = None, error: Optional[str] = None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(status=status, pdf=pdf, error=error)
+            if status == JOB_DONE:
+                self._drop_stale_versions(job_id, job)
+
+    def _drop_stale_versions(self, job_id: str, job: dict):
+        # Hasil untuk versi data lama dari rentang yang sama tidak akan dipakai lagi (dipanggil dengan lock dipegang)
+        stale = [
+            other_id for other_id, other in self._jobs.items()
+            if other_id != job_id
+            and (other["user_id"], other["start_date"], other["end_date"]) == (job["user_id"], job["start_date"], job["end_date"])
+            and other["data_version"] != job["data_version"]
+            and other["status"] in FINISHED_STATUSES
+        ]
+        for other_id in stale:
+            del self._jobs[other_id]
+
+class SqlReportJobBackend:
+    """
+    Menyimpan job dan PDF hasilnya di tabel report_jobs sehingga status dan hasil
+    bisa dibaca oleh semua worker aplikasi. Hanya REPORT_CACHE_PER_USER job terbaru per user
+    yang disimpan; job pending/running yang lebih lama dari REPORT_JOB_TIMEOUT dianggap gagal.
+    """
+    def create_job(self, db: Session, user_id: int, start_date: date, end_date: date, data_version: str,
+                   status: str = JOB_PENDING, pdf: Optional[bytes] = None):
+        job = ReportJob(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            data_version=data_version,
+            status=status,
+            pdf=pdf,
+            finished_at=datetime.utcnow() if status in FINISHED_STATUSES else None
+        )
+        db.add(job)
+        db.flush()
+        if status == JOB_DONE:
+            self._drop_stale_versions(db, job)
+        # Dibaca sebelum commit: setelah commit atribut kedaluwarsa dan akan dimuat ulang (termasuk PDF)
+        result = self._to_dict(job)
+        db.commit()
+        return result
+
+    def get_job(self, db: Session, job_id: str, with_pdf: bool = False):
+        job = self._query(db, with_pdf).filter(ReportJob.id == job_id).first()
+        return self._to_dict(job, with_pdf) if job else None
+
+    def find_job(self, db: Session, user_id: int, start_date: date, end_date: date, data_version: str, with_pdf: bool = False):
+        job = self._query(db, with_pdf).filter(
+            ReportJob.user_id == user_id,
+            ReportJob.start_date == start_date,
+            ReportJob.end_date == end_date,
+            ReportJob.data_version == data_version,
+            ReportJob.status != JOB_FAILED,
+            # Job yang macet (worker mati) tidak dipakai ulang, sehingga job baru dibuat
+            or_(ReportJob.status == JOB_DONE, ReportJob.created_at >= _timeout_cutoff())
+        ).order_by(ReportJob.created_at.desc()).first()
+        return self._to_dict(job, with_pdf) if job else None
+
+    def update_job(self, db: Session, job_id: str, status: str, pdf: Optional[bytes] = None, error: Optional[str] = None):
+        job = db.query(ReportJob).filter(ReportJob.id == job_id).first()
+        if job is None:
+            return
+        job.status = status
+        job.pdf = pdf
+        job.error = error
+        if status in (JOB_DONE, JOB_FAILED):
+            job.finished_at = datetime.utcnow()
+        if status == JOB_DONE:
+            self._drop_stale_versions(db, job)
+        db.commit()
+
+    def _drop_stale_versions(self, db: Session, job: ReportJob):
+        # Hasil untuk versi data lama dari rentang yang sama tidak akan dipakai lagi
+        db.query(ReportJob).filter(
+            ReportJob.user_id == job.user_id,
+            ReportJob.start_date == job.start_date,
+            ReportJob.end_date == job.end_date,
+            ReportJob.data_version != job.data_version,
+            ReportJob.status.in_(FINISHED_STATUSES)
+        ).delete(synchronize_session=False)
+        self._prune_user(db, job.user_id)
+
+    @staticmethod
+    def _prune_user(db: Session, user_id: int):
+        # Sisakan job terbaru user; job lain yang sudah selesai atau macet dihapus beserta PDF-nya
+        keep = [job_id for (job_id,) in db.query(ReportJob.id).filter(ReportJob.user_id == user_id)
+                .order_by(ReportJob.created_at.desc()).limit(REPORT_CACHE_PER_USER)]
+        db.query(ReportJob).filter(
+            ReportJob.user_id == user_id,
+            ReportJob.id.not_in(keep),
+            or_(ReportJob.status.in_(FINISHED_STATUSES), ReportJob.created_at < _timeout_cutoff())
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def _query(db: Session, with_pdf: bool):
+        # Kolom pdf (bisa beberapa MB) hanya dimuat jika memang akan diunduh
+        query = db.query(ReportJob)
+        return query if with_pdf else query.options(defer(ReportJob.pdf))
+
+    @staticmethod
+    def _to_dict(job: ReportJob, with_pdf: bool = False):
+        status, error = job.status, job.error
+        if status not in FINISHED_STATUSES and job.created_at is not None and job.created_at < _timeout_cutoff():
+            # Worker yang mengerjakan job berhenti sebelum selesai; client tidak perlu menunggu terus
+            status, error = JOB_FAILED, TIMED_OUT_ERROR
+        return {
+            "id": job.id,
+            "user_id": job.user_id,
+            "start_date": job.start_date,
+            "end_date": job.end_date,
+            "data_version": job.data_version,
+            "status": status,
+            "error": error,
+            "pdf": job.pdf if with_pdf else None,
+        }
+
+def _timeout_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=REPORT_JOB_TIMEOUT)
+
+def create_report_job_backend(name: str):
+    """
+    Membuat backend job laporan sesuai konfigurasi REPORT_JOB_BACKEND
+    """
+    if name == "sql":
+        return SqlReportJobBackend()
+    if name == "memory":
+        return InMemoryReportJobBackend(REPORT_CACHE_MAX_ENTRIES)
+    raise ValueError(f"REPORT_JOB_BACKEND tidak dikenal: {name}")
+
+report_job_backend = create_report_job_backend(REPORT_JOB_BACKEND)
+
+async def run_report_job(job_id: str, user_id: int, start_date: date, end_date: date, user_name: str):
+    """
+    Mengerjakan job laporan di background: ambil data, render PDF di process pool, simpan hasil
+    """
+    db = SessionLocal()
+    try:
+        await run_db(report_job_backend.update_job, db, job_id, JOB_RUNNING)
+        pdf_bytes = await render_financial_report_async(user_id, start_date, end_date, user_name)
+        await run_db(report_job_backend.update_job, db, job_id, JOB_DONE, pdf=pdf_bytes)
+    except Exception as e:
+        print(f"Report job {job_id} failed: {e}")
+        db.rollback()
+        await run_db(report_job_backend.update_job, db, job_id, JOB_FAILED, error=str(e))
+    finally:
+        db.close()
@@ -0,0 +1,211 @@
+# app/services/report_service.py
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from app import crud
+from app.config import REPORT_WORKERS
+from app.database import SessionLocal
+
+DETAIL_ROW_HEIGHT = 18 # Tinggi baris tetap agar jumlah baris per halaman bisa dihitung
+DETAIL_COL_WIDTHS = [0.9*inch, 0.9*inch, 1.2*inch, 2.2*inch, 1.3*inch]
+DETAIL_HEADER = ["Tanggal", "Tipe", "Kategori", "Deskripsi", "Jumlah (Rp)"]
+DETAIL_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('ALIGN', (4, 0), (4, -1), 'RIGHT'),
+])
+
+# Process pool untuk render PDF (CPU-bound). Dibuat saat pertama kali dipakai.
+_report_executor = None
+
+def get_report_executor():
+    """
+    Mengembalikan process pool untuk render laporan.
+    Memakai "spawn" agar worker tidak mewarisi thread/koneksi database dari proses utama.
+    """
+    global _report_executor
+    if _report_executor is None and REPORT_WORKERS > 0:
+        _report_executor = ProcessPoolExecutor(
+            max_workers=REPORT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _report_executor
+
+def shutdown_report_executor():
+    """
+    Menghentikan process pool laporan saat aplikasi dimatikan
+    """
+    global _report_executor
+    if _report_executor is not None:
+        _report_executor.shutdown(wait=True)
+        _report_executor = None
+
+async def render_financial_report_async(user_id, start_date, end_date, user_name) -> bytes:
+    """
+    Render laporan PDF di process pool. Jika REPORT_WORKERS=0, render dilakukan di thread.
+    """
+    executor = get_report_executor()
+    if executor is None:
+        return await asyncio.to_thread(render_financial_report, user_id, start_date, end_date, user_name)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, render_financial_report, user_id, start_date, end_date, user_name)
+
+def render_financial_report(user_id, start_date, end_date, user_name) -> bytes:
+    """
+    Mengambil data laporan langsung dari database (berjalan di worker process)
+    lalu membuat PDF-nya. Baris transaksi dibaca bertahap, tidak dimuat sekaligus.
+    """
+    db = SessionLocal()
+    try:
+        summary = crud.get_report_summary(db, user_id, start_date, end_date)
+        rows = crud.iter_report_rows(db, user_id, start_date, end_date)
+        return build_financial_report_pdf(summary, rows, start_date, end_date, user_name)
+    finally:
+        db.close()
+
+class _StreamingStory(list):
+    """
+    List flowable yang diisi dari iterator sedikit demi sedikit.
+    SimpleDocTemplate.build mengonsumsi flowable dari depan list, sehingga hanya
+    beberapa tabel detail yang ada di memori pada satu waktu.
+    """
+    def __init__(self, flowables, lookahead: int = 2):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+
+    def _fill(self):
+        while self._source is not None and list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+def _detail_tables(rows, first_chunk_rows: int, rows_per_page: int):
+    """
+    Memecah baris transaksi menjadi tabel-tabel kecil seukuran satu halaman,
+    masing-masing dengan baris header sendiri
+    """
+    chunk_size = first_chunk_rows
+    tx_data = [DETAIL_HEADER]
+    for tx_date, tx_type, category, description, amount in rows:
+        amount_display = f'{float(amount):,.2f}'
+        if tx_type == 'pengeluaran':
+            amount_display = f'-{amount_display}'
+        
+        tx_data.append([
+            tx_date.strftime('%Y-%m-%d'),
+            tx_type.capitalize(),
+            category,
+            description or '',
+            amount_display
+        ])
+        if len(tx_data) > chunk_size:
+            yield _detail_table(tx_data)
+            tx_data = [DETAIL_HEADER]
+            chunk_size = rows_per_page
+    if len(tx_data) > 1:
+        yield _detail_table(tx_data)
+
+def _detail_table(tx_data):
+    # repeatRows=1: jika tabel tetap terpotong antar halaman, header diulang
+    table = Table(tx_data, colWidths=DETAIL_COL_WIDTHS, rowHeights=DETAIL_ROW_HEIGHT, repeatRows=1)
+    table.setStyle(DETAIL_TABLE_STYLE)
+    return table
+
+def build_financial_report_pdf(summary, rows, start_date, end_date, user_name) -> bytes:
+    """
+    Membuat laporan keuangan PDF di memori.
+    `summary` berasal dari crud.get_report_summary, `rows` adalah iterable tuple
+    (date, type, category, description, amount) terurut berdasarkan tanggal.
+    """
+    total_income = float(summary["total_income"])
+    total_expense = float(summary["total_expense"])
+    net_balance = total_income - total_expense
+
+    buffer = io.BytesIO()
+    # Create PDF document
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    
+    # Add custom styles
+    title_style = ParagraphStyle(
+        'Title',
+        parent=styles['Heading1'],
+        alignment=1,  # Center
+        spaceAfter=12
+    )
+    subtitle_style = ParagraphStyle(
+        'Subtitle',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=10
+    )
+    
+    def story():
+        # Add title
+        yield Paragraph("LAPORAN KEUANGAN FINSIGHT", title_style)
+        yield Paragraph(f"Periode: {start_date} sampai {end_date}", styles['Normal'])
+        yield Paragraph(f"Nama: {user_name}", styles['Normal'])
+        yield Spacer(1, 0.2*inch)
+        
+        # Add summary section
+        yield Paragraph("Ringkasan", subtitle_style)
+        summary_data = [
+            ["Total Pemasukan:", f"Rp {total_income:,.2f}"],
+            ["Total Pengeluaran:", f"Rp {total_expense:,.2f}"],
+            ["Saldo Bersih:", f"Rp {net_balance:,.2f}"]
+        ]
+        summary_table = Table(summary_data, colWidths=[2*inch, 2*inch])
+        summary_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ]))
+        yield summary_table
+        yield Spacer(1, 0.2*inch)
+        
+        # Add category summary
+        yield Paragraph("Ringkasan Kategori", subtitle_style)
+        category_data = [["Kategori", "Jumlah"]]
+        for category, amount in summary["categories"].items():
+            category_data.append([category, f"Rp {float(amount):,.2f}"])
+        
+        category_table = Table(category_data, colWidths=[3*inch, 2*inch])
+        category_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ]))
+        yield category_table
+        
+        # Detail transaksi dimulai di halaman baru, dipecah per halaman
+        yield PageBreak()
+        heading = Paragraph("Detail Transaksi", subtitle_style)
+        yield heading
+        
+        # Tinggi area konten dikurangi padding frame (6pt atas + 6pt bawah)
+        available_height = doc.height - 12
+        rows_per_page = int(available_height // DETAIL_ROW_HEIGHT) - 1
+        _, heading_height = heading.wrap(doc.width, available_height)
+        heading_rows = int((heading_height + subtitle_style.spaceAfter) // DETAIL_ROW_HEIGHT) + 1
+        yield from _detail_tables(rows, rows_per_page - heading_rows, rows_per_page)
+    
+    # Build PDF
+    doc.build(_StreamingStory(story()))
+    return buffer.getvalue()
@@ -0,0 +1,239 @@
+# app/services/static_assets.py
+import gzip
+import hashlib
+import json
+import mimetypes
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from app.config import IS_PROD, BASE_URL, STATIC_RELOAD_INTERVAL
+
+try:
+    import brotli
+except ImportError:  # Opsional: tanpa paket brotli hanya varian gzip yang dibuat
+    brotli = None
+
+STATIC_DIR = Path("static")
+HTML_PAGES = ("index.html", "landing.html")
+# Folder berisi file upload user (nama unik, tidak pernah berubah) yang tidak ikut di-precompute
+UPLOADS_PREFIX = "uploads/"
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+MIN_COMPRESS_BYTES = 512
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# Tanpa hash di URL browser tetap boleh menyimpan file, tetapi harus revalidasi (dibalas 304 jika sama)
+REVALIDATE_CACHE = "no-cache"
+
+HASHED_NAME_RE = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{10})(?P<suffix>\.[^./]+)$")
+STATIC_REF_RE = re.compile(r'(?P<attr>href|src)="(?P<url>/static/[^"#?]+)"')
+MODULE_SCRIPT_RE = re.compile(r'<script type="module" src="(?P<url>/static/[^"]+)"></script>')
+
+@dataclass
+class Asset:
+    body: bytes
+    media_type: str
+    digest: str
+    encoded: Dict[str, bytes] = field(default_factory=dict)  # "br"/"gzip" -> body terkompresi
+
+    def etag(self, encoding: Optional[str]) -> str:
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+def _build_asset(body: bytes, media_type: str) -> Asset:
+    asset = Asset(body=body, media_type=media_type, digest=hashlib.sha256(body).hexdigest()[:16])
+    if media_type.startswith(COMPRESSIBLE_TYPES) and len(body) >= MIN_COMPRESS_BYTES:
+        # Varian hanya dipakai jika memang lebih kecil dari aslinya
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                asset.encoded["br"] = compressed
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            asset.encoded["gzip"] = compressed
+    return asset
+
+def _media_type(path: str) -> str:
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type == "application/javascript":
+        media_type += "; charset=utf-8"
+    return media_type
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    return accepted
+
+def _choose_encoding(asset: Asset, accept_encoding: str) -> Optional[str]:
+    if not asset.encoded or not accept_encoding:
+        return None
+    accepted = _accepted_encodings(accept_encoding)
+    for encoding in ("br", "gzip"):
+        if encoding in asset.encoded and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+def _etag_matches(asset: Asset, if_none_match: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return any(asset.etag(encoding) in tags for encoding in (None, *asset.encoded))
+
+def asset_response(asset: Asset, headers: Headers, cache_control: str) -> Response:
+    """
+    Response untuk asset yang sudah dimuat: memilih varian br/gzip sesuai Accept-Encoding
+    dan membalas 304 jika ETag di If-None-Match masih sama
+    """
+    encoding = _choose_encoding(asset, headers.get("accept-encoding", ""))
+    response_headers = {"ETag": asset.etag(encoding), "Cache-Control": cache_control}
+    if asset.encoded:
+        response_headers["Vary"] = "Accept-Encoding"
+
+    if_none_match = headers.get("if-none-match")
+    if if_none_match and _etag_matches(asset, if_none_match):
+        return Response(status_code=304, headers=response_headers)
+
+    if encoding:
+        response_headers["Content-Encoding"] = encoding
+    body = asset.encoded[encoding] if encoding else asset.body
+    return Response(content=body, media_type=asset.media_type, headers=response_headers)
+
+class AssetStore:
+    """
+    Isi folder static, halaman HTML dan config.js yang dimuat sekali beserta varian terkompresinya.
+    File di folder static juga tersedia di URL ber-hash konten (mis. /static/js/app.1a2b3c4d5e.js)
+    yang boleh di-cache selamanya; halaman HTML menunjuk ke URL tersebut.
+    """
+    def __init__(self, static_dir: Path = STATIC_DIR):
+        self.static_dir = static_dir
+        self._lock = threading.Lock()
+        self._static: Dict[str, Asset] = {}
+        self._hashed: Dict[str, str] = {}  # path ber-hash -> path asli
+        self._pages: Dict[str, Asset] = {}
+        self._signature = None
+        self._checked_at = 0.0
+
+    def _source_files(self):
+        # Folder upload dilewati tanpa ditelusuri (bisa berisi ribuan file)
+        for entry in sorted(self.static_dir.iterdir()):
+            if entry.is_dir():
+                if f"{entry.name}/" == UPLOADS_PREFIX:
+                    continue
+                paths = sorted(path for path in entry.rglob("*") if path.is_file())
+            elif entry.is_file():
+                paths = [entry]
+            else:
+                continue
+            for path in paths:
+                yield path.relative_to(self.static_dir).as_posix(), path
+
+    def _current_signature(self):
+        files = [path for _, path in self._source_files()] + [Path(page) for page in HTML_PAGES]
+        return tuple((str(path), path.stat().st_mtime_ns) for path in files if path.exists())
+
+    def build(self):
+        """
+        Memuat ulang semua asset dan menghitung hash serta varian terkompresinya
+        """
+        static, hashed = {}, {}
+        for relative, path in self._source_files():
+            asset = _build_asset(path.read_bytes(), _media_type(relative))
+            static[relative] = asset
+            stem, dot, suffix = relative.rpartition(".")
+            hashed_path = f"{stem}.{asset.digest[:10]}.{suffix}" if dot else f"{relative}.{asset.digest[:10]}"
+            hashed[hashed_path] = relative
+
+        urls = {f"/static/{relative}": f"/static/{path}" for path, relative in hashed.items()}
+        pages = {page: _build_asset(self._render_page(Path(page), urls), "text/html; charset=utf-8") for page in HTML_PAGES if Path(page).exists()}
+        pages["config.js"] = _build_asset(f'window.env = {{ BASE_URL: "{BASE_URL}" }};'.encode(), "application/javascript; charset=utf-8")
+
+        with self._lock:
+            self._static, self._hashed, self._pages = static, hashed, pages
+            self._signature = self._current_signature() if _reload_enabled() else None
+            self._checked_at = time.monotonic()
+        total = sum(len(asset.body) for asset in static.values())
+        print(f"Static assets loaded ({len(static)} files, {total // 1024} KB, brotli={'on' if brotli else 'off'})")
+
+    def _render_page(self, page: Path, urls: Dict[str, str]) -> bytes:
+        html = page.read_text(encoding="utf-8")
+        imports = {url: hashed for url, hashed in urls.items() if url.endswith(".js")}
+
+        def module_script(match):
+            # Import map memetakan setiap modul (juga yang di-import relatif, mis. './utils.js')
+            # ke URL ber-hash; entry di-import lewat map juga agar tiap modul hanya dimuat sekali
+            import_map = json.dumps({"imports": imports}, separators=(",", ":"))
+            return f'<script type="importmap">{import_map}</script>\n    <script type="module">import "{match.group("url")}";</script>'
+
+        html = MODULE_SCRIPT_RE.sub(module_script, html)
+        html = STATIC_REF_RE.sub(lambda m: f'{m.group("attr")}="{urls.get(m.group("url"), m.group("url"))}"', html)
+        return html.encode("utf-8")
+
+    def _ensure_fresh(self):
+        # Dimuat saat startup; di development file bisa berubah tanpa restart, sehingga mtime dicek
+        # paling sering sekali per STATIC_RELOAD_INTERVAL detik (bukan di setiap request)
+        if not self._pages:
+            self.build()
+            return
+        if self._signature is None or time.monotonic() - self._checked_at < STATIC_RELOAD_INTERVAL:
+            return
+        self._checked_at = time.monotonic()
+        if self._current_signature() != self._signature:
+            self.build()
+
+    def page(self, name: str) -> Optional[Asset]:
+        self._ensure_fresh()
+        return self._pages.get(name)
+
+    def static(self, path: str) -> Optional[Tuple[Asset, str]]:
+        """
+        Mengembalikan (asset, Cache-Control) untuk path di bawah /static, None jika tidak dimuat
+        """
+        self._ensure_fresh()
+        if path in self._hashed:
+            return self._static[self._hashed[path]], IMMUTABLE_CACHE
+        if path in self._static:
+            return self._static[path], REVALIDATE_CACHE
+        match = HASHED_NAME_RE.match(path)
+        if match and f"{match['stem']}{match['suffix']}" in self._static:
+            # Hash dari deploy lama: layani isi terbaru tanpa cache permanen
+            return self._static[f"{match['stem']}{match['suffix']}"], REVALIDATE_CACHE
+        return None
+
+def _reload_enabled() -> bool:
+    return not IS_PROD and STATIC_RELOAD_INTERVAL > 0
+
+asset_store = AssetStore()
+
+class AssetStaticFiles(StaticFiles):
+    """
+    StaticFiles yang melayani asset dari AssetStore (terkompresi, ETag, URL ber-hash);
+    file lain (mis. upload user) tetap dibaca dari disk
+    """
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] in ("GET", "HEAD"):
+            found = asset_store.static(path)
+            if found is not None:
+                asset, cache_control = found
+                return asset_response(asset, Headers(scope=scope), cache_control)
+
+        response = await super().get_response(path, scope)
+        if path.startswith(UPLOADS_PREFIX) and response.status_code == 200:
+            # Nama file upload unik dan isinya tidak pernah diubah
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE
+        return response
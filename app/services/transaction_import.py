@@ -0,0 +1,126 @@
+# app/services/transaction_import.py
+import csv
+import io
+import json
+from typing import BinaryIO, Iterator, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import crud
+from app.schemas import TransactionCreate
+
+IMPORT_CHUNK_SIZE = 1000 # Jumlah baris per transaksi database
+MAX_REPORTED_ERRORS = 1000 # Batas jumlah error yang dikembalikan di response
+
+def detect_format(filename: str, content_type: str) -> str:
+    """
+    Menentukan format file import ("csv" atau "ndjson") dari nama file / content type
+    """
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    return "csv"
+
+def _iter_csv(text) -> Iterator[Tuple[int, Union[dict, str]]]:
+    reader = csv.DictReader(text)
+    row_number = 0
+    while True:
+        row_number += 1
+        try:
+            data = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # Baris rusak (mis. karakter NUL) dilaporkan, baris berikutnya tetap dibaca
+            yield row_number, f"Baris CSV tidak valid: {e}"
+            continue
+        # Kolom kosong dianggap tidak diisi (mis. description)
+        yield row_number, {key: value for key, value in data.items() if key and value not in ("", None)}
+
+def _iter_ndjson(text) -> Iterator[Tuple[int, Union[dict, str]]]:
+    row_number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, f"JSON tidak valid: {e.msg}"
+            continue
+        yield row_number, data if isinstance(data, dict) else "Setiap baris harus berupa JSON object"
+
+def iter_rows(file: BinaryIO, file_format: str) -> Iterator[Tuple[int, Union[dict, str]]]:
+    """
+    Membaca file baris demi baris tanpa memuat seluruh isi ke memori.
+    Menghasilkan (nomor_baris, data) atau (nomor_baris, pesan_error) untuk baris yang tidak bisa diparse.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    row_number = 0
+    try:
+        for row_number, data in (_iter_ndjson(text) if file_format == "ndjson" else _iter_csv(text)):
+            yield row_number, data
+    except UnicodeDecodeError:
+        # Isi file dibaca per blok, sehingga posisi pastinya tidak diketahui; sisa file tidak bisa dibaca
+        yield row_number + 1, (
+            "File bukan teks UTF-8 (mis. CSV hasil export Excel dengan encoding Windows/Latin-1); "
+            "baris ini dan setelahnya tidak diproses. Simpan ulang file sebagai CSV UTF-8."
+        )
+    finally:
+        # Jangan tutup file upload milik FastAPI saat wrapper dibuang
+        text.detach()
+
+def import_transactions(db: Session, file: BinaryIO, file_format: str, user_id: int, chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """
+    Memvalidasi setiap baris dengan TransactionCreate lalu menyimpannya per chunk.
+    Chunk yang gagal disimpan di-rollback lalu dibagi dua dan disimpan ulang sampai baris penyebabnya ditemukan.
+    """
+    imported = 0
+    failed = 0
+    errors = []
+
+    def report(row_number: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": row_number, "error": message})
+
+    def flush(chunk):
+        nonlocal imported
+        try:
+            imported += crud.bulk_create_transactions(db, [transaction for _, transaction in chunk], user_id)
+        except SQLAlchemyError as e:
+            db.rollback()
+            if len(chunk) == 1:
+                report(chunk[0][0], f"Gagal menyimpan ke database: {e.__class__.__name__}")
+                return
+            # Bagi dua dan simpan ulang, sehingga hanya baris penyebab gagal yang dilaporkan
+            middle = len(chunk) // 2
+            flush(chunk[:middle])
+            flush(chunk[middle:])
+
+    chunk = []
+    for row_number, data in iter_rows(file, file_format):
+        if isinstance(data, str):
+            report(row_number, data)
+            continue
+        try:
+            chunk.append((row_number, TransactionCreate(**data)))
+        except ValidationError as e:
+            report(row_number, "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            ))
+            continue
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }
@@ -0,0 +1,80 @@
+# app/services/user_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from app.config import USER_CACHE_TTL, USER_CACHE_MAX_ENTRIES
+from app.models import User
+
+# password_hash sengaja tidak di-cache: hash kredensial tidak disimpan lama di memori
+# dan verifikasi password selalu memakai nilai terbaru dari database
+CACHED_USER_COLUMNS = [attr.key for attr in inspect(User).column_attrs if attr.key != "password_hash"]
+
+class UserCache:
+    """
+    Cache LRU per proses untuk user yang sedang login, dengan kunci subject token (email).
+    Data yang basi paling lama TTL detik; perubahan profil/password menghapus entri secara langsung.
+    """
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, subject: str) -> Optional[User]:
+        """
+        Mengembalikan User dari cache sebagai objek detached, tanpa query (None jika tidak ada).
+        Objek ini tidak ada di session mana pun, sehingga tidak ikut kedaluwarsa saat handler melakukan commit
+        dan atributnya tidak pernah dimuat ulang. password_hash tidak tersedia (lihat crud.get_user_password_hash).
+        """
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[subject]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            values = entry[1]
+
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, subject: str, user: User):
+        if self.ttl <= 0:
+            return
+        values = {key: getattr(user, key) for key in CACHED_USER_COLUMNS}
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str):
+        with self._lock:
+            if self._entries.pop(subject, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+        }
+
+user_cache = UserCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL)
@@ -0,0 +1,63 @@
+# benchmarks/bench_bulk_import.py
+"""
+Benchmark throughput import transaksi: jalur per-baris (crud.create_transaction)
+vs import bulk ber-chunk (services.transaction_import).
+    python -m benchmarks.bench_bulk_import --rows 20000
+"""
+import argparse
+import io
+import random
+from datetime import date, timedelta
+
+from benchmarks.common import setup_database, create_user, CATEGORIES, Timer
+
+from app import crud
+from app.database import SessionLocal
+from app.schemas import TransactionCreate
+from app.services.transaction_import import import_transactions
+
+def generate_rows(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    today = date.today()
+    for _ in range(count):
+        yield {
+            "date": (today - timedelta(days=rng.randrange(365))).isoformat(),
+            "type": rng.choice(["pemasukan", "pengeluaran"]),
+            "amount": f"{rng.uniform(10000, 5000000):.2f}",
+            "category": rng.choice(CATEGORIES),
+            "description": "import",
+        }
+
+def build_csv(count: int) -> bytes:
+    lines = ["date,type,amount,category,description"]
+    for row in generate_rows(count):
+        lines.append(",".join(row[key] for key in ("date", "type", "amount", "category", "description")))
+    return ("\n".join(lines) + "\n").encode()
+
+def run(rows: int, per_row_rows: int):
+    setup_database()
+    db = SessionLocal()
+    try:
+        user_id = create_user("perrow@finsight.com")
+        with Timer() as t:
+            for row in generate_rows(per_row_rows):
+                crud.create_transaction(db, TransactionCreate(**row), user_id)
+        per_row_rate = per_row_rows / (t.elapsed_ms / 1000)
+
+        user_id = create_user("bulk@finsight.com")
+        payload = io.BytesIO(build_csv(rows))
+        with Timer() as t:
+            result = import_transactions(db, payload, "csv", user_id)
+        bulk_rate = result["imported"] / (t.elapsed_ms / 1000)
+    finally:
+        db.close()
+
+    print(f"per-row : {per_row_rows:>8} rows  {per_row_rate:>10.0f} rows/s")
+    print(f"bulk    : {result['imported']:>8} rows  {bulk_rate:>10.0f} rows/s  ({bulk_rate / per_row_rate:.1f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--per-row-rows", type=int, default=2000, help="Jalur per-baris jauh lebih lambat, jadi sampelnya lebih kecil")
+    args = parser.parse_args()
+    run(args.rows, args.per_row_rows)
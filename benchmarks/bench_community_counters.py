@@ -0,0 +1,99 @@
+# benchmarks/bench_community_counters.py
+"""
+Uji konkurensi like dan komentar community.
+
+Banyak user menekan tombol like pada post yang sama berkali-kali secara bersamaan
+(termasuk klik ganda dari user yang sama) sambil menambahkan komentar. Setelah selesai,
+likes_count/comments_count harus sama persis dengan jumlah baris di community_likes
+dan community_comments, dan tidak boleh ada like ganda. Exit code 1 jika meleset.
+
+    python -m benchmarks.bench_community_counters --users 50 --toggles 7 --comments 5
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_community_counters
+"""
+import argparse
+import asyncio
+import sys
+
+from benchmarks.common import setup_database, create_user, summarize, Timer
+
+import httpx
+from sqlalchemy import func
+from app.main import app
+from app.auth import create_access_token
+from app.database import SessionLocal
+from app.models import CommunityPost, CommunityLike, CommunityComment
+
+def create_post(user_id: int) -> int:
+    db = SessionLocal()
+    try:
+        post = CommunityPost(user_id=user_id, title="Bench post", content="Uji konkurensi like", category="Umum")
+        db.add(post)
+        db.commit()
+        return post.id
+    finally:
+        db.close()
+
+async def toggle(client, post_id, headers, latencies):
+    with Timer() as t:
+        response = await client.post(f"/community/posts/{post_id}/like", headers=headers)
+    response.raise_for_status()
+    latencies.append(t.elapsed_ms)
+
+async def comment(client, post_id, headers, latencies):
+    with Timer() as t:
+        response = await client.post(f"/community/posts/{post_id}/comments", json={"content": "bench"}, headers=headers)
+    response.raise_for_status()
+    latencies.append(t.elapsed_ms)
+
+def check_counters(post_id: int):
+    db = SessionLocal()
+    try:
+        post = db.get(CommunityPost, post_id)
+        likes = db.query(func.count(CommunityLike.id)).filter(CommunityLike.post_id == post_id).scalar()
+        comments = db.query(func.count(CommunityComment.id)).filter(CommunityComment.post_id == post_id).scalar()
+        duplicates = db.query(CommunityLike.user_id).filter(CommunityLike.post_id == post_id) \
+            .group_by(CommunityLike.user_id).having(func.count(CommunityLike.id) > 1).count()
+        return post.likes_count, likes, post.comments_count, comments, duplicates
+    finally:
+        db.close()
+
+async def run(users: int, toggles: int, comments: int):
+    setup_database()
+    user_ids = [create_user(f"bench-like-{i}@finsight.com", name=f"Bench {i}") for i in range(users)]
+    post_id = create_post(user_ids[0])
+    headers = [{"Authorization": f"Bearer {create_access_token({'sub': f'bench-like-{i}@finsight.com'})}"} for i in range(users)]
+
+    like_latencies, comment_latencies = [], []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        # Isi cache user dulu agar burst hanya mengukur like/komentar
+        for h in headers:
+            (await client.get("/auth/me", headers=h)).raise_for_status()
+
+        requests = [toggle(client, post_id, h, like_latencies) for h in headers for _ in range(toggles)]
+        requests += [comment(client, post_id, h, comment_latencies) for h in headers for _ in range(comments)]
+        with Timer() as burst:
+            await asyncio.gather(*requests)
+
+    likes_count, likes, comments_count, comment_rows, duplicates = check_counters(post_id)
+    # Jumlah toggle ganjil berarti setiap user berakhir dalam keadaan like
+    expected_likes = users if toggles % 2 else 0
+    expected_comments = users * comments
+
+    print(f"users={users} toggles/user={toggles} comments/user={comments} selesai dalam {burst.elapsed_ms:.0f}ms")
+    print(summarize("POST /like", like_latencies))
+    print(summarize("POST /comments", comment_latencies))
+    print(f"likes_count={likes_count} baris like={likes} diharapkan={expected_likes} like ganda={duplicates}")
+    print(f"comments_count={comments_count} baris komentar={comment_rows} diharapkan={expected_comments}")
+
+    ok = likes_count == likes == expected_likes and comments_count == comment_rows == expected_comments and duplicates == 0
+    print("OK: counter tepat" if ok else "GAGAL: counter meleset")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--toggles", type=int, default=7, help="Jumlah klik like per user (dikirim bersamaan)")
+    parser.add_argument("--comments", type=int, default=5, help="Jumlah komentar per user")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args.users, args.toggles, args.comments)) else 1)
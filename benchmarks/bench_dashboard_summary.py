@@ -0,0 +1,53 @@
+# benchmarks/bench_dashboard_summary.py
+"""
+Benchmark ringkasan dashboard: agregasi SQL vs memuat semua transaksi ke Python.
+
+Mengukur waktu dan puncak alokasi memori (tracemalloc) pada beberapa ukuran data per user.
+    python -m benchmarks.bench_dashboard_summary --sizes 10000 100000 1000000
+Perhitungan lama (--legacy) hanya dijalankan sampai --legacy-max baris karena memorinya linear.
+"""
+import argparse
+import tracemalloc
+
+from benchmarks.common import setup_database, create_user, seed_transactions, Timer
+
+from app import crud
+from app.database import SessionLocal
+
+def legacy_summary(db, user_id):
+    transactions = crud.get_transactions(db, user_id)
+    total_pemasukan = sum(float(t.amount) for t in transactions if t.type == 'pemasukan')
+    total_pengeluaran = sum(float(t.amount) for t in transactions if t.type == 'pengeluaran')
+    return total_pemasukan, total_pengeluaran
+
+def measure(func, *args):
+    tracemalloc.start()
+    with Timer() as t:
+        func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return t.elapsed_ms, peak / 1024
+
+def run(sizes, legacy, legacy_max):
+    print(f"{'rows':>10} {'sql ms':>10} {'sql KiB':>10} {'legacy ms':>10} {'legacy KiB':>11}")
+    for size in sizes:
+        setup_database()
+        user_id = create_user(f"bench{size}@finsight.com")
+        seed_transactions(user_id, size)
+        db = SessionLocal()
+        try:
+            sql_ms, sql_kib = measure(crud.get_dashboard_summary, db, user_id)
+            legacy_ms = legacy_kib = float("nan")
+            if legacy and size <= legacy_max:
+                legacy_ms, legacy_kib = measure(legacy_summary, db, user_id)
+        finally:
+            db.close()
+        print(f"{size:>10} {sql_ms:>10.1f} {sql_kib:>10.1f} {legacy_ms:>10.1f} {legacy_kib:>11.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--legacy", action="store_true")
+    parser.add_argument("--legacy-max", type=int, default=100000)
+    args = parser.parse_args()
+    run(args.sizes, args.legacy, args.legacy_max)
@@ -0,0 +1,55 @@
+# benchmarks/bench_db_executor.py
+"""
+Benchmark latensi dashboard + transaksi di bawah beban konkuren.
+
+Selain endpoint yang memakai database, benchmark juga mengukur latensi /config.js
+(tanpa database) untuk melihat apakah event loop tertahan oleh query.
+
+Jalankan dua kali untuk membandingkan mode eksekusi database:
+    DB_EXECUTOR_MODE=inline python -m benchmarks.bench_db_executor
+    DB_EXECUTOR_MODE=threadpool python -m benchmarks.bench_db_executor
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import setup_database, create_user, seed_transactions, summarize, Timer
+
+import httpx
+from app.main import app
+from app.auth import create_access_token
+from app.config import DB_EXECUTOR_MODE
+
+async def worker(client, path, headers, requests, latencies):
+    for _ in range(requests):
+        with Timer() as t:
+            response = await client.get(path, headers=headers)
+        response.raise_for_status()
+        latencies.append(t.elapsed_ms)
+
+async def run(concurrency: int, requests: int, rows: int):
+    setup_database()
+    user_id = create_user("bench@finsight.com")
+    seed_transactions(user_id, rows)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench@finsight.com'})}"}
+
+    results = {"/dashboard/summary": [], "/transactions": [], "/config.js": []}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        tasks = []
+        for i in range(concurrency):
+            path = "/dashboard/summary" if i % 2 == 0 else "/transactions"
+            tasks.append(worker(client, path, headers, requests, results[path]))
+        tasks.append(worker(client, "/config.js", {}, requests * 2, results["/config.js"]))
+        await asyncio.gather(*tasks)
+
+    print(f"DB_EXECUTOR_MODE={DB_EXECUTOR_MODE} concurrency={concurrency} rows={rows}")
+    for path, latencies in results.items():
+        print(summarize(path, latencies))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.requests, args.rows))
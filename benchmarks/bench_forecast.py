@@ -0,0 +1,102 @@
+# benchmarks/bench_forecast.py
+"""
+Backtest dan benchmark forecast arus kas (app/services/forecast.py).
+
+1. Backtest rolling-origin pada deret bulanan sintetis (trend + musiman + noise): untuk setiap
+   titik potong, model di-fit pada histori sebelum titik itu lalu memprediksi `horizon` bulan
+   ke depan. Akurasi (MAE, sMAPE) dibandingkan dengan baseline naive (bulan terakhir) dan rata-rata
+   3 bulan terakhir, beserta cakupan interval 95% dan waktu fit.
+2. Latensi end-to-end (query rollup + fit) untuk user dengan histori transaksi bertahun-tahun.
+
+    python -m benchmarks.bench_forecast
+    python -m benchmarks.bench_forecast --series 200 --months 60 --horizon 2 --transactions 200000
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import setup_database, create_user, seed_transactions, summarize, Timer
+
+from app.database import SessionLocal
+from app.routers.predictions import _cashflow_forecast
+from app.services.forecast import fit_forecast
+
+MIN_TRAIN_MONTHS = 6
+
+def synthetic_series(rng: np.random.Generator, months: int) -> np.ndarray:
+    """
+    Total bulanan sintetis: level awal, trend linear, pola musiman tahunan dan noise (tidak negatif)
+    """
+    base = rng.uniform(5e6, 50e6)
+    t = np.arange(months)
+    trend = base * rng.normal(0, 0.01) * t
+    season = base * rng.uniform(0, 0.3) * np.sin(2 * np.pi * t / 12 + rng.uniform(0, 2 * np.pi))
+    noise = base * rng.uniform(0.05, 0.2) * rng.standard_normal(months)
+    return np.maximum(base + trend + season + noise, 0)
+
+def smape(actual: np.ndarray, predicted: np.ndarray) -> float:
+    denominator = np.abs(actual) + np.abs(predicted)
+    ratio = np.divide(2 * np.abs(actual - predicted), denominator, out=np.zeros_like(denominator), where=denominator > 0)
+    return float(ratio.mean() * 100)
+
+def backtest(series_count: int, months: int, horizon: int, seed: int):
+    rng = np.random.default_rng(seed)
+    actuals, predictions = [], {"forecast": [], "naive": [], "mean_3m": []}
+    covered, with_interval, fit_ms = 0, 0, []
+
+    for _ in range(series_count):
+        y = synthetic_series(rng, months)
+        for origin in range(MIN_TRAIN_MONTHS, months - horizon + 1):
+            history, actual = y[:origin], y[origin + horizon - 1]
+            with Timer() as t:
+                result = fit_forecast(history, horizon)
+            fit_ms.append(t.elapsed_ms)
+
+            actuals.append(actual)
+            predictions["forecast"].append(max(result.mean[-1], 0))
+            predictions["naive"].append(history[-1])
+            predictions["mean_3m"].append(history[-3:].mean())
+            if result.lower is not None:
+                with_interval += 1
+                covered += result.lower[-1] <= actual <= result.upper[-1]
+
+    actuals = np.array(actuals)
+    print(f"Backtest: {series_count} deret x {months} bulan, horizon={horizon}, {len(actuals)} prediksi")
+    for name, values in predictions.items():
+        values = np.array(values)
+        mae = np.abs(actuals - values).mean()
+        print(f"  {name:<10} MAE={mae:14,.0f}  sMAPE={smape(actuals, values):6.2f}%")
+    print(f"  cakupan interval 95%: {covered / with_interval * 100 if with_interval else 0:.1f}% dari {with_interval} prediksi")
+    print(summarize("  fit_forecast", fit_ms))
+
+def end_to_end(transactions: int, days: int, runs: int):
+    setup_database()
+    user_id = create_user("bench-forecast@finsight.com")
+    seed_transactions(user_id, transactions, days=days)
+
+    latencies = []
+    db = SessionLocal()
+    try:
+        for _ in range(runs):
+            with Timer() as t:
+                forecast = _cashflow_forecast(db, user_id)
+            latencies.append(t.elapsed_ms)
+    finally:
+        db.close()
+
+    print(f"End-to-end: {transactions} transaksi dalam {days} hari, {forecast.history_months} bulan histori, model={forecast.method}")
+    print(f"  prediksi {forecast.month:%Y-%m}: pemasukan {forecast.income:,.0f} ({forecast.income_lower:,.0f} - {forecast.income_upper:,.0f})")
+    print(summarize("  rollup + fit", latencies))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--series", type=int, default=100, help="Jumlah deret sintetis untuk backtest")
+    parser.add_argument("--months", type=int, default=48, help="Panjang tiap deret (bulan)")
+    parser.add_argument("--horizon", type=int, default=2, help="Jarak prediksi (2 = bulan depan, seperti endpoint)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--transactions", type=int, default=50000, help="Jumlah transaksi untuk uji end-to-end")
+    parser.add_argument("--days", type=int, default=1460, help="Rentang histori transaksi (hari)")
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    backtest(args.series, args.months, args.horizon, args.seed)
+    end_to_end(args.transactions, args.days, args.runs)
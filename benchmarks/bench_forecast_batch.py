@@ -0,0 +1,124 @@
+# benchmarks/bench_forecast_batch.py
+"""
+Benchmark job batch forecast arus kas (python -m app.cli forecast-batch).
+
+Mengisi rollup bulanan sintetis untuk banyak user (panjang histori bervariasi), lalu membandingkan:
+1. Per user seperti endpoint on-demand: query rollup + fit + simpan, satu user per langkah
+2. Job batch di proses utama (--workers 0) dan dengan process pool
+3. Job batch kedua kali (semua prediksi masih berlaku, hanya cek versi)
+4. Latensi endpoint saat prediksi tersimpan masih berlaku vs harus dihitung ulang
+
+    python -m benchmarks.bench_forecast_batch
+    python -m benchmarks.bench_forecast_batch --users 5000 --max-months 60 --workers 4
+"""
+import argparse
+import time
+from datetime import date
+
+import numpy as np
+
+from benchmarks.common import setup_database, summarize, Timer
+from benchmarks.bench_forecast import synthetic_series
+
+from app import crud
+from app.config import FORECAST_WORKERS
+from app.database import engine, SessionLocal
+from app.models import User, MonthlyBalance, CashFlowPrediction
+from app.routers.predictions import _cashflow_forecast, _load_cashflow_prediction
+from app.services.forecast import month_index, month_from_index
+from app.services.forecast_batch import precompute_cashflow_forecasts
+
+def seed_rollups(users: int, max_months: int, seed: int):
+    """
+    Membuat user dan baris rollup bulanan (pemasukan + pengeluaran) langsung, tanpa tabel transactions
+    """
+    rng = np.random.default_rng(seed)
+    today = date.today()
+    current = month_index(today.year, today.month)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"name": "Bench User", "email": f"bench-batch-{i}@finsight.com", "password_hash": "bench"} for i in range(users)
+        ])
+        user_ids = [row[0] for row in conn.execute(User.__table__.select().with_only_columns(User.id).order_by(User.id))]
+        rows = []
+        for user_id in user_ids:
+            months = int(rng.integers(1, max_months + 1))
+            for tx_type in ("pemasukan", "pengeluaran"):
+                series = synthetic_series(rng, months)
+                for offset, total in enumerate(series):
+                    year, month = month_from_index(current - months + offset)
+                    rows.append({
+                        "user_id": user_id, "year": year, "month": month, "type": tx_type,
+                        "category": "Lainnya", "total_amount": round(float(total), 2), "tx_count": 1,
+                    })
+        conn.execute(MonthlyBalance.__table__.insert(), rows)
+    return user_ids
+
+def clear_predictions():
+    with engine.begin() as conn:
+        conn.execute(CashFlowPrediction.__table__.delete())
+
+def per_user(user_ids):
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        for user_id in user_ids:
+            forecast = _cashflow_forecast(db, user_id)
+            if forecast is not None:
+                crud.upsert_cashflow_predictions(db, [crud.cashflow_prediction_values(user_id, forecast, 0)])
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+def batch(chunk_size: int, workers: int):
+    db = SessionLocal()
+    try:
+        return precompute_cashflow_forecasts(db, chunk_size, workers)
+    finally:
+        db.close()
+
+def report(name: str, users: int, seconds: float):
+    print(f"{name:<36} {seconds:7.2f}s  {users / seconds if seconds else 0:10,.0f} user/detik")
+
+def endpoint_latency(user_ids, runs: int):
+    db = SessionLocal()
+    try:
+        fresh, stale = [], []
+        for user_id in user_ids[:runs]:
+            with Timer() as t:
+                _load_cashflow_prediction(db, user_id)
+            fresh.append(t.elapsed_ms)
+        clear_predictions()
+        for user_id in user_ids[:runs]:
+            with Timer() as t:
+                _load_cashflow_prediction(db, user_id)
+            stale.append(t.elapsed_ms)
+        print(summarize("endpoint: tersimpan", fresh))
+        print(summarize("endpoint: hitung ulang", stale))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--max-months", type=int, default=48, help="Histori tiap user diacak 1..N bulan")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=max(FORECAST_WORKERS, 2))
+    parser.add_argument("--runs", type=int, default=200, help="Jumlah permintaan untuk latensi endpoint")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    setup_database()
+    user_ids = seed_rollups(args.users, args.max_months, args.seed)
+    print(f"{args.users} user, histori 1..{args.max_months} bulan")
+
+    report("per user (seperti endpoint)", args.users, per_user(user_ids))
+    clear_predictions()
+    stats = batch(args.chunk_size, 0)
+    report("batch, proses utama", stats.users, stats.seconds)
+    clear_predictions()
+    stats = batch(args.chunk_size, args.workers)
+    report(f"batch, {args.workers} worker process", stats.users, stats.seconds)
+    stats = batch(args.chunk_size, args.workers)
+    report(f"batch ulang ({stats.fresh} masih berlaku)", stats.users, stats.seconds)
+    endpoint_latency(user_ids, args.runs)
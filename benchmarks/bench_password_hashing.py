@@ -0,0 +1,86 @@
+# benchmarks/bench_password_hashing.py
+"""
+Benchmark latensi endpoint lain selama lonjakan login (bcrypt).
+
+Selama sekelompok login berjalan bersamaan, probe terus memanggil /dashboard/summary
+dan mencatat latensinya, lalu dibandingkan dengan latensi tanpa lonjakan login.
+
+Jalankan dua kali untuk membandingkan hashing di event loop dengan pool hashing:
+    PASSWORD_HASH_WORKERS=0 python -m benchmarks.bench_password_hashing
+    PASSWORD_HASH_WORKERS=4 python -m benchmarks.bench_password_hashing
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import setup_database, seed_transactions, summarize, Timer
+
+import httpx
+from app import crud
+from app.main import app
+from app.auth import create_access_token
+from app.config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+from app.database import SessionLocal
+from app.models import User
+
+EMAIL = "bench-login@finsight.com"
+PASSWORD = "benchpassword"
+
+def create_login_user() -> int:
+    db = SessionLocal()
+    try:
+        user = User(name="Bench Login", email=EMAIL, password_hash=crud.get_password_hash(PASSWORD))
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+async def probe(client, headers, latencies, stop: asyncio.Event, interval: float):
+    while not stop.is_set():
+        with Timer() as t:
+            response = await client.get("/dashboard/summary", headers=headers)
+        response.raise_for_status()
+        latencies.append(t.elapsed_ms)
+        await asyncio.sleep(interval)
+
+async def login(client, latencies):
+    with Timer() as t:
+        response = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+    response.raise_for_status()
+    latencies.append(t.elapsed_ms)
+
+async def run(logins: int, baseline_requests: int, interval: float):
+    setup_database()
+    user_id = create_login_user()
+    seed_transactions(user_id, 2000)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        baseline = []
+        for _ in range(baseline_requests):
+            with Timer() as t:
+                (await client.get("/dashboard/summary", headers=headers)).raise_for_status()
+            baseline.append(t.elapsed_ms)
+
+        during_burst, login_latencies = [], []
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, headers, during_burst, stop, interval))
+        with Timer() as burst:
+            await asyncio.gather(*[login(client, login_latencies) for _ in range(logins)])
+        stop.set()
+        await probe_task
+
+    print(f"PASSWORD_HASH_WORKERS={PASSWORD_HASH_WORKERS} BCRYPT_ROUNDS={BCRYPT_ROUNDS} logins={logins}")
+    print(f"burst selesai dalam {burst.elapsed_ms:.0f}ms")
+    print(summarize("/auth/login", login_latencies))
+    print(summarize("dashboard (tanpa login)", baseline))
+    print(summarize("dashboard (selama login)", during_burst))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--baseline-requests", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.005, help="Jeda antar request probe (detik)")
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.baseline_requests, args.interval))
@@ -0,0 +1,56 @@
+# benchmarks/bench_report_render.py
+"""
+Benchmark render laporan PDF untuk beberapa jumlah baris transaksi.
+
+Setiap ukuran dirender di process baru sehingga puncak RSS (maxrss) tidak saling mempengaruhi.
+    python -m benchmarks.bench_report_render --sizes 1000 10000 50000
+"""
+import argparse
+import multiprocessing
+import random
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks.common import CATEGORIES
+
+def generate_rows(count: int, seed: int = 11):
+    # Generator agar data uji juga tidak menambah puncak memori
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=365)
+    for i in range(count):
+        yield (
+            start + timedelta(days=i * 365 // max(count, 1)),
+            rng.choice(["pemasukan", "pengeluaran"]),
+            rng.choice(CATEGORIES),
+            f"Transaksi nomor {i}",
+            Decimal(f"{rng.uniform(10000, 5000000):.2f}"),
+        )
+
+def render_once(count: int):
+    from app.services.report_service import build_financial_report_pdf
+    summary = {"total_income": Decimal("0"), "total_expense": Decimal("0"), "categories": {}}
+    for _, tx_type, category, _, amount in generate_rows(count):
+        summary["total_income" if tx_type == "pemasukan" else "total_expense"] += amount
+        summary["categories"][category] = summary["categories"].get(category, Decimal("0")) + amount
+    started = time.perf_counter()
+    pdf = build_financial_report_pdf(summary, generate_rows(count), date.today() - timedelta(days=365), date.today(), "Bench User")
+    elapsed = time.perf_counter() - started
+    # ru_maxrss dalam KiB di Linux
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, len(pdf) / 1024
+
+def run(sizes):
+    print(f"{'rows':>8} {'seconds':>9} {'peak MiB':>9} {'pdf KiB':>9}")
+    context = multiprocessing.get_context("spawn")
+    for size in sizes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            elapsed, peak_mib, pdf_kib = executor.submit(render_once, size).result()
+        print(f"{size:>8} {elapsed:>9.2f} {peak_mib:>9.1f} {pdf_kib:>9.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+    run(args.sizes)
@@ -0,0 +1,106 @@
+# benchmarks/common.py
+"""
+Helper bersama untuk skrip benchmark.
+
+Skrip benchmark memakai database SQLite sementara kecuali DATABASE_URL sudah di-set,
+sehingga bisa dijalankan tanpa PostgreSQL.
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/finsight_bench.db"
+
+from app import crud
+from app.database import Base, engine, SessionLocal
+from app.models import User, Transaction
+
+CATEGORIES = ["Penjualan Produk", "Bahan Baku", "Pemasaran", "Gaji", "Sewa", "Lainnya"]
+
+def setup_database():
+    """
+    Membuat ulang semua tabel pada database benchmark
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+def create_user(email: str, name: str = "Bench User") -> int:
+    """
+    Membuat user benchmark tanpa hashing password (hash tidak dipakai saat benchmark)
+    """
+    db = SessionLocal()
+    try:
+        user = User(name=name, email=email, password_hash="bench")
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+def seed_transactions(user_id: int, count: int, days: int = 730, batch_size: int = 10000, seed: int = 42):
+    """
+    Mengisi transaksi acak untuk user dalam rentang `days` hari terakhir,
+    lalu membangun ulang rollup bulanan user tersebut
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    remaining = count
+    with engine.begin() as conn:
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            rows = []
+            for _ in range(size):
+                tx_type = "pemasukan" if rng.random() < 0.4 else "pengeluaran"
+                rows.append({
+                    "user_id": user_id,
+                    "date": today - timedelta(days=rng.randrange(days)),
+                    "type": tx_type,
+                    "amount": round(rng.uniform(10000, 5000000), 2),
+                    "category": rng.choice(CATEGORIES),
+                    "description": "bench",
+                })
+            conn.execute(Transaction.__table__.insert(), rows)
+            remaining -= size
+
+    db = SessionLocal()
+    try:
+        crud.rebuild_monthly_balances(db, user_id=user_id)
+    finally:
+        db.close()
+
+def percentile(values, pct: float) -> float:
+    """
+    Menghitung persentil (nearest-rank) dari daftar nilai
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def summarize(name: str, latencies_ms) -> str:
+    """
+    Format ringkasan latensi p50/p95/p99 dalam milidetik
+    """
+    return (
+        f"{name:<28} n={len(latencies_ms):<6} "
+        f"p50={percentile(latencies_ms, 50):8.2f}ms "
+        f"p95={percentile(latencies_ms, 95):8.2f}ms "
+        f"p99={percentile(latencies_ms, 99):8.2f}ms "
+        f"mean={statistics.fmean(latencies_ms) if latencies_ms else 0:8.2f}ms"
+    )
+
+class Timer:
+    """
+    Context manager sederhana untuk mengukur durasi dalam milidetik
+    """
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed_ms = (time.perf_counter() - self.start) * 1000
@@ -0,0 +1,198 @@
+# benchmarks/fake_openrouter.py
+"""
+Server tiruan OpenRouter (POST /api/v1/chat/completions) untuk load test tanpa API key asli.
+
+Mendukung respons biasa, streaming (stream: true, SSE seperti OpenRouter) dan JSON mode
+(response_format: json_object, mengembalikan format rekomendasi usaha). Latensi, tingkat
+error dan throughput token diatur lewat profil dan bisa di-override per opsi.
+
+Jalankan server tiruan, lalu arahkan aplikasi ke sana:
+    python -m benchmarks.fake_openrouter --port 9100 --profile realistic
+    OPENROUTER_API_URL=http://127.0.0.1:9100/api/v1/chat/completions OPENROUTER_API_KEY=fake uvicorn app.main:app
+
+Statistik server tiruan (jumlah request, error, konkurensi maksimum) ada di GET /stats.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass, replace
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+@dataclass
+class Profile:
+    latency_ms: float          # Waktu sampai token pertama (rata-rata)
+    jitter_ms: float           # Variasi acak latensi (+/-)
+    error_rate: float          # Peluang respons 5xx
+    rate_limit_rate: float     # Peluang respons 429
+    tokens_per_second: float   # Kecepatan menghasilkan token setelah token pertama
+    completion_tokens: int     # Panjang jawaban (dalam kata)
+    max_concurrency: int       # Request bersamaan di atas batas ini dibalas 429 (0 = tanpa batas)
+
+PROFILES = {
+    "fast": Profile(20, 10, 0.0, 0.0, 1000, 40, 0),
+    "realistic": Profile(800, 400, 0.01, 0.01, 60, 60, 0),
+    "slow": Profile(3000, 1500, 0.02, 0.02, 20, 80, 0),
+    "flaky": Profile(500, 300, 0.15, 0.10, 50, 60, 0),
+    "throttled": Profile(600, 200, 0.0, 0.0, 60, 60, 8),
+}
+
+WORDS = (
+    "arus kas usaha perlu dijaga dengan mencatat pemasukan dan pengeluaran secara rutin "
+    "sisihkan dana cadangan minimal tiga bulan biaya operasional kurangi pengeluaran yang "
+    "tidak mendukung penjualan dan fokus pada produk dengan margin tertinggi"
+).split()
+
+def create_app(profile: Profile, seed: int = None) -> FastAPI:
+    app = FastAPI(title="Fake OpenRouter")
+    rng = random.Random(seed)
+    stats = {"requests": 0, "streams": 0, "json_mode": 0, "errors": 0, "rate_limited": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def completion_text(json_mode: bool) -> str:
+        if json_mode:
+            return json.dumps({"recommendations": [
+                {
+                    "nama": f"Usaha Contoh {i + 1}",
+                    "deskripsi": " ".join(rng.choice(WORDS) for _ in range(12)),
+                    "modal_dibutuhkan": rng.randrange(500000, 5000000, 100000),
+                    "potensi_keuntungan": "Rp 300k - 500k/bulan",
+                    "tingkat_risiko": rng.choice(["Rendah", "Sedang", "Tinggi"]),
+                }
+                for i in range(3)
+            ]})
+        return " ".join(rng.choice(WORDS) for _ in range(profile.completion_tokens)).capitalize() + "."
+
+    def first_token_delay() -> float:
+        return max(0.0, profile.latency_ms + rng.uniform(-profile.jitter_ms, profile.jitter_ms)) / 1000
+
+    def error_response(status_code: int, message: str, headers: dict = None):
+        return JSONResponse(status_code=status_code, content={"error": {"code": status_code, "message": message}}, headers=headers)
+
+    @app.post("/api/v1/chat/completions")
+    async def chat_completions(request: Request):
+        if not request.headers.get("authorization", "").startswith("Bearer "):
+            return error_response(401, "No auth credentials found")
+
+        payload = await request.json()
+        stream = bool(payload.get("stream"))
+        json_mode = (payload.get("response_format") or {}).get("type") == "json_object"
+        model = payload.get("model", "fake-model")
+        stats["requests"] += 1
+        stats["streams"] += stream
+        stats["json_mode"] += json_mode
+
+        if profile.max_concurrency and stats["in_flight"] >= profile.max_concurrency:
+            stats["rate_limited"] += 1
+            return error_response(429, "Too many concurrent requests", {"Retry-After": "1"})
+        roll = rng.random()
+        if roll < profile.rate_limit_rate:
+            stats["rate_limited"] += 1
+            return error_response(429, "Rate limit exceeded", {"Retry-After": "1"})
+        if roll < profile.rate_limit_rate + profile.error_rate:
+            stats["errors"] += 1
+            await asyncio.sleep(first_token_delay())
+            return error_response(rng.choice([500, 502, 503]), "Upstream provider error")
+
+        completion_id = f"gen-{uuid.uuid4().hex[:16]}"
+        created = int(time.time())
+        text = completion_text(json_mode)
+        tokens = text.split(" ")
+        token_delay = 1 / profile.tokens_per_second if profile.tokens_per_second > 0 else 0
+
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+
+        if not stream:
+            try:
+                await asyncio.sleep(first_token_delay() + token_delay * len(tokens))
+            finally:
+                stats["in_flight"] -= 1
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+            }
+
+        async def events():
+            try:
+                # OpenRouter mengirim komentar keep-alive selama menunggu token pertama
+                yield ": OPENROUTER PROCESSING\n\n"
+                await asyncio.sleep(first_token_delay())
+                for i, token in enumerate(tokens):
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": token if i == 0 else " " + token}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    if token_delay:
+                        await asyncio.sleep(token_delay)
+                final = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+            finally:
+                stats["in_flight"] -= 1
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def get_stats():
+        return {**stats, "profile": profile.__dict__}
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        for key in stats:
+            stats[key] = 0
+        return stats
+
+    return app
+
+def build_profile(args) -> Profile:
+    """
+    Profil bernama dengan override dari opsi command line
+    """
+    overrides = {
+        field: getattr(args, field)
+        for field in Profile.__dataclass_fields__
+        if getattr(args, field, None) is not None
+    }
+    return replace(PROFILES[args.profile], **overrides)
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic")
+    parser.add_argument("--latency-ms", dest="latency_ms", type=float)
+    parser.add_argument("--jitter-ms", dest="jitter_ms", type=float)
+    parser.add_argument("--error-rate", dest="error_rate", type=float)
+    parser.add_argument("--rate-limit-rate", dest="rate_limit_rate", type=float)
+    parser.add_argument("--tokens-per-second", dest="tokens_per_second", type=float)
+    parser.add_argument("--completion-tokens", dest="completion_tokens", type=int)
+    parser.add_argument("--max-concurrency", dest="max_concurrency", type=int)
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--seed", type=int, default=None)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    profile = build_profile(args)
+    print(f"Fake OpenRouter profile={args.profile} {profile}")
+    uvicorn.run(create_app(profile, args.seed), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,268 @@
+# benchmarks/load_test.py
+"""
+Load test end-to-end (pure asyncio + httpx) untuk seluruh alur utama aplikasi.
+
+Setiap virtual user: register + login, menambah transaksi, lalu mengulang skenario
+dashboard, daftar transaksi, prediksi, analisis (biasa dan streaming), rekomendasi,
+komunitas dan laporan. Hasilnya berupa laporan latensi (p50/p95/p99/max), jumlah error
+dan throughput per endpoint.
+
+Terhadap server yang sudah berjalan (LLM diarahkan ke benchmarks.fake_openrouter):
+    python -m benchmarks.load_test --base-url http://localhost:8000 --users 20 --iterations 5
+
+Atau jalankan server tiruan LLM + aplikasi (SQLite sementara) secara otomatis:
+    python -m benchmarks.load_test --spawn --profile realistic --users 20 --iterations 5
+
+SQLite hanya mengizinkan satu penulis; set DATABASE_URL ke PostgreSQL untuk angka yang representatif.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+
+from benchmarks.common import percentile, CATEGORIES
+from benchmarks.fake_openrouter import add_profile_arguments
+
+import httpx
+
+class Recorder:
+    """
+    Mengumpulkan latensi dan status per nama endpoint
+    """
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.ttfb = defaultdict(list)
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, stream_body: bool = False, **kwargs):
+        start = time.perf_counter()
+        try:
+            if stream_body:
+                # Untuk respons streaming, catat juga waktu sampai byte pertama
+                async with client.stream(method, url, **kwargs) as response:
+                    first = None
+                    # Error setelah stream SSE dimulai dikirim sebagai event, bukan status HTTP
+                    is_sse = response.headers.get("content-type", "").startswith("text/event-stream")
+                    body_error = False
+                    async for chunk in response.aiter_bytes():
+                        if first is None:
+                            first = time.perf_counter()
+                        if is_sse and b"event: error" in chunk:
+                            body_error = True
+                    if first is not None:
+                        self.ttfb[name].append((first - start) * 1000)
+            else:
+                response = await client.request(method, url, **kwargs)
+                body_error = False
+        except httpx.HTTPError as e:
+            self.latencies[name].append((time.perf_counter() - start) * 1000)
+            self.errors[name] += 1
+            self.statuses[name][type(e).__name__] += 1
+            return None
+        self.latencies[name].append((time.perf_counter() - start) * 1000)
+        self.statuses[name][response.status_code] += 1
+        if response.status_code >= 400 or body_error:
+            self.errors[name] += 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for name in sorted(self.latencies):
+            values = self.latencies[name]
+            endpoints[name] = {
+                "count": len(values),
+                "errors": self.errors[name],
+                "throughput_rps": len(values) / elapsed if elapsed else 0,
+                "p50_ms": percentile(values, 50),
+                "p95_ms": percentile(values, 95),
+                "p99_ms": percentile(values, 99),
+                "max_ms": max(values),
+                "mean_ms": statistics.fmean(values),
+                "ttfb_p50_ms": percentile(self.ttfb[name], 50) if self.ttfb[name] else None,
+                "statuses": {str(code): count for code, count in self.statuses[name].items()},
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "elapsed_s": elapsed,
+            "total_requests": total,
+            "total_errors": sum(self.errors.values()),
+            "throughput_rps": total / elapsed if elapsed else 0,
+            "endpoints": endpoints,
+        }
+
+async def virtual_user(client: httpx.AsyncClient, recorder: Recorder, index: int, iterations: int, transactions: int, rng: random.Random):
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    password = "loadtest123"
+    response = await recorder.request(client, "POST /auth/register", "POST", "/auth/register",
+                                      json={"name": f"Load User {index}", "email": email, "password": password})
+    if response is None or response.status_code != 200:
+        return
+    response = await recorder.request(client, "POST /auth/login", "POST", "/auth/login",
+                                      json={"email": email, "password": password})
+    if response is None or response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    today = date.today()
+    for _ in range(transactions):
+        tx_type = "pemasukan" if rng.random() < 0.4 else "pengeluaran"
+        await recorder.request(client, "POST /transactions", "POST", "/transactions", headers=headers, json={
+            "type": tx_type,
+            "amount": round(rng.uniform(10000, 5000000), 2),
+            "category": rng.choice(CATEGORIES),
+            "description": "load test",
+            "date": (today - timedelta(days=rng.randrange(90))).isoformat(),
+        })
+
+    start_date = (today - timedelta(days=90)).isoformat()
+    end_date = today.isoformat()
+    post_id = None
+    for _ in range(iterations):
+        await recorder.request(client, "GET /dashboard/summary", "GET", "/dashboard/summary", headers=headers)
+        await recorder.request(client, "GET /transactions", "GET", "/transactions", headers=headers, params={"limit": 50})
+
+        # Input dari himpunan kecil agar ada prompt berulang, seperti pemakaian nyata
+        feasibility = {
+            "modal_awal": rng.choice([5000000, 10000000, 25000000]),
+            "biaya_operasional": rng.choice([1000000, 2000000]),
+            "estimasi_pemasukan": rng.choice([3000000, 4000000, 6000000]),
+        }
+        await recorder.request(client, "POST /analysis/feasibility", "POST", "/analysis/feasibility", headers=headers, params=feasibility)
+        await recorder.request(client, "POST /analysis/feasibility/stream", "POST", "/analysis/feasibility/stream",
+                               headers=headers, params=feasibility, stream_body=True)
+        await recorder.request(client, "POST /predictions/cashflow", "POST", "/predictions/cashflow", headers=headers)
+        await recorder.request(client, "POST /recommendations/business", "POST", "/recommendations/business", headers=headers,
+                               json={"modal": rng.choice([1000000, 5000000]), "minat": "kuliner", "lokasi": "Bandung"})
+
+        response = await recorder.request(client, "POST /community/posts", "POST", "/community/posts", headers=headers,
+                                          data={"title": "Tips arus kas", "content": "Catat semua transaksi harian.", "category": "tips"})
+        if response is not None and response.status_code == 200:
+            post_id = response.json()["id"]
+        await recorder.request(client, "GET /community/posts", "GET", "/community/posts", headers=headers)
+        if post_id is not None:
+            await recorder.request(client, "POST /community/posts/{id}/like", "POST", f"/community/posts/{post_id}/like", headers=headers)
+            await recorder.request(client, "POST /community/posts/{id}/comments", "POST", f"/community/posts/{post_id}/comments",
+                                   headers=headers, json={"content": "Setuju!"})
+            await recorder.request(client, "GET /community/posts/{id}/comments", "GET", f"/community/posts/{post_id}/comments", headers=headers)
+
+        await recorder.request(client, "GET /reports/export", "GET", "/reports/export", headers=headers,
+                               params={"start_date": start_date, "end_date": end_date, "format": "csv"}, stream_body=True)
+        await recorder.request(client, "GET /reports/financial", "GET", "/reports/financial", headers=headers,
+                               params={"start_date": start_date, "end_date": end_date})
+
+async def run_load(base_url: str, users: int, iterations: int, transactions: int, timeout: float, seed: int, fake_url: str = None):
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=users * 2, max_keepalive_connections=users * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        if fake_url:
+            await client.post(f"{fake_url}/stats/reset")
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            virtual_user(client, recorder, i, iterations, transactions, random.Random(seed + i))
+            for i in range(users)
+        ])
+        elapsed = time.perf_counter() - start
+        report = recorder.report(elapsed)
+        if fake_url:
+            report["fake_llm"] = (await client.get(f"{fake_url}/stats")).json()
+    return report
+
+def print_report(report: dict):
+    print(f"\n{'endpoint':<38} {'n':>6} {'err':>5} {'rps':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'ttfb50':>8}")
+    for name, row in report["endpoints"].items():
+        ttfb = f"{row['ttfb_p50_ms']:8.1f}" if row["ttfb_p50_ms"] is not None else f"{'-':>8}"
+        print(f"{name:<38} {row['count']:>6} {row['errors']:>5} {row['throughput_rps']:>7.1f} "
+              f"{row['p50_ms']:>7.1f}ms {row['p95_ms']:>7.1f}ms {row['p99_ms']:>7.1f}ms {row['max_ms']:>7.1f}ms {ttfb}")
+    print(f"\ntotal={report['total_requests']} errors={report['total_errors']} "
+          f"elapsed={report['elapsed_s']:.1f}s throughput={report['throughput_rps']:.1f} req/s")
+    if "fake_llm" in report:
+        stats = report["fake_llm"]
+        print(f"fake LLM: requests={stats['requests']} streams={stats['streams']} json_mode={stats['json_mode']} "
+              f"errors={stats['errors']} rate_limited={stats['rate_limited']} max_in_flight={stats['max_in_flight']}")
+
+def wait_until_ready(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server tidak siap: {url}")
+
+def spawn_servers(args):
+    """
+    Menjalankan server tiruan LLM dan aplikasi sebagai subprocess
+    """
+    fake_cmd = [sys.executable, "-m", "benchmarks.fake_openrouter", "--port", str(args.fake_port), "--profile", args.profile]
+    for field in ("latency_ms", "jitter_ms", "error_rate", "rate_limit_rate", "tokens_per_second", "completion_tokens", "max_concurrency"):
+        value = getattr(args, field)
+        if value is not None:
+            fake_cmd += [f"--{field.replace('_', '-')}", str(value)]
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+
+    env = dict(os.environ)
+    env.update({
+        "OPENROUTER_API_URL": f"{fake_url}/api/v1/chat/completions",
+        "OPENROUTER_API_KEY": "fake-load-test-key",
+    })
+    app_cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.app_port), "--log-level", "warning"]
+
+    processes = [subprocess.Popen(fake_cmd, env=env), subprocess.Popen(app_cmd, env=env)]
+    try:
+        wait_until_ready(f"{fake_url}/stats")
+        wait_until_ready(f"http://127.0.0.1:{args.app_port}/config.js", timeout=60)
+    except Exception:
+        stop_servers(processes)
+        raise
+    return processes, f"http://127.0.0.1:{args.app_port}", fake_url
+
+def stop_servers(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--fake-url", default=None, help="URL server tiruan LLM untuk menampilkan statistiknya")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--transactions", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", default=None, help="Simpan laporan lengkap sebagai JSON")
+    parser.add_argument("--spawn", action="store_true", help="Jalankan server tiruan LLM + aplikasi secara otomatis")
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--fake-port", type=int, default=9100)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    processes = []
+    base_url, fake_url = args.base_url, args.fake_url
+    if args.spawn:
+        processes, base_url, fake_url = spawn_servers(args)
+    try:
+        report = asyncio.run(run_load(base_url, args.users, args.iterations, args.transactions, args.timeout, args.seed, fake_url))
+    finally:
+        stop_servers(processes)
+
+    print(f"base_url={base_url} users={args.users} iterations={args.iterations} profile={args.profile if args.spawn else '-'}")
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
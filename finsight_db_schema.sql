@@ -24,6 +24,60 @@ CREATE TABLE transactions (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Tabel Monthly Balances (rollup transaksi per bulan, tipe, dan kategori)
+CREATE TABLE monthly_balances (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    type VARCHAR(20) NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    total_amount DECIMAL(18,2) NOT NULL DEFAULT 0,
+    tx_count INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT uq_monthly_balances_key UNIQUE (user_id, year, month, type, category)
+);
+
+-- Tabel Data Versions (versi data per scope "user:<id>" / "community", dipakai sebagai ETag endpoint baca)
+CREATE TABLE data_versions (
+    scope VARCHAR(64) PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+-- Tabel Report Jobs (job laporan PDF + cache hasil, dipakai jika REPORT_JOB_BACKEND=sql)
+CREATE TABLE report_jobs (
+    id VARCHAR(36) PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    data_version VARCHAR(64) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    error TEXT,
+    pdf BYTEA,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Tabel Insight Jobs (insight AI yang dibuat di background, dipakai jika INSIGHT_JOB_BACKEND=sql)
+CREATE TABLE insight_jobs (
+    id VARCHAR(36) PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    kind VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    insight TEXT,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Tabel LLM Cache Entries (cache respons LLM, dipakai jika LLM_CACHE_BACKEND=sql)
+CREATE TABLE llm_cache_entries (
+    key VARCHAR(64) PRIMARY KEY,
+    model VARCHAR(100) NOT NULL,
+    value TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
 -- Tabel Business Recommendations (untuk menyimpan rekomendasi yang di-generate)
 CREATE TABLE business_recommendations (
     id SERIAL PRIMARY KEY,
@@ -43,7 +97,13 @@ CREATE TABLE cash_flow_predictions (
     predicted_expense DECIMAL(15,2),
     prediction_date DATE NOT NULL,
     insight TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    method VARCHAR(20),
+    income_lower DECIMAL(15,2),
+    income_upper DECIMAL(15,2),
+    expense_lower DECIMAL(15,2),
+    expense_upper DECIMAL(15,2),
+    data_version INTEGER
 );
 
 -- Tabel Feasibility Analysis
@@ -67,6 +127,7 @@ CREATE TABLE community_posts (
     title VARCHAR(200) NOT NULL,
     content TEXT NOT NULL,
     image_url VARCHAR(500),
+    thumbnail_url VARCHAR(500),
     category VARCHAR(50) NOT NULL,
     likes_count INTEGER DEFAULT 0,
     comments_count INTEGER DEFAULT 0,
@@ -97,16 +158,28 @@ CREATE TABLE community_likes (
 CREATE INDEX idx_transactions_user_id ON transactions(user_id);
 CREATE INDEX idx_transactions_date ON transactions(date);
 CREATE INDEX idx_transactions_type ON transactions(type);
+CREATE INDEX ix_transactions_user_date_id ON transactions(user_id, date, id);
+CREATE INDEX idx_monthly_balances_user_id ON monthly_balances(user_id);
+CREATE INDEX ix_report_jobs_user_id ON report_jobs(user_id);
+CREATE INDEX ix_report_jobs_lookup ON report_jobs(user_id, start_date, end_date, data_version);
+CREATE INDEX ix_insight_jobs_user_id ON insight_jobs(user_id);
+CREATE INDEX ix_insight_jobs_created_at ON insight_jobs(created_at);
+CREATE INDEX ix_llm_cache_entries_created_at ON llm_cache_entries(created_at);
+CREATE INDEX ix_llm_cache_entries_expires_at ON llm_cache_entries(expires_at);
 CREATE INDEX idx_business_recommendations_user_id ON business_recommendations(user_id);
 CREATE INDEX idx_cash_flow_predictions_user_id ON cash_flow_predictions(user_id);
 CREATE INDEX idx_feasibility_analyses_user_id ON feasibility_analyses(user_id);
 CREATE INDEX idx_community_posts_user_id ON community_posts(user_id);
 CREATE INDEX idx_community_posts_category ON community_posts(category);
 CREATE INDEX idx_community_posts_created_at ON community_posts(created_at);
+CREATE INDEX ix_community_posts_feed ON community_posts(is_active, created_at, id);
+CREATE INDEX ix_community_posts_category_feed ON community_posts(category, is_active, created_at, id);
 CREATE INDEX idx_community_comments_post_id ON community_comments(post_id);
 CREATE INDEX idx_community_comments_user_id ON community_comments(user_id);
 CREATE INDEX idx_community_likes_post_id ON community_likes(post_id);
 CREATE INDEX idx_community_likes_user_id ON community_likes(user_id);
+CREATE UNIQUE INDEX uq_community_likes_post_user ON community_likes(post_id, user_id);
+CREATE UNIQUE INDEX uq_cash_flow_predictions_user_month ON cash_flow_predictions(user_id, prediction_date);
 
 -- -- Sample data untuk testing
 -- INSERT INTO users (name, email, password_hash) VALUES 
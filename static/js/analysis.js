@@ -1,6 +1,6 @@
 // static/js/analysis.js
 import { analysisAPI } from './api.js';
-import { showMessage, formatCurrency, destroyChart, chartInstances, DOMElements } from './utils.js';
+import { showMessage, formatCurrency, destroyChart, chartInstances, DOMElements, readEventStream } from './utils.js';
 
 const feasibilityForm = DOMElements.feasibilityForm || document.getElementById('feasibility-form');
 const feaModalInput = DOMElements.feaModalInput || document.getElementById('fea-modal');
@@ -42,38 +42,21 @@ export const setupAnalysisListeners = () => {
         feasibilityOutput.classList.add('hidden');
 
         try {
-            const response = await analysisAPI.analyzeFeasibility(modalAwal, biayaOperasional, estimasiPemasukan, feasibilityAbortController.signal);
+            const response = await analysisAPI.analyzeFeasibilityStream(modalAwal, biayaOperasional, estimasiPemasukan, feasibilityAbortController.signal);
 
             if (response.ok) {
-                const data = await response.json();
-                console.log('Feasibility Analysis Data Received:', data);
-
-                feasibilityLoading.classList.add('hidden');
-                feasibilityOutput.classList.remove('hidden');
-
-                feaProfitEl.textContent = formatCurrency(data.profit_bersih);
-                feaRoiEl.textContent = data.roi !== null && data.roi !== undefined ? `${data.roi.toFixed(2)}%` : 'N/A';
-                
-                let bepText;
-                if (data.break_even_months === null || data.break_even_months === Infinity) {
-                    bepText = 'Tidak tercapai (Defisit)';
-                    feasibilityStatusEl.className = 'p-4 rounded-md font-bold text-center text-lg bg-red-900/50 text-red-300 border border-red-500';
-                } else {
-                    bepText = `${data.break_even_months.toFixed(1)} Bulan`;
-                    if (data.feasibility_status === 'Layak') {
-                        feasibilityStatusEl.className = 'p-4 rounded-md font-bold text-center text-lg bg-green-900/50 text-green-300 border border-green-500';
-                    } else {
-                        feasibilityStatusEl.className = 'p-4 rounded-md font-bold text-center text-lg bg-yellow-900/50 text-yellow-300 border border-yellow-500';
+                // Angka hasil perhitungan tampil segera; insight AI menyusul per potongan teks
+                await readEventStream(response, (eventName, data) => {
+                    if (eventName === 'result') {
+                        renderFeasibilityResult(data, modalAwal, estimasiPemasukan - biayaOperasional);
+                        if (feasibilityAiInsightEl) feasibilityAiInsightEl.textContent = '';
+                    } else if (eventName === 'token' && feasibilityAiInsightEl) {
+                        feasibilityAiInsightEl.textContent += data.text;
+                    } else if (eventName === 'error') {
+                        console.error('Feasibility insight stream error:', data);
+                        showMessage(data.detail || 'Gagal memuat insight AI.', 'error');
                     }
-                }
-                feaBepEl.textContent = bepText;
-                feasibilityStatusEl.textContent = `Status: ${data.feasibility_status}`;
-                
-                if (feasibilityAiInsightEl && data.ai_insight) {
-                    feasibilityAiInsightEl.textContent = data.ai_insight;
-                }
-                
-                renderBreakEvenChart(data.break_even_months, modalAwal, (estimasiPemasukan - biayaOperasional));
+                });
 
             } else {
                 const errorData = await response.json();
@@ -97,6 +80,31 @@ export const setupAnalysisListeners = () => {
     });
 };
 
+const renderFeasibilityResult = (data, modalAwal, profitBersihPerBulan) => {
+    feasibilityLoading.classList.add('hidden');
+    feasibilityOutput.classList.remove('hidden');
+
+    feaProfitEl.textContent = formatCurrency(data.profit_bersih);
+    feaRoiEl.textContent = data.roi !== null && data.roi !== undefined ? `${data.roi.toFixed(2)}%` : 'N/A';
+    
+    let bepText;
+    if (data.break_even_months === null || data.break_even_months === Infinity) {
+        bepText = 'Tidak tercapai (Defisit)';
+        feasibilityStatusEl.className = 'p-4 rounded-md font-bold text-center text-lg bg-red-900/50 text-red-300 border border-red-500';
+    } else {
+        bepText = `${data.break_even_months.toFixed(1)} Bulan`;
+        if (data.feasibility_status === 'Layak') {
+            feasibilityStatusEl.className = 'p-4 rounded-md font-bold text-center text-lg bg-green-900/50 text-green-300 border border-green-500';
+        } else {
+            feasibilityStatusEl.className = 'p-4 rounded-md font-bold text-center text-lg bg-yellow-900/50 text-yellow-300 border border-yellow-500';
+        }
+    }
+    feaBepEl.textContent = bepText;
+    feasibilityStatusEl.textContent = `Status: ${data.feasibility_status}`;
+    
+    renderBreakEvenChart(data.break_even_months, modalAwal, profitBersihPerBulan);
+};
+
 const renderBreakEvenChart = (breakEvenMonths, modalAwal, profitBersihPerBulan) => {
     destroyChart('breakEvenChart');
     const ctx = document.getElementById('breakEvenChart').getContext('2d');
@@ -44,8 +44,11 @@ export const authAPI = {
 };
 
 export const transactionsAPI = {
-    getTransactions: async () => {
-        const response = await fetch(`${BASE_URL}/transactions`, {
+    // Riwayat dengan cursor: hasilnya { items, next_cursor }
+    getTransactions: async (cursor = null, limit = 50) => {
+        const params = new URLSearchParams({ limit });
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`${BASE_URL}/transactions?${params}`, {
             method: 'GET',
             headers: getAuthHeaders()
         });
@@ -75,6 +78,13 @@ export const dashboardAPI = {
             headers: getAuthHeaders()
         });
         return response;
+    },
+    getCharts: async () => {
+        const response = await fetch(`${BASE_URL}/dashboard/charts`, {
+            method: 'GET',
+            headers: getAuthHeaders()
+        });
+        return response;
     }
 };
 
@@ -85,6 +95,15 @@ export const predictionsAPI = {
             headers: getAuthHeaders()
         });
         return response;
+    },
+
+    // Versi Server-Sent Events: angka prediksi dikirim dulu, lalu insight AI per potongan teks
+    generateCashflowStream: async () => {
+        const response = await fetch(`${BASE_URL}/predictions/cashflow/stream`, {
+            method: 'POST',
+            headers: getAuthHeaders()
+        });
+        return response;
     }
 };
 
@@ -107,6 +126,15 @@ export const analysisAPI = {
             signal: signal
         });
         return response;
+    },
+
+    analyzeFeasibilityStream: async (modalAwal, biayaOperasional, estimasiPemasukan, signal) => {
+        const response = await fetch(`${BASE_URL}/analysis/feasibility/stream?modal_awal=${modalAwal}&biaya_operasional=${biayaOperasional}&estimasi_pemasukan=${estimasiPemasukan}`, {
+            method: 'POST',
+            headers: getAuthHeaders(),
+            signal: signal
+        });
+        return response;
     }
 };
 
@@ -119,9 +147,13 @@ export const communityAPI = {
         });
         return response;
     },
-    getPosts: async (category = '') => {
-        const url = category ? `${BASE_URL}/community/posts?category=${category}` : `${BASE_URL}/community/posts`;
-        const response = await fetch(url, {
+    // Feed dengan cursor: hasilnya { items, next_cursor }
+    getPosts: async (category = '', cursor = null) => {
+        const params = new URLSearchParams();
+        if (category) params.set('category', category);
+        if (cursor) params.set('cursor', cursor);
+        const query = params.toString();
+        const response = await fetch(`${BASE_URL}/community/feed${query ? `?${query}` : ''}`, {
             method: 'GET',
             headers: getAuthHeaders()
         });
@@ -10,6 +10,9 @@ const createPostModal = DOMElements.createPostModal || document.getElementById('
 const closeModalBtn = DOMElements.closeModalBtn || document.getElementById('close-modal-btn');
 const cancelPostBtn = DOMElements.cancelPostBtn || document.getElementById('cancel-post-btn');
 
+let feedCategory = '';
+let feedNextCursor = null;
+
 export const setupCommunityListeners = () => {
     createPostBtn.addEventListener('click', () => {
         createPostModal.classList.remove('hidden');
@@ -77,6 +80,11 @@ export const setupCommunityListeners = () => {
     });
 
     communityPostsContainer.addEventListener('click', async (e) => {
+        if (e.target.closest('.load-more-posts-btn')) {
+            loadCommunityPosts(feedCategory, feedNextCursor);
+            return;
+        }
+
         const postCard = e.target.closest('.post-card');
         if (!postCard) return;
         
@@ -98,12 +106,12 @@ export const setupCommunityListeners = () => {
                             heartIcon.classList.add('fill-current', 'text-red-400');
                             likeBtn.classList.remove('text-slate-400');
                             likeBtn.classList.add('text-red-400');
-                            countSpan.textContent = parseInt(countSpan.textContent) + 1;
+                            countSpan.textContent = data.likes_count ?? parseInt(countSpan.textContent) + 1;
                         } else {
                             heartIcon.classList.remove('fill-current', 'text-red-400');
                             likeBtn.classList.remove('text-red-400');
                             likeBtn.classList.add('text-slate-400');
-                            countSpan.textContent = parseInt(countSpan.textContent) - 1;
+                            countSpan.textContent = data.likes_count ?? parseInt(countSpan.textContent) - 1;
                         }
                     } else {
                         console.warn("Could not find heart icon (SVG) or like count span for post ID:", postId);
@@ -195,13 +203,15 @@ export const setupCommunityListeners = () => {
     });
 };
 
-export const loadCommunityPosts = async (category = '') => {
+export const loadCommunityPosts = async (category = '', cursor = null) => {
     try {
-        const response = await communityAPI.getPosts(category);
+        const response = await communityAPI.getPosts(category, cursor);
 
         if (response.ok) {
-            const posts = await response.json();
-            renderCommunityPosts(posts);
+            const page = await response.json();
+            feedCategory = category;
+            feedNextCursor = page.next_cursor;
+            renderCommunityPosts(page.items, cursor !== null);
         } else {
             showMessage('Gagal memuat post komunitas.', 'error');
         }
@@ -211,8 +221,8 @@ export const loadCommunityPosts = async (category = '') => {
     }
 };
 
-const renderCommunityPosts = (posts) => {
-    if (!posts || posts.length === 0) {
+const renderCommunityPosts = (posts, append = false) => {
+    if (!append && (!posts || posts.length === 0)) {
         communityPostsContainer.innerHTML = `
             <div class="bg-slate-800 p-6 rounded-lg shadow-lg text-center">
                 <i data-lucide="message-circle" class="mx-auto mb-2 text-slate-400"></i>
@@ -260,7 +270,9 @@ const renderCommunityPosts = (posts) => {
                 
                 ${post.image_url ? `
                     <div class="mb-6">
-                        <img src="${post.image_url}" class="max-w-lg w-full h-auto object-cover rounded-lg border border-slate-600 mx-auto" alt="Post image">
+                        <a href="${post.image_url}" target="_blank" rel="noopener">
+                            <img src="${post.thumbnail_url || post.image_url}" loading="lazy" decoding="async" class="max-w-lg w-full h-auto object-cover rounded-lg border border-slate-600 mx-auto" alt="Post image">
+                        </a>
                     </div>
                 ` : ''}
                 
@@ -293,7 +305,20 @@ const renderCommunityPosts = (posts) => {
         `;
     }).join('');
 
-    communityPostsContainer.innerHTML = postsHTML;
+    const loadMoreHTML = feedNextCursor ? `
+        <div class="load-more-posts text-center mb-6">
+            <button class="load-more-posts-btn bg-slate-700 hover:bg-slate-600 text-slate-300 px-4 py-2 rounded-md text-sm transition-colors duration-200">
+                Muat lebih banyak
+            </button>
+        </div>
+    ` : '';
+
+    if (append) {
+        communityPostsContainer.querySelector('.load-more-posts')?.remove();
+        communityPostsContainer.insertAdjacentHTML('beforeend', postsHTML + loadMoreHTML);
+    } else {
+        communityPostsContainer.innerHTML = postsHTML + loadMoreHTML;
+    }
     lucide.createIcons();
 };
 
@@ -1,6 +1,6 @@
 // static/js/dashboard.js
 import { dashboardAPI } from './api.js';
-import { showMessage, formatCurrency, currentUserTransactions, destroyChart, chartInstances, DOMElements } from './utils.js';
+import { showMessage, formatCurrency, destroyChart, chartInstances, DOMElements } from './utils.js';
 
 const totalPemasukanEl = DOMElements.totalPemasukanEl || document.getElementById('total-pemasukan');
 const totalPengeluaranEl = DOMElements.totalPengeluaranEl || document.getElementById('total-pengeluaran');
@@ -24,14 +24,28 @@ export const renderDashboard = async () => {
         showMessage('Terjadi kesalahan saat memuat ringkasan dashboard.', 'error');
     }
     
-    renderCashflowChart();
-    renderCategoryPieChart('categoryPieChartDashboard');
+    // Data grafik dihitung di server dari rollup bulanan, bukan dari seluruh riwayat transaksi
+    let charts = { monthly: [], expense_by_category: {} };
+    try {
+        const response = await dashboardAPI.getCharts();
+        if (response.ok) {
+            charts = await response.json();
+        } else {
+            showMessage('Gagal memuat grafik dashboard.', 'error');
+        }
+    } catch (error) {
+        console.error('Error fetching dashboard charts:', error);
+        showMessage('Terjadi kesalahan saat memuat grafik dashboard.', 'error');
+    }
+
+    renderCashflowChart(charts.monthly);
+    renderCategoryPieChart('categoryPieChartDashboard', charts.expense_by_category);
 };
 
-const renderCashflowChart = () => {
+const renderCashflowChart = (monthly) => {
     destroyChart('cashflowChart'); 
     const ctx = document.getElementById('cashflowChart').getContext('2d');
-    if (!currentUserTransactions || currentUserTransactions.length === 0) {
+    if (!monthly || monthly.every(m => m.pemasukan === 0 && m.pengeluaran === 0)) {
         ctx.clearRect(0, 0, ctx.canvas.width, ctx.canvas.height);
         ctx.fillStyle = 'rgba(148, 163, 184, 0.5)';
         ctx.textAlign = 'center';
@@ -39,39 +53,10 @@ const renderCashflowChart = () => {
         return;
     }
 
-    const labels = [];
-    const incomeData = Array(6).fill(0);
-    const expenseData = Array(6).fill(0);
     const monthNames = ["Jan", "Feb", "Mar", "Apr", "Mei", "Jun", "Jul", "Ags", "Sep", "Okt", "Nov", "Des"];
-    const today = new Date();
-
-    for (let i = 5; i >= 0; i--) {
-        const d = new Date(today);
-        d.setMonth(today.getMonth() - i);
-        labels.push(monthNames[d.getMonth()] + ' ' + d.getFullYear().toString().slice(-2));
-    }
-
-    const sixMonthsAgo = new Date();
-    sixMonthsAgo.setMonth(today.getMonth() - 5);
-    sixMonthsAgo.setDate(1);
-    sixMonthsAgo.setHours(0,0,0,0);
-
-    const relevantTransactions = currentUserTransactions.filter(tx => new Date(tx.date) >= sixMonthsAgo);
-
-    relevantTransactions.forEach(tx => {
-        const txDate = new Date(tx.date);
-        const monthDiff = (today.getFullYear() - txDate.getFullYear()) * 12 + (today.getMonth() - txDate.getMonth());
-        
-        const index = 5 - monthDiff;
-
-        if (index >= 0 && index < 6) {
-            if (tx.type === 'pemasukan') {
-                incomeData[index] += tx.amount;
-            } else {
-                expenseData[index] += tx.amount;
-            }
-        }
-    });
+    const labels = monthly.map(m => monthNames[m.month - 1] + ' ' + m.year.toString().slice(-2));
+    const incomeData = monthly.map(m => m.pemasukan);
+    const expenseData = monthly.map(m => m.pengeluaran);
 
     chartInstances['cashflowChart'] = new Chart(ctx, { 
         type: 'bar', 
@@ -96,13 +81,9 @@ const renderCashflowChart = () => {
     });
 };
 
-const renderCategoryPieChart = (canvasId) => {
+const renderCategoryPieChart = (canvasId, expenseCategories = {}) => {
     destroyChart(canvasId); 
     const ctx = document.getElementById(canvasId).getContext('2d');
-    
-    const expenseCategories = (currentUserTransactions || [])
-        .filter(t => t.type === 'pengeluaran')
-        .reduce((acc, t) => { acc[t.category] = (acc[t.category] || 0) + t.amount; return acc; }, {});
 
     if (Object.keys(expenseCategories).length === 0) {
         ctx.clearRect(0, 0, ctx.canvas.width, ctx.canvas.height);
@@ -1,6 +1,6 @@
 // static/js/predictions.js
 import { predictionsAPI } from './api.js';
-import { showMessage, formatCurrency, DOMElements } from './utils.js';
+import { showMessage, formatCurrency, DOMElements, readEventStream } from './utils.js';
 
 const generatePredictionBtn = DOMElements.generatePredictionBtn || document.getElementById('generate-prediction-btn');
 const predictionResult = DOMElements.predictionResult || document.getElementById('prediction-result');
@@ -9,6 +9,12 @@ const predictionOutput = DOMElements.predictionOutput || document.getElementById
 const predictedIncomeEl = DOMElements.predictedIncomeEl || document.getElementById('predicted-income');
 const predictedExpenseEl = DOMElements.predictedExpenseEl || document.getElementById('predicted-expense');
 const predictionInsightEl = DOMElements.predictionInsightEl || document.getElementById('prediction-insight');
+const predictedIncomeRangeEl = document.getElementById('predicted-income-range');
+const predictedExpenseRangeEl = document.getElementById('predicted-expense-range');
+
+// Interval prediksi 95% (kosong jika histori transaksi masih terlalu pendek)
+const formatRange = (lower, upper) =>
+    lower == null || upper == null ? '' : `Rentang: ${formatCurrency(lower)} - ${formatCurrency(upper)}`;
 
 export const setupPredictionListeners = () => {
     generatePredictionBtn.addEventListener('click', async () => {
@@ -17,16 +23,27 @@ export const setupPredictionListeners = () => {
         predictionOutput.classList.add('hidden');
 
         try {
-            const response = await predictionsAPI.generateCashflow();
+            const response = await predictionsAPI.generateCashflowStream();
 
             if (response.ok) {
-                const data = await response.json();
-                predictedIncomeEl.textContent = formatCurrency(data.predicted_income);
-                predictedExpenseEl.textContent = formatCurrency(data.predicted_expense);
-                predictionInsightEl.textContent = data.insight;
-                
-                predictionLoading.classList.add('hidden');
-                predictionOutput.classList.remove('hidden');
+                // Angka prediksi tampil segera; insight AI menyusul per potongan teks
+                await readEventStream(response, (eventName, data) => {
+                    if (eventName === 'result') {
+                        predictedIncomeEl.textContent = formatCurrency(data.predicted_income);
+                        predictedExpenseEl.textContent = formatCurrency(data.predicted_expense);
+                        predictedIncomeRangeEl.textContent = formatRange(data.income_lower, data.income_upper);
+                        predictedExpenseRangeEl.textContent = formatRange(data.expense_lower, data.expense_upper);
+                        predictionInsightEl.textContent = '';
+
+                        predictionLoading.classList.add('hidden');
+                        predictionOutput.classList.remove('hidden');
+                    } else if (eventName === 'token') {
+                        predictionInsightEl.textContent += data.text;
+                    } else if (eventName === 'error') {
+                        console.error('Cashflow insight stream error:', data);
+                        showMessage(data.detail || 'Gagal memuat insight AI.', 'error');
+                    }
+                });
             } else {
                 const errorData = await response.json();
                 showMessage(errorData.detail || 'Gagal membuat prediksi arus kas.', 'error');
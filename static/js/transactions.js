@@ -6,6 +6,7 @@ import { setupReportListeners } from './financial-report.js';
 
 const transactionForm = DOMElements.transactionForm || document.getElementById('transaction-form');
 const transactionTableBody = DOMElements.transactionTableBody || document.getElementById('transaction-table-body');
+let transactionsNextCursor = null; // Cursor halaman riwayat berikutnya (null = sudah habis)
 
 export const setupTransactionListeners = () => {
     // Set tanggal transaksi default ke hari ini
@@ -45,18 +46,23 @@ export const setupTransactionListeners = () => {
         if (deleteButton) { 
             deleteTransaction(parseInt(deleteButton.dataset.id, 10)); 
         } 
+        if (e.target.closest('.load-more-tx-btn')) {
+            loadMoreTransactions();
+        }
     });
 
     setupReportListeners();
 };
 
+// Halaman pertama dimuat ulang setiap kali data berubah; halaman berikutnya diambil saat tombol "Muat lebih banyak" diklik
 export const fetchTransactionsAndRefresh = async () => {
+    renderDashboard(); // Grafik dan ringkasan diambil dari endpoint dashboard
     try {
         const response = await transactionsAPI.getTransactions();
         if (response.ok) {
-            const transactions = await response.json();
-            setCurrentUserTransactions(transactions);
-            renderDashboard(); // Perbarui dashboard
+            const page = await response.json();
+            transactionsNextCursor = page.next_cursor;
+            setCurrentUserTransactions(page.items);
             renderTransactionTable(); // Perbarui tabel transaksi
         } else {
             showMessage('Gagal memuat transaksi.', 'error');
@@ -69,6 +75,24 @@ export const fetchTransactionsAndRefresh = async () => {
     }
 };
 
+const loadMoreTransactions = async () => {
+    if (!transactionsNextCursor) return;
+    try {
+        const response = await transactionsAPI.getTransactions(transactionsNextCursor);
+        if (response.ok) {
+            const page = await response.json();
+            transactionsNextCursor = page.next_cursor;
+            setCurrentUserTransactions(currentUserTransactions.concat(page.items));
+            renderTransactionTable();
+        } else {
+            showMessage('Gagal memuat transaksi.', 'error');
+        }
+    } catch (error) {
+        console.error('Error fetching transactions:', error);
+        showMessage('Terjadi kesalahan saat memuat transaksi.', 'error');
+    }
+};
+
 const renderTransactionTable = () => {
     transactionTableBody.innerHTML = '';
 
@@ -79,26 +103,37 @@ const renderTransactionTable = () => {
         return;
     }
 
-    currentUserTransactions
-        .sort((a, b) => new Date(b.date) - new Date(a.date))
-        .forEach(tx => {
-            const row = document.createElement('tr');
-            row.className = 'border-b border-slate-700 hover:bg-slate-700/50';
-            row.innerHTML = `
-                <td class="p-3">${tx.date}</td>
-                <td class="p-3">${tx.description || ''}</td>
-                <td class="p-3"><span class="bg-indigo-500/20 text-indigo-300 text-xs font-medium px-2 py-1 rounded-full">${tx.category}</span></td>
-                <td class="p-3 text-right font-medium ${tx.type === 'pemasukan' ? 'text-green-400' : 'text-red-400'}">
-                    ${tx.type === 'pemasukan' ? '+' : '-'} ${formatCurrency(tx.amount)}
-                </td>
-                <td class="p-3 text-center">
-                    <button class="text-red-400 hover:text-red-600 delete-tx-btn" data-id="${tx.id}">
-                        <i data-lucide="trash-2" class="w-4 h-4 pointer-events-none"></i>
-                    </button>
-                </td>
-            `;
-            transactionTableBody.appendChild(row);
-        });
+    // Urutan (tanggal terbaru lebih dulu) sudah dari server
+    currentUserTransactions.forEach(tx => {
+        const row = document.createElement('tr');
+        row.className = 'border-b border-slate-700 hover:bg-slate-700/50';
+        row.innerHTML = `
+            <td class="p-3">${tx.date}</td>
+            <td class="p-3">${tx.description || ''}</td>
+            <td class="p-3"><span class="bg-indigo-500/20 text-indigo-300 text-xs font-medium px-2 py-1 rounded-full">${tx.category}</span></td>
+            <td class="p-3 text-right font-medium ${tx.type === 'pemasukan' ? 'text-green-400' : 'text-red-400'}">
+                ${tx.type === 'pemasukan' ? '+' : '-'} ${formatCurrency(tx.amount)}
+            </td>
+            <td class="p-3 text-center">
+                <button class="text-red-400 hover:text-red-600 delete-tx-btn" data-id="${tx.id}">
+                    <i data-lucide="trash-2" class="w-4 h-4 pointer-events-none"></i>
+                </button>
+            </td>
+        `;
+        transactionTableBody.appendChild(row);
+    });
+
+    if (transactionsNextCursor) {
+        const row = document.createElement('tr');
+        row.innerHTML = `
+            <td colspan="5" class="p-4 text-center">
+                <button class="load-more-tx-btn bg-slate-700 hover:bg-slate-600 text-slate-300 px-4 py-2 rounded-md text-sm transition-colors duration-200">
+                    Muat lebih banyak
+                </button>
+            </td>
+        `;
+        transactionTableBody.appendChild(row);
+    }
     lucide.createIcons();
 };
 
@@ -115,6 +115,34 @@ export const showMessage = (message, type = 'info') => {
     }, 4000);
 };
 
+// Membaca respons Server-Sent Events dari fetch (EventSource tidak bisa mengirim header Authorization).
+// onEvent dipanggil dengan nama event dan payload JSON-nya.
+export const readEventStream = async (response, onEvent) => {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let eventName = 'message';
+            let data = '';
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            if (data) onEvent(eventName, JSON.parse(data));
+        }
+    }
+};
+
 export const getTimeAgo = (date) => {
     // Ensure we're working with a proper Date object
     const postDate = date instanceof Date ? date : new Date(date);
@@ -0,0 +1,72 @@
+# tests/test_upload_limit.py
+import asyncio
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.services.image_service import UploadSizeLimitMiddleware
+
+MAX_BYTES = 64 * 1024
+
+def make_client():
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, paths=["/upload"], max_bytes=MAX_BYTES)
+    received = {"calls": 0}
+
+    @app.post("/upload")
+    async def upload(image: UploadFile = File(...)):
+        received["calls"] += 1
+        return {"size": len(await image.read())}
+
+    return TestClient(app), received
+
+def multipart_chunks(payload_size: int, chunk_size: int = 8 * 1024):
+    boundary = b"finsight-test"
+    yield b"--" + boundary + b'\r\nContent-Disposition: form-data; name="image"; filename="a.jpg"\r\nContent-Type: image/jpeg\r\n\r\n'
+    for start in range(0, payload_size, chunk_size):
+        yield b"x" * min(chunk_size, payload_size - start)
+    yield b"\r\n--" + boundary + b"--\r\n"
+
+def test_small_upload_passes():
+    client, received = make_client()
+    response = client.post("/upload", files={"image": ("a.jpg", b"x" * 1024, "image/jpeg")})
+    assert response.status_code == 200
+    assert response.json() == {"size": 1024}
+    assert received["calls"] == 1
+
+def test_oversized_content_length_rejected_before_parsing():
+    client, received = make_client()
+    response = client.post("/upload", files={"image": ("a.jpg", b"x" * (MAX_BYTES * 2), "image/jpeg")})
+    assert response.status_code == 413
+    assert received["calls"] == 0
+
+def test_oversized_chunked_body_aborted_while_reading():
+    # TestClient mengirim body dalam satu pesan, jadi body chunked disimulasikan langsung di level ASGI
+    client, received = make_client()
+    chunks = list(multipart_chunks(MAX_BYTES * 16))
+    pulled = {"bytes": 0}
+    sent = []
+
+    async def receive():
+        if not chunks:
+            return {"type": "http.disconnect"}
+        chunk = chunks.pop(0)
+        pulled["bytes"] += len(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/upload", "raw_path": b"/upload", "root_path": "", "query_string": b"",
+        "headers": [(b"content-type", b"multipart/form-data; boundary=finsight-test"), (b"transfer-encoding", b"chunked")],
+        "client": ("testclient", 50000), "server": ("testserver", 80), "state": {},
+    }
+    asyncio.run(client.app(scope, receive, send))
+
+    assert sent[0]["type"] == "http.response.start"
+    assert sent[0]["status"] == 413
+    assert received["calls"] == 0
+    # Berhenti membaca begitu batas terlewati, bukan setelah seluruh body diterima
+    assert pulled["bytes"] <= MAX_BYTES + 16 * 1024